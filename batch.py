@@ -0,0 +1,176 @@
+"""
+JobHunt CrewAI - Batch Entry Point
+Runs Phase 1 and Phase 2 for many resumes without prompts.
+
+The manifest is a JSONL file (or a JSON list) with one entry per resume:
+
+    {"id": "cand-001", "resume_file": "resumes/a.pdf",
+     "preferred_roles": ["ML Engineer"], "preferred_domains": ["AI"],
+     "location": "Remote", "experience_level": "junior"}
+
+Only `resume_file` is required. Where the CLI would prompt, a policy chooses
+instead: which Phase 1 roles to search for, and which found jobs to optimize
+the resume against. Each result is written as one JSONL line with per-phase
+timings, in completion order.
+
+Usage:
+    python batch.py manifest.jsonl --out results.jsonl --workers 4
+"""
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+import tracing
+
+ROLE_POLICIES = ("good_fit", "good_and_stretch", "preferred")
+JOB_POLICIES = ("top", "none")
+DEFAULT_LOCATION = "Remote"
+DEFAULT_EXPERIENCE_LEVEL = "junior"
+EXPERIENCE_LEVELS = ("intern", "junior", "mid", "senior")
+
+
+# -------- Manifest --------
+def load_manifest(path: str) -> List[Dict]:
+    with open(path) as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    for idx, entry in enumerate(entries):
+        if not entry.get("resume_file"):
+            raise ValueError(f"Manifest entry {idx} has no resume_file")
+        entry.setdefault("id", os.path.splitext(os.path.basename(entry["resume_file"]))[0])
+    return entries
+
+
+# -------- Selection policies (replace the interactive prompts) --------
+def select_roles(phase1_data: Dict, entry: Dict, policy: str, max_roles: int) -> List[str]:
+    good = phase1_data.get("good_fit_roles", [])
+    stretch = phase1_data.get("stretch_roles", [])
+    if entry.get("selected_roles"):
+        roles = entry["selected_roles"]
+    elif policy == "good_and_stretch":
+        roles = good + stretch
+    elif policy == "preferred":
+        # preferred roles that Phase 1 did not mark as poor fit
+        poor = {r.lower() for r in phase1_data.get("poor_fit_roles", [])}
+        roles = [r for r in entry.get("preferred_roles", []) if r.lower() not in poor]
+    else:
+        roles = good
+    # same fallback as the CLI: first good-fit role
+    return roles[:max_roles] or good[:1] or entry.get("preferred_roles", [])[:1]
+
+
+def select_experience_level(phase1_data: Dict, entry: Dict) -> str:
+    level = entry.get("experience_level") or phase1_data.get("profile", {}).get("experience_level")
+    return level if level in EXPERIENCE_LEVELS else DEFAULT_EXPERIENCE_LEVEL
+
+
+def select_jobs(jobs: List[Dict], policy: str, jobs_per_resume: int) -> List[Dict]:
+    if policy == "none":
+        return []
+    return jobs[:jobs_per_resume]
+
+
+# -------- One manifest entry (runs in a worker process) --------
+def run_entry(entry: Dict, options: Dict) -> Dict:
+    import crew1
+    import crew2
+
+    timings: Dict[str, float] = {}
+    result: Dict = {"id": entry["id"], "resume_file": entry["resume_file"]}
+    start = time.perf_counter()
+    try:
+        t = time.perf_counter()
+        phase1_data = crew1.run_phase1({
+            "resume_file": entry["resume_file"],
+            "preferred_roles": entry.get("preferred_roles", []),
+            "preferred_domains": entry.get("preferred_domains", []),
+        })
+        timings["phase1"] = time.perf_counter() - t
+        result["phase1"] = phase1_data
+
+        roles = select_roles(phase1_data, entry, options["role_policy"], options["max_roles"])
+        location = entry.get("location") or DEFAULT_LOCATION
+        experience_level = select_experience_level(phase1_data, entry)
+        result["search"] = {"roles": roles, "location": location, "experience_level": experience_level}
+
+        t = time.perf_counter()
+        jobs = crew2.run_job_search(
+            roles, location, experience_level, resume_file=entry["resume_file"],
+            skills=phase1_data.get("profile", {}).get("skills"),
+            profile=phase1_data.get("profile"),
+        )
+        timings["phase2a"] = time.perf_counter() - t
+        result["jobs"] = jobs
+
+        t = time.perf_counter()
+        result["optimizations"] = [
+            {"job": job, "suggestions": crew2.run_resume_optimization(job, resume_file=entry["resume_file"])}
+            for job in select_jobs(jobs, options["job_policy"], options["jobs_per_resume"])
+        ]
+        timings["phase2b"] = time.perf_counter() - t
+        result["status"] = "ok"
+    except Exception as e:
+        # one bad resume must not stop the night's batch
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+
+    timings["total"] = time.perf_counter() - start
+    result["timings"] = {k: round(v, 3) for k, v in timings.items()}
+    # worker processes skip atexit, so write this worker's trace file now
+    tracing.flush()
+    return result
+
+
+def run_batch(entries: List[Dict], out_path: str, workers: int, options: Dict) -> Dict[str, int]:
+    counts = {"ok": 0, "error": 0}
+    with open(out_path, "a") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_entry, entry, options): entry for entry in entries}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # the worker process itself died
+                entry = futures[future]
+                result = {"id": entry["id"], "resume_file": entry["resume_file"],
+                          "status": "error", "error": f"{type(e).__name__}: {e}"}
+            counts[result["status"]] += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            print(f"[{counts['ok'] + counts['error']}/{len(entries)}] {result['id']}: {result['status']}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the JobHunt pipeline over a manifest of resumes.")
+    parser.add_argument("manifest", help="JSONL (or JSON list) of resume entries")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes")
+    parser.add_argument("--role-policy", choices=ROLE_POLICIES, default="good_fit")
+    parser.add_argument("--max-roles", type=int, default=3)
+    parser.add_argument("--job-policy", choices=JOB_POLICIES, default="top")
+    parser.add_argument("--jobs-per-resume", type=int, default=1)
+    args = parser.parse_args()
+
+    entries = load_manifest(args.manifest)
+    options = {
+        "role_policy": args.role_policy,
+        "max_roles": args.max_roles,
+        "job_policy": args.job_policy,
+        "jobs_per_resume": args.jobs_per_resume,
+    }
+    print(f"Processing {len(entries)} resumes with {args.workers} workers → {args.out}")
+    counts = run_batch(entries, args.out, args.workers, options)
+    print(f"\nDone: {counts['ok']} ok, {counts['error']} failed")
+
+
+if __name__ == "__main__":
+    main()
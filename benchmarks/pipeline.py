@@ -0,0 +1,397 @@
+"""
+Offline pipeline benchmark: Phase 1, 2A and 2B without API keys.
+
+The Gemini clients are replaced by a deterministic stub LLM that answers each
+task from the fixtures, Serper `jobs` responses are replayed from
+fixtures/serper_jobs.json, and the resume PDF is generated from
+fixtures/resume.txt. Everything else (JobSearchTool, PDFSearchTool, the
+crews in crew1.py and crew2.py) runs for real, against a throwaway cache and
+Chroma directory so every run starts cold.
+
+Reported per phase: wall time, LLM calls, tool calls requested by agents,
+Serper calls and peak Python memory (tracemalloc). The last line is JSON;
+save it with --json-out and pass it to --compare on a later commit.
+
+`--mode pdf-search` sets RESUME_FULL_CONTEXT_MAX_CHARS=0, so agents read the
+resume through PDFSearchTool (chunking, embeddings, Chroma) instead of getting
+the whole text; the default `full-context` mode never reaches that path.
+
+Usage:
+    python benchmarks/pipeline.py [--runs 3] [--json-out base.json] [--compare base.json]
+    python benchmarks/pipeline.py --mode pdf-search   # measure the PDFSearchTool path
+    python benchmarks/pipeline.py --record   # refresh Serper fixtures (needs SERPER_API_KEY)
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+SERPER_FIXTURE = os.path.join(FIXTURES, "serper_jobs.json")
+RESUME_FIXTURE = os.path.join(FIXTURES, "resume.txt")
+
+# how agents read the resume: whole text in the prompt, or through PDFSearchTool
+RESUME_MODES: Dict[str, Dict[str, str]] = {
+    "full-context": {},
+    "pdf-search": {"RESUME_FULL_CONTEXT_MAX_CHARS": "0"},
+}
+
+# queries in serper_jobs.json are recorded for exactly these inputs
+SCENARIO = {
+    "preferred_roles": ["Machine Learning Engineer", "Data Scientist", "Backend Engineer"],
+    "preferred_domains": ["AI", "FinTech"],
+    "location": "Bengaluru",
+    "experience_level": "mid",
+}
+PHASES = ("phase1", "phase2a", "phase2b")
+
+# task descriptions in tasks.py that tell the stub which answer to give
+TASK_MARKERS = {
+    "resume_parsing": "already extracted locally",
+    "career_fit": "Classify each role into good fit",
+    "role_fit": "Classify only this role",
+    "job_search": "multi-role job search tool ONCE",
+    "resume_optimizer": "Provide targeted resume improvements",
+}
+
+counters: Counter = Counter()
+
+
+# -------- Resume fixture --------
+def write_resume_pdf(text_path: str, pdf_path: str) -> None:
+    """Write a one-page text PDF (no PDF library needed to create it)."""
+    with open(text_path, encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f]
+
+    def escape(line: str) -> str:
+        line = line.replace("•", "-")
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    stream = "BT /F1 10 Tf 14 TL 50 780 Td\n" + "".join(f"({escape(l)}) Tj T*\n" for l in lines) + "ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(pdf_path, "wb") as f:
+        f.write(out)
+
+
+# -------- Serper record/replay --------
+class ReplaySerper:
+    """Stands in for SerperJobsClient: answers from recorded responses by query and page."""
+
+    def __init__(self, path: str = SERPER_FIXTURE, record: bool = False):
+        self.path = path
+        self.record = record
+        with open(path) as f:
+            self.responses: Dict[str, Dict] = json.load(f)
+        self._live = None
+
+    def run(self, search_query: str, page: int = 1):
+        counters["serper_calls"] += 1
+        key = search_query if page == 1 else f"{search_query} [page {page}]"
+        if self.record:
+            if self._live is None:
+                from tools import SerperJobsClient
+                self._live = SerperJobsClient()
+            self.responses[key] = self._live.run(search_query=search_query, page=page)
+            with open(self.path, "w") as f:
+                json.dump(self.responses, f, indent=2)
+        if key not in self.responses:
+            raise KeyError(f"No recorded Serper response for '{key}' (re-run with --record)")
+        return json.dumps(self.responses[key])
+
+
+# -------- Stub LLM --------
+def _final(answer: Dict) -> str:
+    return "Thought: I now know the final answer\nFinal Answer: " + json.dumps(answer)
+
+
+def _action(prompt: str, hint: str, arguments: Dict) -> str:
+    # use the tool name exactly as crewai listed it in the prompt
+    names = re.findall(r"Tool Name: ([^\n]+)", prompt)
+    name = next((n.strip() for n in names if hint in n.lower()), names[0].strip() if names else hint)
+    counters["tool_calls"] += 1
+    return f"Thought: I should use the tool\nAction: {name}\nAction Input: {json.dumps(arguments)}"
+
+
+def _last_observation(prompt: str):
+    idx = prompt.rfind("Observation:")
+    try:
+        return json.JSONDecoder().raw_decode(prompt[idx + len("Observation:"):].lstrip())[0]
+    except ValueError:
+        return {}
+
+
+def stub_reply(prompt: str) -> str:
+    """Deterministic answer for whichever task the prompt belongs to."""
+    counters["llm_calls"] += 1
+    task = next((name for name, marker in TASK_MARKERS.items() if marker in prompt), None)
+    observed = "Observation:" in prompt
+
+    if task == "resume_parsing":
+        return _final({"skills": [], "domains": [], "experience_level": SCENARIO["experience_level"],
+                       "projects": [], "strengths": ["Problem Solving"]})
+    if task == "career_fit":
+        roles = SCENARIO["preferred_roles"]
+        return _final({"good_fit_roles": roles[:2], "stretch_roles": roles[2:], "poor_fit_roles": [],
+                       "skill_gaps": ["Kubernetes"], "reasoning": "Stub career fit."})
+    if task == "role_fit":
+        match = re.search(r"Role to evaluate: (.+?)\. Classify", prompt)
+        role = match.group(1) if match else ""
+        good = role in SCENARIO["preferred_roles"][:2]
+        return _final({"role": role, "fit": "good" if good else "stretch",
+                       "skill_gaps": [] if good else ["Kubernetes"], "reasoning": "Stub role fit."})
+    if task == "job_search":
+        if not observed:
+            return _action(prompt, "job", {
+                "roles": SCENARIO["preferred_roles"][:2],
+                "location": SCENARIO["location"],
+                "experience_level": SCENARIO["experience_level"],
+                "skills": ["Python", "PyTorch", "SQL"],
+            })
+        return _final({"jobs": _last_observation(prompt).get("jobs", [])})
+    if task == "resume_optimizer":
+        # in full-context mode the resume is inlined and there is no tool to call
+        if not observed and "<resume>" not in prompt:
+            return _action(prompt, "pdf", {"query": "experience and projects"})
+        return _final({
+            "section_improvements": {"summary": ["Lead with fraud and RAG impact."], "experience": [],
+                                     "projects": [], "skills": ["Group ML and MLOps tools."]},
+            "rewritten_bullets": [{"before": "Built a fraud detection model",
+                                   "after": "Built an XGBoost fraud model that cut chargebacks 18%"}],
+            "keywords_to_add": ["MLOps"],
+            "keywords_to_remove": [],
+        })
+    # output repair or anything unexpected: an empty (schema-valid) document
+    return "{}"
+
+
+def build_stub_llm(model: str, temperature: float, cache: bool = False):
+    """Stub for llms._build_llm: a crewai BaseLLM when available, else a langchain chat model."""
+    try:
+        from crewai.llms.base_llm import BaseLLM
+    except ImportError:
+        BaseLLM = None
+
+    if BaseLLM is not None:
+        class StubLLM(BaseLLM):
+            def call(self, messages, *args, **kwargs):
+                if isinstance(messages, str):
+                    return stub_reply(messages)
+                return stub_reply("\n".join(str(m.get("content", "")) for m in messages))
+
+            def supports_function_calling(self) -> bool:
+                return False
+
+        return StubLLM(model=f"stub/{model}", temperature=temperature)
+
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class StubChatModel(BaseChatModel):
+        model_name: str = f"stub/{model}"
+
+        @property
+        def _llm_type(self) -> str:
+            return "jobhunt-stub"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            text = stub_reply("\n".join(str(m.content) for m in messages))
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    return StubChatModel()
+
+
+# -------- One offline run --------
+def configure_environment(workdir: str, mode: str = "full-context") -> str:
+    """Point every cache at `workdir`; must run before the app modules are imported."""
+    pdf_path = os.path.join(workdir, "resume.pdf")
+    write_resume_pdf(RESUME_FIXTURE, pdf_path)
+    os.environ.update({
+        "JOBHUNT_CACHE_PATH": os.path.join(workdir, "jobhunt.sqlite3"),
+        "CHROMA_DIR": os.path.join(workdir, "chroma"),
+        "CHECKPOINTS": "0",
+        "SCORING_EMBEDDER": "hashing",
+        "RESUME_PDF": pdf_path,
+        **RESUME_MODES[mode],
+    })
+    # clients check that keys exist; the stubs never send them anywhere
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ.setdefault("SERPER_API_KEY", "offline-benchmark")
+    return pdf_path
+
+
+def install_stubs(record: bool) -> None:
+    import embeddings
+    import llms
+    import registry
+    from scoring import HashingEmbedder
+
+    llms._build_llm = build_stub_llm
+
+    # resume chunks are embedded locally instead of through the Google API
+    install_embedding_cache = embeddings.install_embedding_cache
+
+    def offline_embedding_cache(app, model):
+        app.embedding_model.set_embedding_fn(HashingEmbedder(dim=768))
+        return install_embedding_cache(app, "offline-hashing")
+
+    embeddings.install_embedding_cache = offline_embedding_cache
+
+    import tools  # noqa: F401  (registers the tool factories)
+    registry.get("job_search_tool")._serper = ReplaySerper(record=record)
+
+
+def measure(phase: str, results: Dict, fn):
+    before = Counter(counters)
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    value = fn()
+    wall = time.perf_counter() - start
+    delta = Counter(counters)
+    delta.subtract(before)
+    results[phase] = {
+        "wall_s": round(wall, 3),
+        "llm_calls": delta["llm_calls"],
+        "tool_calls": delta["tool_calls"],
+        "serper_calls": delta["serper_calls"],
+        "peak_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1),
+    }
+    return value
+
+
+def run_once(record: bool = False, mode: str = "full-context") -> Dict:
+    with tempfile.TemporaryDirectory(prefix="jobhunt-bench-") as workdir:
+        pdf_path = configure_environment(workdir, mode)
+        sys.path.insert(0, REPO_ROOT)
+        install_stubs(record)
+        import crew1
+        import crew2
+
+        results: Dict = {}
+        tracemalloc.start()
+        try:
+            phase1 = measure("phase1", results, lambda: crew1.run_phase1({
+                "resume_file": pdf_path,
+                "preferred_roles": SCENARIO["preferred_roles"],
+                "preferred_domains": SCENARIO["preferred_domains"],
+            }))
+            jobs = measure("phase2a", results, lambda: crew2.run_job_search(
+                phase1["good_fit_roles"], SCENARIO["location"], SCENARIO["experience_level"],
+                resume_file=pdf_path, skills=phase1["profile"].get("skills"), profile=phase1["profile"],
+            ))
+            if not jobs:
+                raise RuntimeError("Phase 2A returned no jobs; the fixtures and SCENARIO are out of sync")
+            measure("phase2b", results, lambda: crew2.run_resume_optimization(jobs[0], resume_file=pdf_path))
+        finally:
+            tracemalloc.stop()
+        return results
+
+
+def run_isolated(runs: int, record: bool, mode: str = "full-context") -> List[Dict]:
+    """Each run gets a fresh interpreter, so imports and module state start cold."""
+    import subprocess
+
+    samples = []
+    for _ in range(runs):
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", "--mode", mode]
+        cmd += ["--record"] if record else []
+        out = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            sys.stderr.write(out.stdout[-4000:] + out.stderr[-4000:])
+            raise SystemExit(f"Benchmark run failed with exit code {out.returncode}")
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        record = False  # one recording pass is enough
+    return samples
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    summary = {}
+    for phase in PHASES:
+        runs = [s[phase] for s in samples]
+        summary[phase] = {
+            "wall_s": round(statistics.median(r["wall_s"] for r in runs), 3),
+            "wall_s_min": min(r["wall_s"] for r in runs),
+            # counts are deterministic with the stubs; a change means behaviour changed
+            "llm_calls": runs[-1]["llm_calls"],
+            "tool_calls": runs[-1]["tool_calls"],
+            "serper_calls": runs[-1]["serper_calls"],
+            "peak_mb": max(r["peak_mb"] for r in runs),
+        }
+    summary["total_wall_s"] = round(sum(summary[p]["wall_s"] for p in PHASES), 3)
+    return summary
+
+
+def print_summary(summary: Dict, baseline: Dict = None) -> None:
+    print(f"{'phase':<9}{'wall s':>9}{'llm':>6}{'tools':>7}{'serper':>8}{'peak MB':>9}")
+    for phase in PHASES:
+        row = summary[phase]
+        line = (f"{phase:<9}{row['wall_s']:>9.3f}{row['llm_calls']:>6}{row['tool_calls']:>7}"
+                f"{row['serper_calls']:>8}{row['peak_mb']:>9.1f}")
+        if baseline and phase in baseline:
+            old = baseline[phase]
+            change = (row["wall_s"] - old["wall_s"]) / old["wall_s"] if old["wall_s"] else 0.0
+            line += f"   wall {change:+.1%}, llm {row['llm_calls'] - old['llm_calls']:+d}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--record", action="store_true", help="call the real Serper API and update the fixtures")
+    parser.add_argument("--json-out", help="write the summary JSON here")
+    parser.add_argument("--compare", help="summary JSON from an earlier commit to diff against")
+    parser.add_argument("--mode", choices=sorted(RESUME_MODES), default="full-context",
+                        help="pdf-search forces the PDFSearchTool/embedding path (RESUME_FULL_CONTEXT_MAX_CHARS=0)")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_once(record=args.record, mode=args.mode)))
+        return
+
+    summary = summarize(run_isolated(args.runs, args.record, args.mode))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline = saved["pipeline"]
+        # older summaries have no mode; they were all full-context runs
+        if saved.get("mode", "full-context") != args.mode:
+            print(f"⚠️  Comparing {args.mode} against a {saved.get('mode', 'full-context')} baseline")
+    print(f"mode: {args.mode}")
+    print_summary(summary, baseline)
+    result = {"pipeline": summary, "mode": args.mode}
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(result, f, indent=2)
+
+    # machine-readable line for comparing commits
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
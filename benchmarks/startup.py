@@ -0,0 +1,67 @@
+"""
+Startup benchmark: import-to-first-prompt time.
+
+Each sample runs a fresh interpreter, imports the given modules and stops the
+clock where the CLI would show its first prompt. Nothing is built or called,
+so no API keys are needed.
+
+Usage:
+    python benchmarks/startup.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "tools": "import tools",
+    "agents": "import agents",
+    "tasks": "import tasks",
+    "crew1": "import crew1",
+    "first_prompt": "import crew1, crew2",
+}
+
+SNIPPET = (
+    "import time, json\n"
+    "t0 = time.perf_counter()\n"
+    "{stmt}\n"
+    "print(json.dumps(time.perf_counter() - t0))\n"
+)
+
+
+def time_import(stmt: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(stmt=stmt)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for name, stmt in TARGETS.items():
+        samples = [time_import(stmt) for _ in range(args.runs)]
+        results[name] = {
+            "min_ms": round(min(samples) * 1000, 1),
+            "median_ms": round(statistics.median(samples) * 1000, 1),
+        }
+        print(f"{name:<14} min {results[name]['min_ms']:>8.1f} ms   "
+              f"median {results[name]['median_ms']:>8.1f} ms")
+
+    # machine-readable line for comparing commits
+    print(json.dumps({"startup": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Checkpoint store for phase outputs.
+
+Each phase result (Phase 1 career fit, the role/location selection, Phase 2A
+jobs) is saved in SQLite under a hash of the phase inputs and the resume file
+contents. A later run with the same inputs loads the checkpoint instead of
+running the crew again, so Phase 2 can be re-run without paying for Phase 1.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from cache import SQLiteCache, DEFAULT_CACHE_PATH
+from embeddings import file_digest
+
+CHECKPOINTS_ENABLED = os.environ.get("CHECKPOINTS", "1") != "0"
+
+# job listings go stale much faster than a resume analysis
+CHECKPOINT_TTL_SECONDS: Dict[str, float] = {
+    "phase1": float(os.environ.get("PHASE1_CHECKPOINT_TTL_SECONDS", 7 * 24 * 60 * 60)),
+    "selection": float(os.environ.get("PHASE1_CHECKPOINT_TTL_SECONDS", 7 * 24 * 60 * 60)),
+    "jobs": float(os.environ.get("JOBS_CHECKPOINT_TTL_SECONDS", 6 * 60 * 60)),
+}
+CHECKPOINT_MAX_ENTRIES = 1000
+
+
+def resume_digest(resume_file: Optional[str]) -> Optional[str]:
+    if resume_file and os.path.exists(resume_file):
+        return file_digest(resume_file)
+    return resume_file
+
+
+def checkpoint_key(phase: str, inputs: Dict, resume_file: Optional[str] = None) -> str:
+    payload = json.dumps(
+        {"phase": phase, "inputs": inputs, "resume": resume_digest(resume_file)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, enabled: bool = CHECKPOINTS_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._caches: Dict[str, SQLiteCache] = {}
+
+    def _cache(self, phase: str) -> SQLiteCache:
+        if phase not in self._caches:
+            self._caches[phase] = SQLiteCache(
+                f"checkpoint:{phase}",
+                path=self.path,
+                ttl_seconds=CHECKPOINT_TTL_SECONDS.get(phase),
+                max_entries=CHECKPOINT_MAX_ENTRIES,
+            )
+        return self._caches[phase]
+
+    def load(self, phase: str, inputs: Dict, resume_file: Optional[str] = None) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        return self._cache(phase).get(checkpoint_key(phase, inputs, resume_file))
+
+    def save(self, phase: str, inputs: Dict, value: Any, resume_file: Optional[str] = None) -> None:
+        if self.enabled:
+            self._cache(phase).set(checkpoint_key(phase, inputs, resume_file), value)
+
+    def load_or_run(self, phase: str, inputs: Dict, compute: Callable[[], Any],
+                    resume_file: Optional[str] = None,
+                    should_save: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Checkpointed value, else compute() (saved only when should_save(value))."""
+        value = self.load(phase, inputs, resume_file)
+        if value is not None:
+            print(f"♻️  Loaded {phase} checkpoint, skipping recompute")
+            return value
+        value = compute()
+        if should_save(value):
+            self.save(phase, inputs, value, resume_file)
+        return value
+
+
+checkpoint_store = CheckpointStore()
@@ -0,0 +1,187 @@
+"""
+Token-budgeted task inputs.
+
+Crew inputs are interpolated into task descriptions, and crewai resends the
+description and expected_output on every agent iteration. Before a kickoff,
+compact_inputs() reduces each structured input to the fields its task reads,
+as compact JSON, and trims it until the task's budget is met:
+
+- career fit (all roles or one role): the resume profile without project
+  impact text; strengths, project tech and list tails are dropped as needed
+- job search: the resume skills, cut from the end
+- resume optimization: the selected job's title, company and location
+
+Repeated list entries (the same skill in two spellings of case, a project
+listed twice) are dropped before anything is trimmed.
+
+compact_schema() strips the whitespace from expected_output schemas; each
+schema appears once per prompt, so minifying is all there is to do there.
+
+Every kickoff prints the estimated tokens (llms.estimate_tokens) of the whole
+rendered prompt, before and after compaction: agent role, goal and backstory,
+task description and expected_output, with the inputs filled in.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+from llms import estimate_tokens
+
+PROMPT_COMPACTION = os.environ.get("PROMPT_COMPACTION", "1") != "0"
+# estimated tokens for a task's structured inputs (resume text is not counted)
+TASK_INPUT_BUDGETS: Dict[str, int] = {
+    "career_fit": int(os.environ.get("PROMPT_BUDGET_CAREER_FIT", 800)),
+    "role_fit": int(os.environ.get("PROMPT_BUDGET_ROLE_FIT", 600)),
+    "job_search": int(os.environ.get("PROMPT_BUDGET_JOB_SEARCH", 150)),
+    "resume_optimizer": int(os.environ.get("PROMPT_BUDGET_RESUME_OPTIMIZER", 100)),
+}
+# inputs passed through as they are (free text the task needs whole)
+UNCOUNTED_INPUTS = {"resume_context", "resume_file"}
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_schema(text: str) -> str:
+    """expected_output schema without indentation (unchanged when compaction is off)."""
+    if not PROMPT_COMPACTION:
+        return text
+    try:
+        return compact_json(json.loads(text))
+    except ValueError:
+        return " ".join(text.split())
+
+
+def _as_text(value) -> str:
+    return value if isinstance(value, str) else compact_json(value)
+
+
+def input_tokens(inputs: Dict) -> int:
+    return sum(estimate_tokens(_as_text(v)) for k, v in inputs.items() if k not in UNCOUNTED_INPUTS)
+
+
+# -------- Rendered prompt --------
+def prompt_template(crew) -> str:
+    """What crewai sends for `crew` before {inputs} are filled in (agents, then tasks)."""
+    parts: List[str] = []
+    # crewai fills placeholders in place, keeping the original text in _original_*
+    for agent in getattr(crew, "agents", []):
+        for field in ("role", "goal", "backstory"):
+            parts.append(getattr(agent, f"_original_{field}", None) or getattr(agent, field, "") or "")
+    for task in getattr(crew, "tasks", []):
+        for field in ("description", "expected_output"):
+            parts.append(getattr(task, f"_original_{field}", None) or getattr(task, field, "") or "")
+    return "\n".join(parts)
+
+
+def render_prompt(template: str, inputs: Dict) -> str:
+    for key, value in inputs.items():
+        template = template.replace("{" + key + "}", _as_text(value))
+    return template
+
+
+# -------- Per-input compactors --------
+def unique(items: List, key=lambda item: item) -> List:
+    """Items in order, dropping repeats by key(item), compared case-insensitively."""
+    seen = set()
+    kept = []
+    for item in items:
+        k = " ".join(str(key(item)).lower().split())
+        if k not in seen:
+            seen.add(k)
+            kept.append(item)
+    return kept
+
+
+def fit_profile(profile: Dict, budget: int) -> str:
+    """Profile fields career fit reads, with detail dropped until it fits `budget`."""
+    projects = [p for p in profile.get("projects", []) if isinstance(p, dict)]
+    data = {
+        "experience_level": profile.get("experience_level"),
+        "skills": unique(profile.get("skills", [])),
+        "domains": unique(profile.get("domains", [])),
+        "projects": [{"title": p.get("title", ""), "tech": unique(p.get("tech", []))}
+                     for p in unique(projects, key=lambda p: p.get("title", ""))],
+        "strengths": unique(profile.get("strengths", [])),
+    }
+    text = compact_json(data)
+    # least useful first: strengths, then project tech, then the tails of the longest lists
+    for drop in ("strengths", "tech"):
+        if estimate_tokens(text) <= budget:
+            return text
+        if drop == "strengths":
+            data.pop("strengths")
+        else:
+            data["projects"] = [p["title"] for p in data["projects"]]
+        text = compact_json(data)
+    while estimate_tokens(text) > budget:
+        longest = max(("skills", "domains", "projects"), key=lambda k: len(data[k]))
+        if len(data[longest]) <= 1:
+            break
+        data[longest] = data[longest][:len(data[longest]) // 2]
+        text = compact_json(data)
+    return text
+
+
+def fit_list(items: List[str], budget: int) -> str:
+    """Comma-separated distinct items, keeping as many leading ones as fit `budget`."""
+    kept: List[str] = []
+    for item in unique(items):
+        if estimate_tokens(", ".join(kept + [item])) > budget:
+            break
+        kept.append(item)
+    return ", ".join(kept) or "none"
+
+
+def fit_job(job: Dict) -> str:
+    """The parts of a posting that tailoring a resume uses."""
+    return compact_json({k: job.get(k) for k in ("title", "company", "location") if job.get(k)})
+
+
+# -------- Task inputs --------
+def compact_inputs(task: str, inputs: Dict, crew=None) -> Dict:
+    """Inputs for `task` with structured values compacted to its budget.
+
+    Structured values (profile, skills list, job) may be passed as dicts/lists;
+    with PROMPT_COMPACTION=0 they are only serialized. `crew` is the crew about
+    to be kicked off, for the prompt token counts printed.
+    """
+    budget = TASK_INPUT_BUDGETS.get(task)
+    # what the task would be sent without compaction
+    serialized = {k: _serialize(k, v) for k, v in inputs.items()}
+    if not PROMPT_COMPACTION or budget is None:
+        _report(task, crew, serialized, serialized, None)
+        return serialized
+
+    compacted = dict(inputs)
+    # what is left of the budget goes to the one structured input each task has
+    def remaining(key: str) -> int:
+        return max(budget - input_tokens({k: _serialize(k, v) for k, v in inputs.items() if k != key}), 1)
+
+    if isinstance(inputs.get("resume_profile"), dict):
+        compacted["resume_profile"] = fit_profile(inputs["resume_profile"], remaining("resume_profile"))
+    if isinstance(inputs.get("resume_skills"), list):
+        compacted["resume_skills"] = fit_list(inputs["resume_skills"], remaining("resume_skills"))
+    if isinstance(inputs.get("selected_job"), dict):
+        compacted["selected_job"] = fit_job(inputs["selected_job"])
+    compacted = {k: _serialize(k, v) for k, v in compacted.items()}
+    _report(task, crew, serialized, compacted, budget)
+    return compacted
+
+
+def _report(task: str, crew, before: Dict, after: Dict, budget: Optional[int]) -> None:
+    # without a crew, count the inputs on their own
+    template = prompt_template(crew) if crew is not None else " ".join("{%s}" % k for k in before)
+    tokens_before = estimate_tokens(render_prompt(template, before))
+    tokens_after = estimate_tokens(render_prompt(template, after))
+    note = f"input budget {budget}" if budget is not None else "not compacted"
+    print(f"🗜️  {task} prompt: ~{tokens_before} → ~{tokens_after} tokens ({note})")
+
+
+def _serialize(key: str, value):
+    if isinstance(value, str) or key in UNCOUNTED_INPUTS:
+        return value
+    if key == "resume_skills" and isinstance(value, list):
+        return ", ".join(value) or "none"
+    return json.dumps(value)
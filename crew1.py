@@ -1,113 +1,296 @@
-from tools import job_search_tool, resume_reader_tool
-from agents import job_search_agent, resume_optimizer_agent, resume_parser_agent, career_fit_agent
-from tasks import job_search_task, resume_optimizer_task, resume_parsing_task, career_fit_task
-from crewai import Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
-from dotenv import load_dotenv
-import os
+import registry
+import tracing
+from compaction import compact_inputs
+from checkpoints import checkpoint_store
+from outputs import CareerFit, ResumeProfile, RoleFit, parse_crew_output
+from resume_parser import PROFILE_FIELDS, fast_parse_resume
+from settings import CAREER_FIT_MAX_CONCURRENCY, RESUME_PDF, RESUME_FAST_PATH
 
-load_dotenv()
-google_api_key = os.environ["GOOGLE_API_KEY"]
+# Crew, agents and LLM clients are built lazily on first kickoff (see registry.py),
+# so importing this module or showing the first prompt does not wait on them.
 
-# Phase 1 crew
-from crewai import Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI
+PHASE1_INPUTS = {
+    "resume_file": RESUME_PDF,
+    "preferred_roles": ["ML Engineer", "Data Scientist"],
+    "preferred_domains": ["AI", "FinTech"]
+}
+
+
+# Phase 1 crews: resume parsing only runs when the local parser left gaps
+@registry.register("resume_parsing_crew")
+def build_resume_parsing_crew():
+    from crewai import Crew, Process
+    from agents import resume_parser_agent
+    from tasks import resume_parsing_task
+
+    return Crew(
+        agents=[resume_parser_agent],
+        tasks=[resume_parsing_task],
+        process=Process.sequential,
+        verbose=True
+    )
+
+
+@registry.register("career_fit_crew")
+def build_career_fit_crew():
+    from crewai import Crew, Process
+    from agents import career_fit_agent
+    from tasks import career_fit_task
+
+    return Crew(
+        agents=[career_fit_agent],
+        tasks=[career_fit_task],
+        process=Process.sequential,
+        verbose=True
+    )
 
-phase1_crew = Crew(
-    agents=[resume_parser_agent, career_fit_agent],
-    tasks=[resume_parsing_task, career_fit_task],
-    manager_llm=ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0.3,
-        google_api_key=google_api_key
-    ),
-    process=Process.sequential,
-    verbose=True
-)
 
 # -------- PHASE 1 RUN --------
-print("=" * 60)
-print("PHASE 1: CAREER DISCOVERY")
-print("=" * 60)
+def parse_resume(resume_file: str) -> dict:
+    """Resume profile: local fast path first, the agent only for missing fields."""
+    from tools import resume_context
 
-phase1_inputs = {
-    "resume_file": "/Users/apple/Desktop/jobhunt-crewai/resume.pdf",
-    "preferred_roles": ["ML Engineer", "Data Scientist"],
-    "preferred_domains": ["AI", "FinTech"]
-}
+    profile, missing = {}, list(PROFILE_FIELDS)
+    if RESUME_FAST_PATH:
+        profile, missing = fast_parse_resume(resume_file)
+    if not missing:
+        print("⚡ Resume parsed locally, no LLM calls needed")
+        return profile
 
-print("\n📄 Analyzing resume...")
-print(f"Resume file: {phase1_inputs['resume_file']}")
-print(f"Preferred roles: {phase1_inputs['preferred_roles']}")
-print(f"Preferred domains: {phase1_inputs['preferred_domains']}\n")
+    print(f"🤖 Resume parser agent filling: {', '.join(missing)}")
+    crew = registry.get("resume_parsing_crew")
+    result = tracing.kickoff("resume_parsing_crew", crew, compact_inputs("resume_parsing", {
+        "resume_file": resume_file,
+        "known_profile": json.dumps(profile),
+        "missing_fields": ", ".join(missing),
+        "resume_context": resume_context(),
+    }, crew))
+    # the agent's answer is used for exactly the fields it was asked to fill;
+    # anything low-confidence locally is in `missing`, not in `profile`
+    parsed = parse_crew_output(result, ResumeProfile)
+    return {**profile, **{f: parsed[f] for f in missing if f in parsed}}
 
-phase1_result = phase1_crew.kickoff(inputs=phase1_inputs)
 
-import json
+def run_phase1(phase1_inputs: dict) -> dict:
+    """Career fit for the resume, loaded from a checkpoint when inputs and resume are unchanged."""
+    key_inputs = {
+        "preferred_roles": phase1_inputs["preferred_roles"],
+        "preferred_domains": phase1_inputs["preferred_domains"],
+    }
+    return checkpoint_store.load_or_run(
+        "phase1", key_inputs, lambda: _compute_phase1(phase1_inputs),
+        resume_file=phase1_inputs["resume_file"],
+    )
+
+
+def _compute_phase1(phase1_inputs: dict) -> dict:
+    from tools import use_resume
+    use_resume(phase1_inputs["resume_file"])
+    profile = parse_resume(phase1_inputs["resume_file"])
+
+    if phase1_inputs["preferred_roles"]:
+        phase1_data = evaluate_roles(profile, phase1_inputs["preferred_roles"], phase1_inputs["preferred_domains"])
+    else:
+        # no roles to split on: let the combined task suggest them from the domains
+        phase1_data = _career_fit(profile, phase1_inputs)
+    # later stages (job ranking, scoring) reuse the parsed profile
+    phase1_data["profile"] = profile
+    return phase1_data
+
+
+def _career_fit(profile: dict, phase1_inputs: dict) -> dict:
+    """All roles in one career_fit_task (the fallback for roles that failed on their own)."""
+    crew = registry.get("career_fit_crew")
+    result = tracing.kickoff("career_fit_crew", crew, compact_inputs("career_fit", {
+        **phase1_inputs,
+        "resume_profile": profile,
+    }, crew))
+    return parse_crew_output(result, CareerFit)
+
+
+# -------- Per-role career fit --------
+FIT_KEYS = {"good": "good_fit_roles", "stretch": "stretch_roles", "poor": "poor_fit_roles"}
 
-# Access the output correctly from CrewOutput
-phase1_output = phase1_result.raw if hasattr(phase1_result, 'raw') else str(phase1_result)
 
-# Clean JSON from markdown code blocks if present
-if "```json" in phase1_output:
-    phase1_output = phase1_output.split("```json")[1].split("```")[0].strip()
-elif "```" in phase1_output:
-    phase1_output = phase1_output.split("```")[1].split("```")[0].strip()
+def _evaluate_role(profile: dict, role: str, preferred_domains: List[str]) -> dict:
+    # each role gets its own agent, task and crew; the shared ones are not safe
+    # to kick off from several threads at once
+    from crewai import Crew, Process
+    from agents import build_career_fit_agent
+    from tasks import build_role_fit_task
 
-phase1_data = json.loads(phase1_output)
+    agent = build_career_fit_agent(verbose=False)
+    crew = Crew(agents=[agent], tasks=[build_role_fit_task(agent)], process=Process.sequential, verbose=False)
+    result = tracing.kickoff("role_fit_crew", crew, compact_inputs("role_fit", {
+        "resume_profile": profile,
+        "preferred_domains": preferred_domains,
+        "role": role,
+    }, crew))
+    return parse_crew_output(result, RoleFit)
+
+
+def evaluate_roles(profile: dict, roles: List[str], preferred_domains: List[str],
+                   max_concurrency: int = CAREER_FIT_MAX_CONCURRENCY) -> dict:
+    """Classify every role concurrently against the shared profile, then merge."""
+    print(f"🔀 Evaluating {len(roles)} role(s), up to {max_concurrency} at a time")
+    fits: Dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="role_fit") as pool:
+        futures = {role: pool.submit(tracing.in_context(_evaluate_role), profile, role, preferred_domains)
+                   for role in roles}
+        for role, future in futures.items():
+            try:
+                fits[role] = future.result()
+            except Exception as e:
+                print(f"⚠️  Career fit for {role} failed ({e})")
+
+    failed = [role for role in roles if role not in fits]
+    if failed:
+        print(f"🔁 Re-evaluating {', '.join(failed)} in one pass")
+        fallback = _career_fit(profile, {"preferred_roles": failed, "preferred_domains": preferred_domains})
+        for role in failed:
+            fits[role] = _fit_from_career_fit(role, fallback)
+    return merge_role_fits(roles, fits)
+
+
+def _fit_from_career_fit(role: str, career_fit: dict) -> dict:
+    for fit, key in FIT_KEYS.items():
+        if role.lower() in (r.lower() for r in career_fit.get(key, [])):
+            return {"role": role, "fit": fit, "skill_gaps": career_fit.get("skill_gaps", []),
+                    "reasoning": career_fit.get("reasoning", "")}
+    return {"role": role, "fit": "poor", "skill_gaps": [], "reasoning": "Could not be evaluated."}
+
+
+def merge_role_fits(roles: List[str], fits: Dict[str, dict]) -> dict:
+    """CareerFit document from per-role results, in the order the roles were given.
+
+    Roles keep the user's spelling (not the agent's echo); skill gaps are
+    deduplicated case-insensitively, first mention wins.
+    """
+    merged = {**{key: [] for key in FIT_KEYS.values()}, "skill_gaps": []}
+    seen_gaps = set()
+    reasons = []
+    for role in roles:
+        fit = fits[role]
+        merged[FIT_KEYS[fit["fit"]]].append(role)
+        for gap in fit.get("skill_gaps", []):
+            if gap.strip() and gap.strip().lower() not in seen_gaps:
+                seen_gaps.add(gap.strip().lower())
+                merged["skill_gaps"].append(gap.strip())
+        if fit.get("reasoning"):
+            reasons.append(f"{role} ({fit['fit']}): {fit['reasoning']}")
+    merged["reasoning"] = " ".join(reasons)
+    return merged
 
-good_fit_roles = phase1_data["good_fit_roles"]
-stretch_roles = phase1_data["stretch_roles"]
-poor_fit_roles = phase1_data["poor_fit_roles"]
-skill_gaps = phase1_data["skill_gaps"]
-reasoning = phase1_data["reasoning"]
 
 # -------- DISPLAY PHASE 1 RESULTS --------
-print("\n" + "=" * 60)
-print("PHASE 1 RESULTS: CAREER FIT ANALYSIS")
-print("=" * 60)
+def display_phase1_results(phase1_data: dict) -> None:
+    print("\n" + "=" * 60)
+    print("PHASE 1 RESULTS: CAREER FIT ANALYSIS")
+    print("=" * 60)
+
+    print("\n✅ GOOD FIT ROLES:")
+    for role in phase1_data["good_fit_roles"]:
+        print(f"  • {role}")
+
+    print("\n⚡ STRETCH ROLES (need some upskilling):")
+    for role in phase1_data["stretch_roles"]:
+        print(f"  • {role}")
 
-print("\n✅ GOOD FIT ROLES:")
-for role in good_fit_roles:
-    print(f"  • {role}")
+    print("\n❌ POOR FIT ROLES:")
+    for role in phase1_data["poor_fit_roles"]:
+        print(f"  • {role}")
 
-print("\n⚡ STRETCH ROLES (need some upskilling):")
-for role in stretch_roles:
-    print(f"  • {role}")
+    print("\n📊 SKILL GAPS IDENTIFIED:")
+    for gap in phase1_data["skill_gaps"]:
+        print(f"  • {gap}")
 
-print("\n❌ POOR FIT ROLES:")
-for role in poor_fit_roles:
-    print(f"  • {role}")
+    print(f"\n💡 REASONING: {phase1_data['reasoning']}")
 
-print("\n📊 SKILL GAPS IDENTIFIED:")
-for gap in skill_gaps:
-    print(f"  • {gap}")
 
-print(f"\n💡 REASONING: {reasoning}")
+# -------- JOB SEARCH PREFETCH --------
+def start_job_prefetch(phase1_data: dict) -> bool:
+    """Search the top good-fit roles (default location, inferred level) while the user types."""
+    from batch import DEFAULT_LOCATION, select_experience_level
+    from tools import JOB_PREFETCH_ROLES
+
+    roles = phase1_data.get("good_fit_roles", [])[:JOB_PREFETCH_ROLES]
+    if not roles:
+        return False
+    try:
+        registry.get("job_search_tool").prefetch(roles, DEFAULT_LOCATION, select_experience_level(phase1_data, {}))
+    except Exception as e:
+        # only a head start; Phase 2A searches normally without it
+        print(f"⚠️  Could not prefetch job searches: {e}")
+        return False
+    return True
+
 
 # -------- HUMAN INPUT FOR PHASE 2 --------
-print("\n" + "=" * 60)
-print("USER INPUT REQUIRED FOR JOB SEARCH")
-print("=" * 60)
+def prompt_phase2_inputs(phase1_data: dict):
+    from batch import DEFAULT_LOCATION, EXPERIENCE_LEVELS, select_experience_level
+
+    good_fit_roles = phase1_data["good_fit_roles"]
+    stretch_roles = phase1_data["stretch_roles"]
+
+    print("\n" + "=" * 60)
+    print("USER INPUT REQUIRED FOR JOB SEARCH")
+    print("=" * 60)
+
+    # Get selected roles
+    print(f"\nAvailable roles to pursue: {good_fit_roles + stretch_roles}")
+    selected_roles_input = input("Enter roles you want to search for (comma-separated): ").strip()
+    selected_roles = [r.strip() for r in selected_roles_input.split(",")] if selected_roles_input else good_fit_roles[:1]
+
+    # Get location
+    location = input("Enter preferred job location(s) (e.g., 'Remote' or 'Remote; Mumbai; Bangalore'): ").strip() or DEFAULT_LOCATION
+
+    # Get experience level (defaults to the level found in the resume, as prefetched)
+    inferred_level = select_experience_level(phase1_data, {})
+    print(f"\nExperience levels: {', '.join(EXPERIENCE_LEVELS)}")
+    experience_level = input(f"Enter your experience level [{inferred_level}]: ").strip().lower()
+    if experience_level not in EXPERIENCE_LEVELS:
+        experience_level = inferred_level
+
+    print(f"\n✓ Selected roles: {selected_roles}")
+    print(f"✓ Location: {location}")
+    print(f"✓ Experience level: {experience_level}")
+
+    return selected_roles, location, experience_level
+
 
-# Get selected roles
-print(f"\nAvailable roles to pursue: {good_fit_roles + stretch_roles}")
-selected_roles_input = input("Enter roles you want to search for (comma-separated): ").strip()
-selected_roles = [r.strip() for r in selected_roles_input.split(",")] if selected_roles_input else good_fit_roles[:1]
+def main(phase1_inputs: dict = None):
+    """Run Phase 1 interactively; returns (phase1_data, selected_roles, location, experience_level)."""
+    phase1_inputs = phase1_inputs or PHASE1_INPUTS
 
-# Get location
-location = input("Enter preferred job location (e.g., 'Remote', 'Mumbai', 'Bangalore'): ").strip() or "Remote"
+    print("=" * 60)
+    print("PHASE 1: CAREER DISCOVERY")
+    print("=" * 60)
 
-# Get experience level
-print("\nExperience levels: intern, junior, mid, senior")
-experience_level = input("Enter your experience level: ").strip().lower()
-if experience_level not in ["intern", "junior", "mid", "senior"]:
-    experience_level = "junior"  # default
+    print("\n📄 Analyzing resume...")
+    print(f"Resume file: {phase1_inputs['resume_file']}")
+    print(f"Preferred roles: {phase1_inputs['preferred_roles']}")
+    print(f"Preferred domains: {phase1_inputs['preferred_domains']}\n")
 
-print(f"\n✓ Selected roles: {selected_roles}")
-print(f"✓ Location: {location}")
-print(f"✓ Experience level: {experience_level}")
+    phase1_data = run_phase1(phase1_inputs)
+    display_phase1_results(phase1_data)
+    prefetching = start_job_prefetch(phase1_data)
+    selected_roles, location, experience_level = prompt_phase2_inputs(phase1_data)
+    if prefetching:
+        registry.get("job_search_tool").keep_prefetched(selected_roles, location, experience_level)
+    # lets `python crew2.py` pick up these choices without re-running Phase 1
+    checkpoint_store.save("selection", {}, {
+        "selected_roles": selected_roles,
+        "location": location,
+        "experience_level": experience_level,
+        "skills": phase1_data.get("profile", {}).get("skills", []),
+        "profile": phase1_data.get("profile", {}),
+    }, resume_file=phase1_inputs["resume_file"])
+    return phase1_data, selected_roles, location, experience_level
 
 
+if __name__ == "__main__":
+    main()
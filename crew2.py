@@ -1,179 +1,326 @@
-from tools import job_search_tool, resume_reader_tool
-from agents import job_search_agent, resume_optimizer_agent, resume_parser_agent, career_fit_agent
-from tasks import job_search_task, resume_optimizer_task, resume_parsing_task, career_fit_task
-from crewai import Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI
-import json
-
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-google_api_key = os.environ["GOOGLE_API_KEY"]
-
-# Import Phase 1 outputs (if running as part of main.py flow)
-# If running crew2.py standalone, these will use the test values below
-try:
-    from crew1 import selected_roles, location, experience_level
-except (ImportError, NameError):
-    # Fallback values for standalone testing
-    print("⚠️  Running crew2.py standalone - using test values")
-    selected_roles = ["ML Engineer"]
-    location = "Remote"
-    experience_level = "junior"
-
-
-# -------- PHASE 2 CREW --------
-phase2_crew = Crew(
-    agents=[job_search_agent, resume_optimizer_agent],
-    tasks=[job_search_task, resume_optimizer_task],
-    manager_llm=ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0.3,
-        google_api_key=google_api_key
-    ),
-    process=Process.sequential,  # Changed from hierarchical to sequential
-    verbose=True
-)
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-# -------- PHASE 2A: JOB SEARCH --------
-print("\n" + "=" * 60)
-print("PHASE 2A: JOB SEARCH")
-print("=" * 60)
-
-# NOTE: These inputs come from crew1.py's human-in-the-loop section
-# For standalone testing of crew2.py, uncomment the lines below:
-# selected_roles = ["ML Engineer"]
-# location = "Remote"
-# experience_level = "junior"
-
-phase2_inputs = {
-    "selected_roles": selected_roles,
-    "location": location,
-    "experience_level": experience_level,
-    "resume_file": "/Users/apple/Desktop/jobhunt-crewai/resume.pdf"
-}
-
-print(f"\n🔍 Searching for jobs...")
-print(f"Roles: {phase2_inputs['selected_roles']}")
-print(f"Location: {phase2_inputs['location']}")
-print(f"Experience: {phase2_inputs['experience_level']}\n")
-
-# Run job search first
-from crewai import Crew
-job_search_only_crew = Crew(
-    agents=[job_search_agent],
-    tasks=[job_search_task],
-    process=Process.sequential,
-    verbose=True
-)
-
-job_search_result = job_search_only_crew.kickoff(inputs=phase2_inputs)
-
-# Access the output correctly from CrewOutput
-job_search_output = job_search_result.raw if hasattr(job_search_result, 'raw') else str(job_search_result)
-
-# Clean JSON from markdown code blocks if present
-if "```json" in job_search_output:
-    job_search_output = job_search_output.split("```json")[1].split("```")[0].strip()
-elif "```" in job_search_output:
-    job_search_output = job_search_output.split("```")[1].split("```")[0].strip()
-
-job_search_data = json.loads(job_search_output)
-jobs = job_search_data["jobs"]
+import registry
+import tracing
+from checkpoints import checkpoint_store
+from compaction import compact_inputs
+from job_records import posted_days
+from outputs import Job, JobSearchResult, ResumeSuggestions, RewrittenBullet, parse_crew_output, stream_items
+from settings import RESUME_PDF, SPECULATIVE_TOP_K, SPECULATIVE_MAX_CONCURRENCY
 
-# -------- DISPLAY JOB RESULTS --------
-print("\n" + "=" * 60)
-print("JOB SEARCH RESULTS")
-print("=" * 60)
-
-if not jobs:
-    print("\n⚠️  No jobs found. Try different roles or location.")
-    exit()
-
-for idx, job in enumerate(jobs[:5], 1):  # Show top 5
-    print(f"\n{idx}. {job['title']}")
-    print(f"   Company: {job['company']}")
-    print(f"   Location: {job['location']}")
-    print(f"   Link: {job.get('apply_link', 'N/A')}")
-    if job.get('posted_days_ago'):
-        print(f"   Posted: {job['posted_days_ago']} days ago")
+# Crews are built lazily on first kickoff (see registry.py).
 
-# -------- HUMAN INPUT: SELECT JOB --------
-print("\n" + "=" * 60)
-print("SELECT A JOB FOR RESUME OPTIMIZATION")
-print("=" * 60)
-
-job_choice = input(f"\nEnter job number (1-{len(jobs[:5])}): ").strip()
-try:
-    job_idx = int(job_choice) - 1
-    if job_idx < 0 or job_idx >= len(jobs[:5]):
-        print("Invalid choice. Selecting first job by default.")
-        job_idx = 0
-except ValueError:
-    print("Invalid input. Selecting first job by default.")
-    job_idx = 0
 
-selected_job = jobs[job_idx]
-print(f"\n✓ Selected: {selected_job['title']} at {selected_job['company']}")
+@registry.register("job_search_crew")
+def build_job_search_crew():
+    from crewai import Crew, Process
+    from agents import job_search_agent
+    from tasks import job_search_task
 
-# -------- PHASE 2B: RESUME OPTIMIZATION --------
-print("\n" + "=" * 60)
-print("PHASE 2B: RESUME OPTIMIZATION")
-print("=" * 60)
+    return Crew(
+        agents=[job_search_agent],
+        tasks=[job_search_task],
+        process=Process.sequential,
+        verbose=True
+    )
+
+
+@registry.register("resume_opt_crew")
+def build_resume_opt_crew():
+    from crewai import Crew, Process
+    from agents import resume_optimizer_agent
+    from tasks import resume_optimizer_task
+
+    return Crew(
+        agents=[resume_optimizer_agent],
+        tasks=[resume_optimizer_task],
+        process=Process.sequential,
+        verbose=True
+    )
 
-resume_opt_inputs = {
-    "resume_file": "/Users/apple/Desktop/jobhunt-crewai/resume.pdf",
-    "selected_job": selected_job
-}
 
-print(f"\n📝 Optimizing resume for: {selected_job['title']}...\n")
+# -------- PHASE 2A: JOB SEARCH --------
+def run_job_search(selected_roles, location, experience_level, resume_file=RESUME_PDF, skills=None,
+                   profile=None):
+    # listings do not depend on the resume file, only on the skills and profile used for ranking
+    key_inputs = {
+        "selected_roles": selected_roles,
+        "location": location,
+        "experience_level": experience_level,
+        "skills": skills or [],
+        "profile": profile or {},
+    }
+    return checkpoint_store.load_or_run(
+        "jobs", key_inputs,
+        lambda: _compute_job_search(selected_roles, location, experience_level, resume_file, skills, profile),
+        # an empty result is usually a failed search or quota; retry it next run
+        should_save=bool,
+    )
+
+
+def _compute_job_search(selected_roles, location, experience_level, resume_file, skills, profile=None):
+    from tools import use_profile
+    # the tool reranks its BM25 candidates by similarity to this profile
+    use_profile(profile)
+
+    phase2_inputs = {
+        "selected_roles": selected_roles,
+        "location": location,
+        "experience_level": experience_level,
+        "resume_skills": list(skills or []),
+        "resume_file": resume_file
+    }
+
+    print(f"\n🔍 Searching for jobs...")
+    print(f"Roles: {phase2_inputs['selected_roles']}")
+    print(f"Location: {phase2_inputs['location']}")
+    print(f"Experience: {phase2_inputs['experience_level']}\n")
+
+    # show each job as soon as the agent has finished writing it
+    crew = registry.get("job_search_crew")
+    with stream_items("jobs", Job, on_item=lambda job: print(f"   ↳ {job['title']} at {job['company']}")):
+        job_search_result = tracing.kickoff("job_search_crew", crew,
+                                            compact_inputs("job_search", phase2_inputs, crew))
+
+    jobs = parse_crew_output(job_search_result, JobSearchResult)["jobs"]
+    # the agent may echo an age as text; keep it numeric from here on
+    for job in jobs:
+        job["posted_days_ago"] = posted_days(job.get("posted_days_ago"))
+
+    from tools import job_search_tool
+    cache_stats = job_search_tool.cache_stats()
+    print(f"\n🗄️  Job search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+    return jobs
+
+
+# -------- DISPLAY JOB RESULTS --------
+def display_jobs(jobs):
+    print("\n" + "=" * 60)
+    print("JOB SEARCH RESULTS")
+    print("=" * 60)
+
+    if not jobs:
+        print("\n⚠️  No jobs found. Try different roles or location.")
+        return
+
+    for idx, job in enumerate(jobs[:5], 1):  # Show top 5
+        print(f"\n{idx}. {job['title']}")
+        print(f"   Company: {job['company']}")
+        print(f"   Location: {job['location']}")
+        if job.get('match_score') is not None:
+            print(f"   Match: {job['match_score']:.0%}")
+        print(f"   Link: {job.get('apply_link', 'N/A')}")
+        age = posted_days(job.get('posted_days_ago'))
+        if age is not None:
+            print(f"   Posted: {age:g} days ago")
 
-resume_opt_crew = Crew(
-    agents=[resume_optimizer_agent],
-    tasks=[resume_optimizer_task],
-    process=Process.sequential,
-    verbose=True
-)
 
-resume_opt_result = resume_opt_crew.kickoff(inputs=resume_opt_inputs)
+# -------- HUMAN INPUT: SELECT JOB --------
+def prompt_job_choice(jobs):
+    print("\n" + "=" * 60)
+    print("SELECT A JOB FOR RESUME OPTIMIZATION")
+    print("=" * 60)
+
+    job_choice = input(f"\nEnter job number (1-{len(jobs[:5])}): ").strip()
+    try:
+        job_idx = int(job_choice) - 1
+        if job_idx < 0 or job_idx >= len(jobs[:5]):
+            print("Invalid choice. Selecting first job by default.")
+            job_idx = 0
+    except ValueError:
+        print("Invalid input. Selecting first job by default.")
+        job_idx = 0
 
-# Access the output correctly from CrewOutput
-resume_opt_output = resume_opt_result.raw if hasattr(resume_opt_result, 'raw') else str(resume_opt_result)
+    selected_job = jobs[job_idx]
+    print(f"\n✓ Selected: {selected_job['title']} at {selected_job['company']}")
+    return job_idx, selected_job
 
-# Clean JSON from markdown code blocks if present
-if "```json" in resume_opt_output:
-    resume_opt_output = resume_opt_output.split("```json")[1].split("```")[0].strip()
-elif "```" in resume_opt_output:
-    resume_opt_output = resume_opt_output.split("```")[1].split("```")[0].strip()
 
-resume_suggestions = json.loads(resume_opt_output)
+# -------- PHASE 2B: RESUME OPTIMIZATION --------
+def run_resume_optimization(selected_job, resume_file=RESUME_PDF):
+    from tools import resume_context, use_resume
+    use_resume(resume_file)
+
+    resume_opt_inputs = {
+        "resume_file": resume_file,
+        "resume_context": resume_context(),
+        "selected_job": selected_job
+    }
+
+    print(f"\n📝 Optimizing resume for: {selected_job['title']}...\n")
+
+    crew = registry.get("resume_opt_crew")
+    with stream_items("rewritten_bullets", RewrittenBullet, on_item=lambda b: print(f"   ✏️  {b['after']}")):
+        resume_opt_result = tracing.kickoff("resume_opt_crew", crew,
+                                            compact_inputs("resume_optimizer", resume_opt_inputs, crew))
+
+    return parse_crew_output(resume_opt_result, ResumeSuggestions)
+
+
+# -------- SPECULATIVE PHASE 2B --------
+def _optimize_quietly(job, resume_file):
+    # each speculative run gets its own agent, task and crew; the shared ones
+    # are not safe to kick off from several threads at once
+    from crewai import Crew, Process
+    from agents import build_resume_optimizer_agent
+    from tasks import build_resume_optimizer_task
+    from tools import resume_context
+
+    agent = build_resume_optimizer_agent(verbose=False)
+    crew = Crew(
+        agents=[agent],
+        tasks=[build_resume_optimizer_task(agent)],
+        process=Process.sequential,
+        verbose=False
+    )
+    result = tracing.kickoff("speculative_resume_opt_crew", crew, compact_inputs("resume_optimizer", {
+        "resume_file": resume_file,
+        "resume_context": resume_context(),
+        "selected_job": job,
+    }, crew))
+    return parse_crew_output(result, ResumeSuggestions)
+
+
+class SpeculativeOptimizer:
+    """Runs resume optimization for the top-k displayed jobs in the background.
+
+    Once the user picks a job, runs for other jobs that have not started are
+    cancelled. Runs already in flight cannot be interrupted; they finish in the
+    background and their results are dropped.
+    """
+
+    def __init__(self, jobs, resume_file=RESUME_PDF,
+                 top_k=SPECULATIVE_TOP_K, max_concurrency=SPECULATIVE_MAX_CONCURRENCY):
+        self.resume_file = resume_file
+        self.futures = {}
+        self.pool = None
+        if top_k <= 0 or max_concurrency <= 0:
+            return
+        from tools import use_resume
+        use_resume(resume_file)
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="speculative")
+        for idx, job in enumerate(jobs[:top_k]):
+            self.futures[idx] = self.pool.submit(_optimize_quietly, job, resume_file)
+
+    def result_for(self, job_idx, job):
+        """Suggestions for the chosen job: speculative result if usable, else a normal run."""
+        future = self.futures.pop(job_idx, None)
+        # a run still queued behind other jobs is slower than starting fresh now
+        if future is not None and future.cancel():
+            future = None
+        self.cancel_rest()
+        if future is not None:
+            try:
+                suggestions = future.result()
+                print(f"\n⚡ Suggestions for {job['title']} were prepared while you chose")
+                return suggestions
+            except Exception as e:
+                print(f"⚠️  Background optimization failed ({e}), running it now")
+        return run_resume_optimization(job, self.resume_file)
+
+    def cancel_rest(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+
 
 # -------- DISPLAY RESUME SUGGESTIONS --------
-print("\n" + "=" * 60)
-print("RESUME OPTIMIZATION SUGGESTIONS")
-print("=" * 60)
-
-print("\n📌 SECTION IMPROVEMENTS:")
-for section, tips in resume_suggestions.get("section_improvements", {}).items():
-    if tips:
-        print(f"\n  {section.upper()}:")
-        for tip in tips:
-            print(f"    • {tip}")
-
-print("\n✏️  REWRITTEN BULLETS:")
-for bullet in resume_suggestions.get("rewritten_bullets", []):
-    print(f"\n  Before: {bullet.get('before', 'N/A')}")
-    print(f"  After:  {bullet.get('after', 'N/A')}")
-
-print("\n➕ KEYWORDS TO ADD:")
-for kw in resume_suggestions.get("keywords_to_add", []):
-    print(f"  • {kw}")
-
-print("\n➖ KEYWORDS TO REMOVE:")
-for kw in resume_suggestions.get("keywords_to_remove", []):
-    print(f"  • {kw}")
-
-print("\n" + "=" * 60)
-print("✅ PROCESS COMPLETE")
-print("=" * 60)
\ No newline at end of file
+def display_resume_suggestions(resume_suggestions):
+    print("\n" + "=" * 60)
+    print("RESUME OPTIMIZATION SUGGESTIONS")
+    print("=" * 60)
+
+    print("\n📌 SECTION IMPROVEMENTS:")
+    for section, tips in resume_suggestions.get("section_improvements", {}).items():
+        if tips:
+            print(f"\n  {section.upper()}:")
+            for tip in tips:
+                print(f"    • {tip}")
+
+    print("\n✏️  REWRITTEN BULLETS:")
+    for bullet in resume_suggestions.get("rewritten_bullets", []):
+        print(f"\n  Before: {bullet.get('before', 'N/A')}")
+        print(f"  After:  {bullet.get('after', 'N/A')}")
+
+    print("\n➕ KEYWORDS TO ADD:")
+    for kw in resume_suggestions.get("keywords_to_add", []):
+        print(f"  • {kw}")
+
+    print("\n➖ KEYWORDS TO REMOVE:")
+    for kw in resume_suggestions.get("keywords_to_remove", []):
+        print(f"  • {kw}")
+
+
+def load_selection(resume_file=RESUME_PDF):
+    """Phase 1 choices saved for this resume, or None."""
+    return checkpoint_store.load("selection", {}, resume_file=resume_file)
+
+
+def main(selected_roles=None, location=None, experience_level=None, skills=None, profile=None):
+    # Phase 2 needs Phase 1's choices: use the saved ones when run standalone,
+    # and only run Phase 1 (itself checkpointed) when there are none
+    if selected_roles is None or location is None or experience_level is None:
+        selection = load_selection()
+        if selection is None:
+            import crew1
+            phase1_data, selection_roles, selection_location, selection_level = crew1.main()
+            selection = {
+                "selected_roles": selection_roles,
+                "location": selection_location,
+                "experience_level": selection_level,
+                "skills": phase1_data.get("profile", {}).get("skills", []),
+                "profile": phase1_data.get("profile", {}),
+            }
+        else:
+            print("♻️  Using Phase 1 choices saved for this resume")
+        selected_roles = selected_roles or selection["selected_roles"]
+        location = location or selection["location"]
+        experience_level = experience_level or selection["experience_level"]
+        skills = skills or selection.get("skills")
+        profile = profile or selection.get("profile")
+
+    print("\n" + "=" * 60)
+    print("PHASE 2A: JOB SEARCH")
+    print("=" * 60)
+
+    jobs = run_job_search(selected_roles, location, experience_level, skills=skills, profile=profile)
+    display_jobs(jobs)
+    if not jobs:
+        return
+
+    # start optimizing for the likely picks while the prompt is open
+    speculative = SpeculativeOptimizer(jobs[:5])
+    job_idx, selected_job = prompt_job_choice(jobs)
+
+    print("\n" + "=" * 60)
+    print("PHASE 2B: RESUME OPTIMIZATION")
+    print("=" * 60)
+
+    resume_suggestions = speculative.result_for(job_idx, selected_job)
+    display_resume_suggestions(resume_suggestions)
+
+    from embeddings import resume_query_memo
+    if resume_query_memo.saved:
+        saved = ", ".join(f"{agent}: {n}" for agent, n in resume_query_memo.saved.most_common())
+        print(f"\n♻️  Resume searches answered from this run's memo ({saved})")
+
+    print("\n" + "=" * 60)
+    print("✅ PROCESS COMPLETE")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Phase 2: job search and resume optimization.")
+    parser.add_argument("--roles", help="comma-separated roles (default: saved Phase 1 choice)")
+    parser.add_argument("--location", help="job location (default: saved Phase 1 choice)")
+    parser.add_argument("--experience-level", choices=["intern", "junior", "mid", "senior"])
+    args = parser.parse_args()
+    main(
+        [r.strip() for r in args.roles.split(",")] if args.roles else None,
+        args.location,
+        args.experience_level,
+    )
@@ -0,0 +1,229 @@
+"""
+Near-duplicate job detection.
+
+The same posting comes back from several role/location queries and as
+reposts with slightly different titles or locations. Two jobs are the same
+posting when their canonical apply links match, when their normalized
+(title, company, city) match, or when they are at the same company and the
+MinHash estimate of their shingle similarity is above a threshold.
+
+MinHash signatures are bucketed with LSH banding per company, so each new
+job is only compared with the few same-company jobs sharing a bucket:
+near-linear over large batches.
+JobDeduper is incremental, so it works on streamed results (sweeps) as well
+as on whole lists (merges, cached and indexed results).
+"""
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.7))
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 similarity share a bucket
+
+# ad/analytics click ids that never change which page a link opens; generic names
+# like source or ref are left alone, some job boards use them to pick the posting
+TRACKING_PARAMS = re.compile(
+    r"^(utm_.*|gclid|gbraid|wbraid|dclid|fbclid|msclkid|yclid|igshid|mc_cid|mc_eid|_hsenc|_hsmi|trk|trackingid)$"
+)
+# job boards that list other companies' postings; a direct link is preferred
+AGGREGATOR_HOSTS = ("linkedin.", "indeed.", "naukri.", "glassdoor.", "monster.", "foundit.",
+                    "ziprecruiter.", "instahyre.", "shine.", "timesjobs.")
+
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "jr": "junior", "ml": "machine learning", "ai": "artificial intelligence",
+    "eng": "engineer", "engr": "engineer", "dev": "developer", "mgr": "manager", "swe": "software engineer",
+}
+# words reposts add to a title without changing the opening
+TITLE_NOISE = {"remote", "hybrid", "onsite", "wfh", "urgent", "hiring", "immediate", "joiner", "joiners", "opening"}
+COMPANY_SUFFIXES = re.compile(
+    r"\b(inc|llc|ltd|limited|pvt|private|corp|corporation|co|gmbh|plc|technologies|solutions)\b"
+)
+CITY_ALIASES = {
+    "bangalore": "bengaluru", "bombay": "mumbai", "gurgaon": "gurugram", "madras": "chennai",
+    "calcutta": "kolkata", "new delhi": "delhi", "anywhere": "remote", "work from home": "remote",
+}
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _PRIME, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+# -------- Normalization --------
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9+#]+", str(text or "").lower())
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(TITLE_ABBREVIATIONS.get(w, w) for w in _words(title) if w not in TITLE_NOISE)
+
+
+def normalize_company(company: str) -> str:
+    return " ".join(COMPANY_SUFFIXES.sub(" ", " ".join(_words(company))).split())
+
+
+def normalize_city(location: str) -> str:
+    """First part of the location ('Bengaluru, Karnataka, India' -> 'bengaluru')."""
+    text = str(location or "").lower()
+    if "remote" in text or "anywhere" in text:
+        return "remote"
+    city = " ".join(_words(text.split(",")[0]))
+    return CITY_ALIASES.get(city, city)
+
+
+def canonical_link(url: Optional[str]) -> Optional[str]:
+    """Apply link without tracking parameters, fragment, 'www.' or trailing slash (scheme kept)."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k.lower()))
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def is_aggregator_link(url: Optional[str]) -> bool:
+    host = urlsplit(url or "").netloc.lower()
+    return any(a in host for a in AGGREGATOR_HOSTS)
+
+
+def exact_key(job: Dict) -> str:
+    return "|".join((normalize_title(job.get("title")), normalize_company(job.get("company")),
+                     normalize_city(job.get("location"))))
+
+
+# titles that differ in these are different openings, however similar the rest is
+LEVEL_WORDS = {"intern", "junior", "senior", "lead", "staff", "principal", "head", "director",
+               "i", "ii", "iii", "iv", "1", "2", "3", "4"}
+
+
+def level_words(title: str) -> frozenset:
+    return frozenset(w for w in normalize_title(title).split() if w in LEVEL_WORDS)
+
+
+def fallback_key(job: Dict, company: str, link: Optional[str]) -> str:
+    """Exact key for jobs with no shingles: raw title, company and link."""
+    return "raw|" + "|".join((" ".join(str(job.get("title") or "").lower().split()), company, link or ""))
+
+
+# -------- MinHash --------
+def shingles(job: Dict) -> List[str]:
+    """Words and word pairs of title and city (the company must match exactly anyway)."""
+    words = normalize_title(job.get("title")).split() + normalize_city(job.get("location")).split()
+    return words + [a + " " + b for a, b in zip(words, words[1:])]
+
+
+def minhash(items: Iterable[str]) -> np.ndarray:
+    """MinHash signature; items must not be empty."""
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in set(items)],
+        dtype=np.uint64,
+    )
+    # all permutations at once: (perms, 1) x (1, shingles)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+class JobDeduper:
+    """Keeps the first job of every near-duplicate group.
+
+    add() returns the kept job for a new posting and None for a duplicate. A
+    duplicate's direct (non job-board) apply link replaces a kept job-board link.
+    Canonical links are only used as keys; jobs keep the URL they came with.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD, bands: int = LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self.jobs: List[Dict] = []
+        # one row per kept job, grown by doubling so candidates are checked in one comparison
+        self._signatures = np.zeros((64, MINHASH_PERMUTATIONS), dtype=np.uint64)
+        self._levels: List[frozenset] = []
+        self._by_key: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[str, int, bytes], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def _match(self, job: Dict, signature: np.ndarray, company: str, levels: frozenset) -> Optional[int]:
+        link = canonical_link(job.get("apply_link"))
+        for key in (link, exact_key(job)):
+            if key and key in self._by_key:
+                return self._by_key[key]
+        candidates = set()
+        for band in range(self.bands):
+            candidates.update(self._buckets.get(self._band_key(company, signature, band), ()))
+        candidates = sorted(idx for idx in candidates if self._levels[idx] == levels)
+        if not candidates:
+            return None
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        matches = np.flatnonzero(similarity >= self.threshold)
+        return candidates[matches[0]] if len(matches) else None
+
+    def _band_key(self, company: str, signature: np.ndarray, band: int) -> Tuple[str, int, bytes]:
+        # only same-company jobs can be duplicates, so they are the only ones bucketed together
+        return company, band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, job: Dict) -> Optional[Dict]:
+        items = shingles(job)
+        company = normalize_company(job.get("company"))
+        link = canonical_link(job.get("apply_link"))
+        if not items:
+            # nothing to compare ('Urgent Hiring', non-Latin titles): exact match only
+            return self._add_exact(job, fallback_key(job, company, link), link)
+
+        signature = minhash(items)
+        levels = level_words(job.get("title"))
+        idx = self._match(job, signature, company, levels)
+        if idx is not None:
+            kept = self.jobs[idx]
+            if link and (not kept.get("apply_link") or
+                         (is_aggregator_link(kept["apply_link"]) and not is_aggregator_link(link))):
+                kept["apply_link"] = job["apply_link"]
+                self._by_key[link] = idx
+            return None
+
+        idx = self._append(job, link, signature, levels)
+        self._by_key[exact_key(job)] = idx
+        for band in range(self.bands):
+            self._buckets.setdefault(self._band_key(company, signature, band), []).append(idx)
+        return job
+
+    def _add_exact(self, job: Dict, key: str, link: Optional[str]) -> Optional[Dict]:
+        if key in self._by_key or (link and link in self._by_key):
+            return None
+        # never bucketed, so its (empty) signature is never compared
+        idx = self._append(job, link, np.zeros(MINHASH_PERMUTATIONS, dtype=np.uint64), frozenset())
+        self._by_key[key] = idx
+        return job
+
+    def _append(self, job: Dict, link: Optional[str], signature: np.ndarray, levels: frozenset) -> int:
+        idx = len(self.jobs)
+        if link:
+            self._by_key[link] = idx
+        self.jobs.append(job)
+        if idx == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+        self._signatures[idx] = signature
+        self._levels.append(levels)
+        return idx
+
+
+def dedupe_jobs(jobs: Iterable[Dict], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[Dict]:
+    """Drop near-duplicates, keeping the first occurrence of each posting (in order)."""
+    deduper = JobDeduper(threshold)
+    for job in jobs:
+        deduper.add(job)
+    return deduper.jobs
+
+
+def merge_jobs(job_lists: Iterable[List[Dict]]) -> List[Dict]:
+    """Merge per-role results in role order, keeping the first occurrence of each posting."""
+    return dedupe_jobs(job for jobs in job_lists for job in jobs)
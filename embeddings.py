@@ -0,0 +1,221 @@
+import hashlib
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import tracing
+from cache import SQLiteCache, DEFAULT_CACHE_PATH
+
+RESUME_EMBEDDING_MODEL = "models/text-embedding-004"  # Latest Google embedding model
+
+# Resume vectors live in one Chroma collection per distinct PDF content
+CHROMA_DIR = os.environ.get("CHROMA_DIR", ".cache/chroma")
+RESUME_COLLECTION_PREFIX = "resume_"
+# How many resume collections to keep before the least recently used are dropped
+RESUME_COLLECTIONS_KEEP = int(os.environ.get("RESUME_COLLECTIONS_KEEP", 20))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", 20000))
+# Resume searches whose terms overlap at least this much (Jaccard) share one retrieval
+RESUME_QUERY_MEMO_SIMILARITY = float(os.environ.get("RESUME_QUERY_MEMO_SIMILARITY", 0.8))
+
+
+# -------- Content addressing --------
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def resume_collection_name(pdf_path: str) -> str:
+    """Chroma collection for this exact resume content (path-independent)."""
+    if os.path.exists(pdf_path):
+        digest = file_digest(pdf_path)
+    else:
+        # let PDFSearchTool raise its own error for a missing file
+        digest = hashlib.sha256(pdf_path.encode("utf-8")).hexdigest()
+    return f"{RESUME_COLLECTION_PREFIX}{digest[:32]}"
+
+
+def text_digest(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+# -------- Cached embedding function --------
+class CachedEmbeddingFunction:
+    """Wraps a Chroma-style embedding function with a per-chunk disk cache.
+
+    Keys are a hash of the model name and chunk text, so an edited resume only
+    re-embeds the chunks whose text actually changed.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        model: str,
+        cache: Optional[SQLiteCache] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.model = model
+        # an injected cache may be empty (and so falsy); only None means "use the default"
+        self.cache = cache if cache is not None else SQLiteCache(
+            "embeddings",
+            path=DEFAULT_CACHE_PATH,
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+        self.embedded = 0  # texts actually sent to the embedding API
+
+    # chromadb calls embedding functions with a keyword named `input`
+    @tracing.traced("embedding", "embeddings")
+    def __call__(self, input: Sequence[str]) -> List[List[float]]:
+        texts = list(input)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            key = text_digest(self.model, text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            # one batched API call for every distinct uncached chunk
+            new_texts = list(missing)
+            new_vectors = self.embed_fn(new_texts)
+            self.embedded += len(new_texts)
+            for text, vector in zip(new_texts, new_vectors):
+                vector = [float(x) for x in vector]
+                self.cache.set(text_digest(self.model, text), vector)
+                for i in missing[text]:
+                    vectors[i] = vector
+
+        tracing.annotate(cache_hits=len(texts) - sum(map(len, missing.values())), cache_misses=len(missing))
+        return vectors
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.cache.stats(), "embedded": self.embedded}
+
+
+def install_embedding_cache(app, model: str) -> Optional[CachedEmbeddingFunction]:
+    """Swap an embedchain App's embedder for the cached one (idempotent).
+
+    Returns None when the app does not expose the expected hooks, in which case
+    only the per-content collection reuse applies.
+    """
+    embedder = getattr(app, "embedding_model", None)
+    db = getattr(app, "db", None)
+    current = getattr(embedder, "embedding_fn", None)
+    if current is None or not hasattr(embedder, "set_embedding_fn"):
+        return None
+    if isinstance(current, CachedEmbeddingFunction):
+        return current
+
+    cached_fn = CachedEmbeddingFunction(current, model)
+    embedder.set_embedding_fn(cached_fn)
+    # the Chroma collection captured the old function when it was created
+    if db is not None and hasattr(db, "_get_or_create_collection"):
+        db._get_or_create_collection(db.config.collection_name)
+    return cached_fn
+
+
+# -------- Resume query memo --------
+# words agents wrap around the thing they are looking for
+QUERY_STOPWORDS = {
+    "a", "an", "and", "any", "all", "about", "for", "from", "in", "is", "list", "me", "of", "on",
+    "or", "resume", "cv", "candidate", "candidates", "section", "the", "their", "what", "which",
+    "with", "find", "show", "get", "details", "information", "info", "mentioned",
+}
+
+
+def query_terms(query: str) -> FrozenSet[str]:
+    """Content words of a search query, crudely singularized ('projects' == 'project')."""
+    words = re.findall(r"[a-z0-9+#]+", str(query or "").lower())
+    return frozenset(w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w not in QUERY_STOPWORDS)
+
+
+class ResumeQueryMemo:
+    """In-memory resume search results for this run, per resume collection.
+
+    Keyed by collection (resume content hash), so Phase 2B reuses what Phase 1
+    retrieved for the same resume even after the tool was rebuilt. A query
+    matches an earlier one when their terms are identical or overlap by at
+    least `threshold`. Saved tool calls are counted per agent.
+    """
+
+    def __init__(self, threshold: float = RESUME_QUERY_MEMO_SIMILARITY,
+                 max_collections: int = RESUME_COLLECTIONS_KEEP):
+        self.threshold = threshold
+        self.max_collections = max_collections
+        self.saved: Counter = Counter()
+        self._entries: "OrderedDict[str, List[Tuple[FrozenSet[str], str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, collection: str, query: str) -> Optional[str]:
+        terms = query_terms(query)
+        normalized = " ".join(str(query or "").lower().split())
+        with self._lock:
+            entries = self._entries.get(collection, [])
+            for entry_terms, entry_query, result in entries:
+                if not terms or not entry_terms:
+                    # nothing but stopwords: only the same query matches
+                    if normalized == entry_query:
+                        return result
+                elif len(terms & entry_terms) / len(terms | entry_terms) >= self.threshold:
+                    return result
+        return None
+
+    def store(self, collection: str, query: str, result: str) -> None:
+        with self._lock:
+            self._entries.setdefault(collection, []).append(
+                (query_terms(query), " ".join(str(query or "").lower().split()), result)
+            )
+            self._entries.move_to_end(collection)
+            while len(self._entries) > self.max_collections:
+                self._entries.popitem(last=False)
+
+    def run(self, collection: str, query: str, search: Callable[[], str]) -> str:
+        """The memoized result for query, calling search() on a miss."""
+        result = self.lookup(collection, query)
+        tracing.annotate(cache_hit=result is not None)
+        if result is not None:
+            with self._lock:
+                self.saved[tracing.current_agent() or "unknown"] += 1
+            return result
+        result = search()
+        self.store(collection, query, result)
+        return result
+
+
+resume_query_memo = ResumeQueryMemo()
+
+
+# -------- Stale collection eviction --------
+def touch_resume_collection(name: str, tracker: Optional[SQLiteCache] = None) -> SQLiteCache:
+    """Mark a resume collection as recently used."""
+    if tracker is None:
+        tracker = SQLiteCache(
+            "resume_collections", path=DEFAULT_CACHE_PATH, max_entries=RESUME_COLLECTIONS_KEEP
+        )
+    tracker.set(name, True)
+    return tracker
+
+
+def evict_stale_collections(persist_dir: str, tracker: SQLiteCache) -> List[str]:
+    """Delete resume collections that fell out of the LRU tracker."""
+    import chromadb
+
+    keep = set(tracker.keys())
+    client = chromadb.PersistentClient(path=persist_dir)
+    evicted = []
+    for collection in client.list_collections():
+        # list_collections returns names on newer chromadb, objects on older
+        name = collection if isinstance(collection, str) else collection.name
+        if name.startswith(RESUME_COLLECTION_PREFIX) and name not in keep:
+            client.delete_collection(name)
+            evicted.append(name)
+    return evicted
@@ -0,0 +1,241 @@
+"""
+Local job index with BM25 ranking (SQLite FTS5).
+
+Every normalized posting from JobSearchTool is ingested here, so postings
+accumulate across runs (and with them the BM25 term statistics and stored
+descriptions). Ranking happens locally against the selected roles and the
+resume skills, over the postings the current search returned; the job search
+agent only sees the ranked shortlist.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from cache import DEFAULT_CACHE_PATH
+from dedup import canonical_link, normalize_city
+from job_records import job_from_stored, job_row, posted_days
+
+JOB_SHORTLIST_SIZE = int(os.environ.get("JOB_SHORTLIST_SIZE", 5))
+# postings not seen in a search for this long are left out of rankings
+JOB_INDEX_MAX_AGE_SECONDS = float(os.environ.get("JOB_INDEX_MAX_AGE_SECONDS", 14 * 24 * 60 * 60))
+
+# bm25() column weights: title, role (query that found it), company, location, description
+BM25_WEIGHTS = (10.0, 2.0, 1.0, 1.0, 2.0)
+# role terms count more than skill terms when building the query
+ROLE_BOOST = 3
+DAY_SECONDS = 24 * 60 * 60
+# a title like "ML Engineer (Remote)" makes the posting remote whatever its location says
+_REMOTE_TITLE_RE = re.compile(r"\b(remote|work from home|wfh|anywhere)\b", re.I)
+
+
+def _norm(text: str) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def job_key(job: Dict) -> str:
+    """Same apply link, or same title/company/location, means same posting."""
+    if job.get("apply_link"):
+        return canonical_link(job["apply_link"])
+    return "|".join(_norm(job.get(f)) for f in ("title", "company", "location"))
+
+
+def split_locations(location: str) -> List[str]:
+    """'Remote; Bangalore | Mumbai' -> ['Remote', 'Bangalore', 'Mumbai'] (commas stay, as in 'Pune, India')."""
+    return list(dict.fromkeys(l.strip() for l in re.split(r"[;|]", location or "") if l.strip()))
+
+
+def posting_cities(job: Dict) -> List[str]:
+    """Normalized cities of a posting ('Bangalore' -> 'bengaluru'), plus 'remote' if it is remote."""
+    cities = [normalize_city(place) for place in split_locations(job.get("location"))]
+    if _REMOTE_TITLE_RE.search(job.get("title") or ""):
+        cities.append("remote")
+    return list(dict.fromkeys(c for c in cities if c))
+
+
+def _cities_column(job: Dict) -> str:
+    # delimited on both ends so one city can be matched with LIKE '%|city|%'
+    return "|" + "|".join(posting_cities(job)) + "|"
+
+
+def _add_level(levels: Optional[str], experience_level: str) -> Optional[str]:
+    """`levels` ('|junior|mid|') with one more experience level searched for."""
+    level = _norm(experience_level)
+    if not level or f"|{level}|" in (levels or ""):
+        return levels
+    return (levels or "|") + level + "|"
+
+
+def _posted_at(job: Dict, now: float) -> Optional[float]:
+    """When the posting went up, from its age at `now` (None when unknown)."""
+    age = posted_days(job.get("posted_days_ago"))
+    return None if age is None else now - age * DAY_SECONDS
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9+#.]+", _norm(text))
+
+
+def _fts_term(token: str) -> str:
+    # quote every term so FTS5 operators in job text cannot break the query
+    return '"' + token.replace('"', '""') + '"'
+
+
+class JobIndex:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_postings ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " cities TEXT,"
+            " levels TEXT,"
+            " posted_at REAL)"
+        )
+        self._migrate()
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS job_postings_fts USING fts5("
+            " key UNINDEXED, title, role, company, location, description)"
+        )
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """Add and fill the columns an index created by an older version lacks."""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(job_postings)")]
+        if "cities" not in columns:
+            self._conn.execute("ALTER TABLE job_postings ADD COLUMN cities TEXT")
+        rows = self._conn.execute("SELECT key, data FROM job_postings WHERE cities IS NULL").fetchall()
+        self._conn.executemany(
+            "UPDATE job_postings SET cities = ? WHERE key = ?",
+            [(_cities_column(job_from_stored(json.loads(data))), key) for key, data in rows],
+        )
+        # which levels found a posting is unknown for old rows; a new search fills it in
+        if "levels" not in columns:
+            self._conn.execute("ALTER TABLE job_postings ADD COLUMN levels TEXT")
+        if "posted_at" not in columns:
+            self._conn.execute("ALTER TABLE job_postings ADD COLUMN posted_at REAL")
+            # the stored age was the age when the posting was last seen
+            rows = self._conn.execute("SELECT key, data, last_seen FROM job_postings").fetchall()
+            self._conn.executemany(
+                "UPDATE job_postings SET posted_at = ? WHERE key = ?",
+                [(_posted_at(job_from_stored(json.loads(data)), last_seen), key) for key, data, last_seen in rows],
+            )
+
+    def ingest(self, jobs: Iterable[Dict], role: str = "", experience_level: str = "",
+               descriptions: Optional[List[str]] = None) -> int:
+        """Upsert postings found by a search for `role` at `experience_level`; returns how many were new."""
+        now = time.time()
+        jobs = list(jobs)
+        descriptions = descriptions or [""] * len(jobs)
+        new = 0
+        with self._lock:
+            for job, description in zip(jobs, descriptions):
+                key = job_key(job)
+                # one compact row per posting (field names are not repeated)
+                data = json.dumps(job_row(job), separators=(",", ":"))
+                cities = _cities_column(job)
+                # ages are relative to now; store the absolute time so they can be recomputed on read
+                posted_at = _posted_at(job, now)
+                row = self._conn.execute(
+                    "SELECT levels FROM job_postings WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE job_postings SET data = ?, cities = ?, levels = ?,"
+                        " posted_at = COALESCE(?, posted_at), last_seen = ? WHERE key = ?",
+                        (data, cities, _add_level(row[0], experience_level), posted_at, now, key),
+                    )
+                    continue
+                new += 1
+                self._conn.execute(
+                    "INSERT INTO job_postings (key, data, first_seen, last_seen, cities, levels, posted_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, data, now, now, cities, _add_level(None, experience_level), posted_at),
+                )
+                self._conn.execute(
+                    "INSERT INTO job_postings_fts (key, title, role, company, location, description)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, job.get("title") or "", role, job.get("company") or "",
+                     job.get("location") or "", description or ""),
+                )
+            self._conn.commit()
+        return new
+
+    def descriptions(self, jobs: Iterable[Dict]) -> List[str]:
+        """Stored description text for each job ('' when unknown)."""
+        keys = [job_key(j) for j in jobs]
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT key, description FROM job_postings_fts WHERE key IN (%s)"
+                % ",".join("?" * len(keys)), keys,
+            ).fetchall()) if keys else {}
+        return [rows.get(k, "") for k in keys]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM job_postings").fetchone()[0]
+
+    def rank(self, roles: List[str], skills: Optional[List[str]] = None,
+             location: Optional[str] = None, limit: int = JOB_SHORTLIST_SIZE,
+             max_age_seconds: float = JOB_INDEX_MAX_AGE_SECONDS,
+             keys: Optional[Iterable[str]] = None,
+             experience_level: Optional[str] = None) -> List[Dict]:
+        """BM25-ranked postings for the roles and skills, best first.
+
+        `keys` (job_key values) limits the ranking to those postings, e.g. the
+        ones a search just returned; `experience_level` to postings a search at
+        that level found. Each returned job dict gets a `relevance` score
+        (higher is better) and its posting age as of now.
+        """
+        if keys is not None:
+            keys = list(dict.fromkeys(keys))
+            if not keys:
+                return []
+        role_terms = [t for r in roles for t in _tokens(r)]
+        skill_terms = [t for s in (skills or []) for t in _tokens(s)]
+        # repeating a term in an OR query raises its weight in bm25
+        terms = list(dict.fromkeys(role_terms)) * ROLE_BOOST + list(dict.fromkeys(skill_terms))
+        if not terms:
+            return []
+        query = " OR ".join(_fts_term(t) for t in terms)
+
+        sql = (
+            "SELECT p.data, p.posted_at, -bm25(job_postings_fts, ?, ?, ?, ?, ?) AS score"
+            " FROM job_postings_fts f JOIN job_postings p ON p.key = f.key"
+            " WHERE job_postings_fts MATCH ? AND p.last_seen >= ?"
+        )
+        now = time.time()
+        params: list = [*BM25_WEIGHTS, query, now - max_age_seconds]
+        # a posting matches if it is in any of the requested cities (normalized
+        # the same way as at ingest, so 'Bangalore' finds 'Bengaluru, India')
+        cities = list(dict.fromkeys(c for c in map(normalize_city, split_locations(location)) if c))
+        if cities:
+            sql += " AND (" + " OR ".join("p.cities LIKE ?" for _ in cities) + ")"
+            params.extend(f"%|{city}|%" for city in cities)
+        if experience_level:
+            sql += " AND p.levels LIKE ?"
+            params.append(f"%|{_norm(experience_level)}|%")
+        if keys is not None:
+            sql += " AND p.key IN (%s)" % ",".join("?" * len(keys))
+            params.extend(keys)
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        ranked = []
+        for data, posted_at, score in rows:
+            job = job_from_stored(json.loads(data))
+            if posted_at is not None:
+                job["posted_days_ago"] = round(max(0.0, now - posted_at) / DAY_SECONDS, 1)
+            job["relevance"] = round(score, 3)
+            ranked.append(job)
+        return ranked
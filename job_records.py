@@ -0,0 +1,68 @@
+"""
+Compact job postings.
+
+Postings are job dicts in memory, with a numeric `posted_days_ago`. They
+serialize to compact JSON rows: field names once, then one list per posting
+({"fields": [...], "rows": [[...], ...]}), which is how the job cache and the
+local index store them. job_row() and job_from_row() convert between job
+dicts and rows.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+JOB_FIELDS = ("title", "company", "location", "apply_link", "posted_days_ago")
+
+_AGE_UNITS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def posted_days(value) -> Optional[float]:
+    """Age in days from Serper's 'posted' text ('3 days ago', '30+ days ago', '5 hours ago')."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).lower()
+    if "just" in text or "today" in text:
+        return 0.0
+    if "yesterday" in text:
+        return 1.0
+    match = re.search(r"(\d+)\+?\s*(minute|hour|day|week|month|year)", text)
+    if match:
+        return float(int(match.group(1)) * _AGE_UNITS[match.group(2)])
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*", text)
+    return float(match.group(1)) if match else None
+
+
+# -------- Rows --------
+def job_row(job: Dict, fields: Sequence[str] = JOB_FIELDS) -> list:
+    """Compact row for a job dict, with a numeric posting age."""
+    return [posted_days(job.get(f)) if f == "posted_days_ago" else job.get(f) for f in fields]
+
+
+def job_from_row(row: Sequence, fields: Sequence[str] = JOB_FIELDS) -> Dict:
+    return dict(zip(fields, row))
+
+
+def job_from_stored(data) -> Dict:
+    """Job dict for a posting stored as a compact row or (before rows) as a dict."""
+    return job_from_row(job_row(data)) if isinstance(data, dict) else job_from_row(data)
+
+
+def compact_jobs(jobs: Iterable[Dict]) -> Dict:
+    return {"fields": list(JOB_FIELDS), "rows": [job_row(job) for job in jobs]}
+
+
+def jobs_from_compact(data) -> List[Dict]:
+    """Job dicts from compact_jobs() output, or a plain list of job dicts (the older cache format)."""
+    if isinstance(data, list):
+        return [job_from_stored(job) for job in data]
+    return [job_from_row(row, data["fields"]) for row in data["rows"]]
+
+
+# -------- Freshness --------
+def is_fresh(job: Dict, max_age_days: Optional[float] = None, keep_unknown_age: bool = True) -> bool:
+    """Whether a posting is at most `max_age_days` old (unknown ages pass by default)."""
+    if max_age_days is None:
+        return True
+    age = posted_days(job.get("posted_days_ago"))
+    return keep_unknown_age if age is None else age <= max_age_days
@@ -0,0 +1,638 @@
+from collections import deque
+from dotenv import load_dotenv
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import contextvars
+import hashlib
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+
+import registry
+import tracing
+
+load_dotenv()
+
+gemini_model = "gemini-2.5-flash-lite"  # default agent model
+manager_model = "gemini-2.5-flash"  # crew manager model
+
+# Per-model quotas as (requests per minute, tokens per minute).
+# GEMINI_RPM / GEMINI_TPM override every model at once.
+LLM_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gemini-2.5-flash-lite": (15, 250_000),
+    "gemini-2.5-flash": (10, 250_000),
+}
+DEFAULT_RATE_LIMIT = (10, 250_000)
+# Retries after a 429, each one behind the model's shared cooldown (the Gemini
+# client's own retries are off, so every 429 reaches the shared limiter)
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 6))
+# ModelRouter sets this to 0 while another model is left to try, so a 429 moves
+# the call on to that model instead of waiting out the cooldown in place
+_retry_budget: contextvars.ContextVar = contextvars.ContextVar("llm_retry_budget", default=None)
+# Shared cooldown after a 429: doubles per consecutive hit, capped
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", 2))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get("LLM_BACKOFF_MAX_SECONDS", 60))
+
+# Exact-match response cache for temperature-0 calls, switchable per agent
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "1") != "0"
+LLM_CACHE_AGENTS = {
+    name.strip() for name in os.environ.get(
+        "LLM_CACHE_AGENTS",
+        "resume_parser_agent,career_fit_agent,job_search_agent,resume_optimizer_agent",
+    ).split(",") if name.strip()
+}
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 5000))
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", 30 * 24 * 60 * 60))
+
+# Per-task model routing: candidates per task type and input size, preferred first.
+# A candidate that is rate limited, failing or slow is skipped for the next one.
+LLM_ROUTING_ENABLED = os.environ.get("LLM_ROUTING", "1") != "0"
+MODEL_ROUTES: Dict[str, Dict[str, List[str]]] = {
+    # pulling fields out of text: the lite model is enough at any size
+    "extraction": {"small": [gemini_model, manager_model], "large": [gemini_model, manager_model]},
+    # classification: long inputs go to the stronger model first
+    "judgment": {"small": [gemini_model, manager_model], "large": [manager_model, gemini_model]},
+    # rewriting: stronger model, on its own quota; lite as the fallback
+    "rewriting": {"small": [manager_model, gemini_model], "large": [manager_model, gemini_model]},
+}
+# LLM_ROUTING=0: every task on the default model, still called through the router
+FIXED_ROUTES: Dict[str, Dict[str, List[str]]] = {
+    task_type: {"small": [gemini_model], "large": [gemini_model]} for task_type in MODEL_ROUTES
+}
+# estimated prompt tokens above which a call counts as "large"
+LLM_ROUTE_LARGE_INPUT_TOKENS = int(os.environ.get("LLM_ROUTE_LARGE_INPUT_TOKENS", 6000))
+# health over the calls of the last LLM_ROUTE_WINDOW_SECONDS (older ones age out,
+# so a skipped model is tried again later)
+LLM_ROUTE_WINDOW_SECONDS = float(os.environ.get("LLM_ROUTE_WINDOW_SECONDS", 300))
+LLM_ROUTE_MIN_SAMPLES = int(os.environ.get("LLM_ROUTE_MIN_SAMPLES", 3))
+LLM_ROUTE_MAX_LATENCY_SECONDS = float(os.environ.get("LLM_ROUTE_MAX_LATENCY_SECONDS", 30))
+LLM_ROUTE_MAX_ERROR_RATE = float(os.environ.get("LLM_ROUTE_MAX_ERROR_RATE", 0.5))
+
+
+# -------- Token bucket --------
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` / 60 per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """Take `amount` if available and return 0, else return seconds to wait."""
+        # a request larger than the whole bucket may go once the bucket is full
+        amount = min(amount, self.capacity)
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def acquire(self, amount: float = 1) -> None:
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def refund(self, amount: float) -> None:
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def charge(self, amount: float) -> None:
+        """Take tokens after the fact (may go negative, delaying later callers)."""
+        with self.lock:
+            self.tokens -= amount
+
+
+# -------- Shared per-model limiter --------
+class ModelRateLimiter:
+    """Requests/tokens per minute plus a cooldown shared by every caller of a model."""
+
+    def __init__(self, model: str, rpm: int, tpm: int):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.cooldown_until = 0.0
+        self.consecutive_429s = 0
+        self.lock = threading.Lock()
+        self.rate_limited = 0  # 429s seen across all agents
+
+    def wait_for_cooldown(self) -> None:
+        delay = self.cooldown_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        self.wait_for_cooldown()
+        self.requests.acquire(1)
+        if estimated_tokens:
+            self.tokens.acquire(estimated_tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if actual_tokens > estimated_tokens:
+            self.tokens.charge(actual_tokens - estimated_tokens)
+        elif actual_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.consecutive_429s = 0
+
+    def call(self, fn: Callable, estimated_tokens: int = 0, max_retries: Optional[int] = None,
+             on_retry: Optional[Callable[[int, BaseException], None]] = None):
+        """fn() once the quotas allow it; after a 429, pause every caller and try again.
+
+        `max_retries` defaults to LLM_MAX_RETRIES, or to none inside a routed call
+        that can still fall back to another model.
+        """
+        if max_retries is None:
+            budget = _retry_budget.get()
+            max_retries = LLM_MAX_RETRIES if budget is None else budget
+        for attempt in itertools.count(1):
+            self.acquire(estimated_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                # a rejected request used no token quota
+                self.tokens.refund(estimated_tokens)
+                delay = self.record_rate_limited()
+                if attempt > max_retries:
+                    raise
+                print(f"⏳ {self.model} rate limited, all agents pausing {delay:.0f}s")
+                if on_retry is not None:
+                    on_retry(attempt, e)
+                continue
+            self.record_success()
+            return result
+
+    def record_rate_limited(self) -> float:
+        """Push back every caller of this model; returns the cooldown applied."""
+        with self.lock:
+            self.rate_limited += 1
+            self.consecutive_429s += 1
+            delay = min(
+                LLM_BACKOFF_MAX_SECONDS,
+                LLM_BACKOFF_BASE_SECONDS * 2 ** (self.consecutive_429s - 1),
+            )
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+        return delay
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    def build() -> ModelRateLimiter:
+        rpm, tpm = LLM_RATE_LIMITS.get(model, DEFAULT_RATE_LIMIT)
+        rpm = int(os.environ.get("GEMINI_RPM", rpm))
+        tpm = int(os.environ.get("GEMINI_TPM", tpm))
+        return ModelRateLimiter(model, rpm, tpm)
+    return registry.get_or_build(f"rate_limiter:{model}", build)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    text = f"{type(error).__name__} {error}"
+    return "429" in text or "ResourceExhausted" in text or "RESOURCE_EXHAUSTED" in text
+
+
+# -------- Response cache --------
+def llm_cache_enabled(agent_name: str) -> bool:
+    """Whether `agent_name` (as in agents.py) should use the response cache."""
+    return LLM_CACHE_ENABLED and agent_name in LLM_CACHE_AGENTS
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Message roles, contents and tool calls only, with whitespace collapsed.
+
+    langchain passes the serialized messages; ids and metadata differ between
+    otherwise identical calls and must not split the cache.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return " ".join(prompt.split())
+    normalized = []
+    for message in messages if isinstance(messages, list) else [messages]:
+        kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        content = kwargs.get("content", message)
+        if isinstance(content, str):
+            content = " ".join(content.split())
+        normalized.append({
+            "type": kwargs.get("type") or (message.get("id") or [""])[-1],
+            "content": content,
+            "tool_calls": kwargs.get("tool_calls"),
+            "name": kwargs.get("name"),
+        })
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def response_cache_key(prompt: str, llm_string: str) -> str:
+    # llm_string carries the model, temperature, stop words and other parameters
+    return hashlib.sha256(f"{llm_string}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+def is_cache_hit(response) -> bool:
+    return any(
+        getattr(getattr(g, "message", None), "response_metadata", {}).get("cache_hit")
+        for generations in getattr(response, "generations", []) for g in generations
+    )
+
+
+def get_response_cache():
+    return registry.get_or_build("llm_response_cache", _build_response_cache)
+
+
+def _build_response_cache():
+    """langchain cache over SQLiteCache (size-bounded LRU on local disk)."""
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumps, loads
+    from cache import SQLiteCache
+
+    store = SQLiteCache(
+        "llm_responses",
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+    )
+
+    class LLMResponseCache(BaseCache):
+        def lookup(self, prompt: str, llm_string: str):
+            stored = store.get(response_cache_key(prompt, llm_string))
+            if stored is None:
+                return None
+            generations = [loads(g) for g in stored]
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None:
+                    # lets the rate limiter refund and tracing count the hit
+                    message.response_metadata["cache_hit"] = True
+            return generations
+
+        def update(self, prompt: str, llm_string: str, return_val: List) -> None:
+            store.set(response_cache_key(prompt, llm_string), [dumps(g) for g in return_val])
+
+        def clear(self, **kwargs) -> None:
+            store.clear()
+
+        def stats(self) -> Dict[str, int]:
+            return store.stats()
+
+    return LLMResponseCache()
+
+
+# -------- Model routing --------
+class ModelHealth:
+    """Rolling latency and error rate of one model's calls (thread-safe)."""
+
+    def __init__(self, window_seconds: float = LLM_ROUTE_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.samples: deque = deque(maxlen=200)  # (finished at, seconds, ok)
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.samples.append((time.monotonic(), seconds, ok))
+
+    def recent(self) -> List[Tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.window_seconds
+        with self.lock:
+            return [s for s in self.samples if s[0] >= cutoff]
+
+    def median_latency(self) -> Optional[float]:
+        latencies = [seconds for _, seconds, ok in self.recent() if ok]
+        return statistics.median(latencies) if latencies else None
+
+    def error_rate(self) -> float:
+        recent = self.recent()
+        return sum(not ok for _, _, ok in recent) / len(recent) if recent else 0.0
+
+
+def message_dicts(messages) -> List[Dict[str, str]]:
+    """crewai (str or role/content dicts) or langchain messages as role/content dicts."""
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    roles = {"human": "user", "ai": "assistant"}
+    converted = []
+    for m in messages:
+        if isinstance(m, dict):
+            converted.append({"role": m.get("role", "user"), "content": str(m.get("content", ""))})
+        else:
+            converted.append({"role": roles.get(m.type, m.type), "content": str(m.content)})
+    return converted
+
+
+class ModelRouter:
+    """Chooses the model for each call from task type, input size and model health.
+
+    `clients(model, temperature, cache)` builds the client for a model (get_llm by
+    default; pass stubs to test routing). Decisions are kept in `decisions` and
+    traced as `route` spans; fallbacks are printed.
+    """
+
+    def __init__(self, routes: Dict[str, Dict[str, List[str]]] = None, clients: Callable = None):
+        self.routes = routes or MODEL_ROUTES
+        self.clients = clients or get_llm
+        self.health: Dict[str, ModelHealth] = {}
+        self.decisions: deque = deque(maxlen=200)
+        self.lock = threading.Lock()
+
+    def _health(self, model: str) -> ModelHealth:
+        with self.lock:
+            return self.health.setdefault(model, ModelHealth())
+
+    def skip_reason(self, model: str) -> Optional[str]:
+        """Why `model` should not be used right now, or None when it is fine."""
+        if get_rate_limiter(model).cooldown_until > time.monotonic():
+            return "rate limited"
+        health = self._health(model)
+        if len(health.recent()) < LLM_ROUTE_MIN_SAMPLES:
+            return None
+        if health.error_rate() > LLM_ROUTE_MAX_ERROR_RATE:
+            return f"error rate {health.error_rate():.0%}"
+        latency = health.median_latency()
+        if latency is not None and latency > LLM_ROUTE_MAX_LATENCY_SECONDS:
+            return f"median latency {latency:.1f}s"
+        return None
+
+    def route(self, task_type: str, estimated_tokens: int) -> Tuple[List[str], Dict[str, str]]:
+        """Models to try in order (healthy ones first) and why any were skipped."""
+        size = "large" if estimated_tokens > LLM_ROUTE_LARGE_INPUT_TOKENS else "small"
+        candidates = self.routes.get(task_type, self.routes["extraction"])[size]
+        skipped = {model: reason for model in candidates if (reason := self.skip_reason(model))}
+        ordered = [m for m in candidates if m not in skipped] + [m for m in candidates if m in skipped]
+        self.decisions.append({"task_type": task_type, "size": size, "estimated_tokens": estimated_tokens,
+                               "model": ordered[0], "skipped": skipped})
+        if skipped and ordered[0] != candidates[0]:
+            print(f"↪️  {task_type}: {candidates[0]} {skipped[candidates[0]]}, using {ordered[0]}")
+        return ordered, skipped
+
+    def complete(self, task_type: str, messages, temperature: float = 0, cache: bool = False,
+                 stop: Optional[List[str]] = None) -> str:
+        """Answer the messages with the routed model, falling back down the list on errors."""
+        messages = message_dicts(messages)
+        estimated = estimate_tokens("".join(m["content"] for m in messages))
+        ordered, skipped = self.route(task_type, estimated)
+        with tracing.span("route", task_type, model=ordered[0], estimated_tokens=estimated, skipped=skipped):
+            for i, model in enumerate(ordered):
+                client = self.clients(model, temperature, cache)
+                start = time.perf_counter()
+                # the cooldown set by a 429 also moves later calls off this model (skip_reason)
+                budget = _retry_budget.set(0 if i < len(ordered) - 1 else None)
+                try:
+                    text = _call_client(client, messages, stop)
+                except Exception as e:
+                    self._health(model).record(time.perf_counter() - start, False)
+                    if i == len(ordered) - 1:
+                        raise
+                    print(f"↪️  {task_type}: {model} failed ({type(e).__name__}), trying {ordered[i + 1]}")
+                    tracing.annotate(model=ordered[i + 1], fallback_from=model)
+                    continue
+                finally:
+                    _retry_budget.reset(budget)
+                self._health(model).record(time.perf_counter() - start, True)
+                return text
+
+
+def _call_client(client, messages: List[Dict[str, str]], stop: Optional[List[str]] = None) -> str:
+    if hasattr(client, "invoke"):
+        # langchain chat model
+        response = client.invoke([(m["role"], m["content"]) for m in messages], stop=stop)
+        return response.content if isinstance(response.content, str) else str(response.content)
+    # crewai BaseLLM
+    return client.call(messages)
+
+
+def get_model_router() -> ModelRouter:
+    return registry.get_or_build(
+        "model_router", lambda: ModelRouter(MODEL_ROUTES if LLM_ROUTING_ENABLED else FIXED_ROUTES))
+
+
+def get_task_llm(task_type: str, temperature: float = 0, cache: bool = False):
+    """Agent LLM for a task type (extraction, judgment, rewriting), routed per call.
+
+    With LLM_ROUTING=0 every call goes to the default model, through the same
+    adapter: a raw langchain client would be swapped out by crewai, losing the
+    response cache, rate limiter, tracing and token streaming.
+    """
+    cache = cache and temperature == 0
+    return registry.get_or_build(
+        f"routed_llm:{task_type}:{temperature}" + (":cached" if cache else ""),
+        lambda: _build_routed_llm(task_type, temperature, cache),
+    )
+
+
+def _build_routed_llm(task_type: str, temperature: float, cache: bool):
+    """An LLM object crewai can hold whose calls go through the model router.
+
+    A crewai BaseLLM where crewai has one (it would otherwise replace a langchain
+    model with its own client), else a langchain chat model.
+    """
+    router = get_model_router()
+    try:
+        from crewai.llms.base_llm import BaseLLM
+    except ImportError:
+        BaseLLM = None
+
+    if BaseLLM is not None:
+        class RoutedLLM(BaseLLM):
+            def call(self, messages, *args, **kwargs):
+                return router.complete(task_type, messages, temperature, cache, stop=getattr(self, "stop", None))
+
+            def supports_function_calling(self) -> bool:
+                return False
+
+        return RoutedLLM(model=f"routed/{task_type}", temperature=temperature)
+
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class RoutedChatModel(BaseChatModel):
+        model_name: str = f"routed/{task_type}"
+
+        @property
+        def _llm_type(self) -> str:
+            return "jobhunt-routed"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            text = router.complete(task_type, messages, temperature, cache, stop=stop)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    return RoutedChatModel()
+
+
+# -------- Client pool --------
+def get_llm(model: str = gemini_model, temperature: float = 0, cache: bool = False):
+    """Shared Gemini chat client for (model, temperature, cache), built on first use.
+
+    Every agent and crew asking for the same combination gets the same client (and
+    so the same HTTP connections). All clients of a model share one rate limiter.
+    `cache` only applies at temperature 0, where replaying a response is exact.
+    """
+    cache = cache and temperature == 0
+    return registry.get_or_build(
+        f"llm:{model}:{temperature}" + (":cached" if cache else ""),
+        lambda: _build_llm(model, temperature, cache),
+    )
+
+
+def _build_llm(model: str, temperature: float, cache: bool = False):
+    # langchain_google_genai is slow to import, so defer it to the first client
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    limiter = get_rate_limiter(model)
+    callbacks = [_rate_limit_callback(limiter), _token_stream_callback()]
+    if tracing.TRACING_ENABLED:
+        callbacks.append(_tracing_callback(model, cache))
+    kwargs = {}
+    if cache:
+        kwargs["cache"] = get_response_cache()
+    # stream tokens so outputs.stream_items can surface results early
+    if "streaming" in getattr(ChatGoogleGenerativeAI, "model_fields", {}):
+        kwargs["streaming"] = True
+
+    # langchain only calls _generate/_stream on a response cache miss, so quota
+    # is taken (and 429s retried) for requests that actually reach the API
+    class RateLimitedChat(ChatGoogleGenerativeAI):
+        def _generate(self, messages, stop=None, run_manager=None, **kw):
+            return limiter.call(
+                lambda: super(RateLimitedChat, self)._generate(messages, stop, run_manager, **kw),
+                _message_tokens(messages), on_retry=_retry_reporter(run_manager),
+            )
+
+        def _stream(self, messages, stop=None, run_manager=None, **kw):
+            # a 429 arrives with the first chunk, so only that part is retried
+            return limiter.call(
+                lambda: _started(super(RateLimitedChat, self)._stream(messages, stop, run_manager, **kw)),
+                _message_tokens(messages), on_retry=_retry_reporter(run_manager),
+            )
+
+    return RateLimitedChat(
+        model=model,
+        google_api_key=os.environ.get("GOOGLE_API_KEY"),
+        temperature=temperature,
+        max_retries=0,
+        callbacks=callbacks,
+        **kwargs,
+    )
+
+
+def _message_tokens(messages) -> int:
+    return estimate_tokens("".join(str(m.content) for m in messages))
+
+
+_EMPTY = object()
+
+
+def _started(stream: Iterator) -> Iterator:
+    """Pull the first item now (so request errors raise here), then yield all of them."""
+    first = next(stream, _EMPTY)
+    return iter(()) if first is _EMPTY else itertools.chain([first], stream)
+
+
+def _retry_reporter(run_manager) -> Optional[Callable[[int, BaseException], None]]:
+    """Report limiter retries to langchain callbacks (the tracing span counts them)."""
+    if run_manager is None:
+        return None
+
+    def on_retry(attempt: int, error: BaseException) -> None:
+        from tenacity import RetryCallState
+
+        state = RetryCallState(None, None, (), {})
+        state.attempt_number = attempt
+        state.set_exception((type(error), error, error.__traceback__))
+        run_manager.on_retry(state)
+
+    return on_retry
+
+
+def _rate_limit_callback(limiter: ModelRateLimiter):
+    """Corrects the token bucket with the usage the API reports (quota is taken in limiter.call)."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class RateLimitCallback(BaseCallbackHandler):
+        run_inline = True
+
+        def __init__(self):
+            self.estimates: Dict[str, int] = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self.estimates[str(run_id)] = sum(_message_tokens(batch) for batch in messages)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            estimated = self.estimates.pop(str(run_id), 0)
+            if is_cache_hit(response):
+                return  # answered from the response cache: no quota was taken
+            usage = (response.llm_output or {}).get("usage_metadata") or {}
+            actual = usage.get("total_tokens")
+            if actual is not None:
+                limiter.reconcile(estimated, actual)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self.estimates.pop(str(run_id), None)
+
+    return RateLimitCallback()
+
+
+def _token_stream_callback():
+    """Forward streamed tokens to the caller's active outputs.stream_items() parsers."""
+    from langchain_core.callbacks import BaseCallbackHandler
+    from outputs import feed_token
+
+    class TokenStreamCallback(BaseCallbackHandler):
+        # inline, so feed_token sees the stream_items() blocks of the calling thread
+        run_inline = True
+
+        def on_llm_new_token(self, token, **kwargs):
+            feed_token(token)
+
+    return TokenStreamCallback()
+
+
+def _tracing_callback(model: str, cached: bool = False):
+    """One `llm` span per call, with token usage and retries (see tracing.py)."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TracingCallback(BaseCallbackHandler):
+        # inline, so the span sees the crew/tool span of the calling thread
+        run_inline = True
+
+        def __init__(self):
+            self.spans: Dict[str, dict] = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self.spans[str(run_id)] = tracing.tracer.start("llm", model, retries=0)
+
+        def on_retry(self, retry_state, *, run_id, **kwargs):
+            span = self.spans.get(str(run_id))
+            if span is not None:
+                span["attrs"]["retries"] += 1
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            span = self.spans.pop(str(run_id), None)
+            if span is not None:
+                span["attrs"].update(tracing.token_usage(response))
+                if cached:
+                    span["attrs"]["cache_hit"] = is_cache_hit(response)
+                tracing.tracer.finish(span)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            span = self.spans.pop(str(run_id), None)
+            if span is not None:
+                tracing.tracer.finish(span, error)
+
+    return TracingCallback()
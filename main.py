@@ -12,18 +12,25 @@ print("2. Suggest career fits based on your interests")
 print("3. Search for real job openings")
 print("4. Provide targeted resume optimization\n")
 
-# Import and run Phase 1
+# Run Phase 1
 print("Starting Phase 1: Career Discovery...\n")
 import crew1
+import crew2
+import tracing
+
+# no-op unless METRICS_PORT is set
+tracing.serve_metrics()
 
-# Phase 1 outputs these variables that Phase 2 needs:
+# Phase 1 returns the choices that Phase 2 needs:
 # - selected_roles
 # - location  
 # - experience_level
+phase1_data, selected_roles, location, experience_level = crew1.main()
 
 print("\n\nStarting Phase 2: Job Search & Resume Optimization...\n")
 
-# Import Phase 2 (it will use the variables from crew1)
-import crew2
+profile = phase1_data.get("profile", {})
+crew2.main(selected_roles, location, experience_level,
+           skills=profile.get("skills"), profile=profile)
 
 print("\n\n🎉 All done! Good luck with your job search!")
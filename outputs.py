@@ -0,0 +1,274 @@
+"""
+Shared output layer for crew results.
+
+Pydantic models mirror the `expected_output` schemas in tasks.py. Crew output
+is validated against them; a broken list item or a malformed document is
+re-asked from the LLM on its own instead of re-running the crew. While an agent
+is generating, complete list items (jobs, bullets, ...) can be surfaced as soon
+as their closing brace streams in.
+"""
+import contextvars
+import json
+import re
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+# -------- Schemas (keep in sync with tasks.py expected_output) --------
+class Project(BaseModel):
+    title: str
+    impact: str = ""
+    tech: List[str] = Field(default_factory=list)
+
+
+class ResumeProfile(BaseModel):
+    skills: List[str] = Field(default_factory=list)
+    domains: List[str] = Field(default_factory=list)
+    experience_level: Literal["intern", "junior", "mid", "senior"]
+    projects: List[Project] = Field(default_factory=list)
+    strengths: List[str] = Field(default_factory=list)
+
+
+class CareerFit(BaseModel):
+    good_fit_roles: List[str] = Field(default_factory=list)
+    stretch_roles: List[str] = Field(default_factory=list)
+    poor_fit_roles: List[str] = Field(default_factory=list)
+    skill_gaps: List[str] = Field(default_factory=list)
+    reasoning: str = ""
+
+
+class RoleFit(BaseModel):
+    role: str
+    fit: Literal["good", "stretch", "poor"]
+    skill_gaps: List[str] = Field(default_factory=list)
+    reasoning: str = ""
+
+
+class Job(BaseModel):
+    title: str
+    company: str
+    location: str
+    apply_link: Optional[str] = None
+    posted_days_ago: Optional[Union[int, float, str]] = None
+    relevance: Optional[float] = None  # local BM25 score, see job_index.py
+    match_score: Optional[float] = None  # embedding similarity to the resume, see scoring.py
+
+
+class JobSearchResult(BaseModel):
+    jobs: List[Job] = Field(default_factory=list)
+
+
+class SectionImprovements(BaseModel):
+    summary: List[str] = Field(default_factory=list)
+    experience: List[str] = Field(default_factory=list)
+    projects: List[str] = Field(default_factory=list)
+    skills: List[str] = Field(default_factory=list)
+
+
+class RewrittenBullet(BaseModel):
+    before: str
+    after: str
+
+
+class ResumeSuggestions(BaseModel):
+    section_improvements: SectionImprovements = Field(default_factory=SectionImprovements)
+    rewritten_bullets: List[RewrittenBullet] = Field(default_factory=list)
+    keywords_to_add: List[str] = Field(default_factory=list)
+    keywords_to_remove: List[str] = Field(default_factory=list)
+
+
+# list fields whose items are validated (and repaired) one by one
+ITEM_FIELDS: Dict[Type[BaseModel], Dict[str, Type[BaseModel]]] = {
+    ResumeProfile: {"projects": Project},
+    JobSearchResult: {"jobs": Job},
+    ResumeSuggestions: {"rewritten_bullets": RewrittenBullet},
+}
+
+
+class OutputError(ValueError):
+    """Crew output could not be turned into a valid document, even after repair."""
+
+
+# -------- JSON extraction --------
+def extract_json_text(raw: str) -> str:
+    """Strip markdown fences and surrounding prose, leaving the JSON object."""
+    if "```json" in raw:
+        raw = raw.split("```json")[1].split("```")[0]
+    elif "```" in raw:
+        raw = raw.split("```")[1].split("```")[0]
+    start, end = raw.find("{"), raw.rfind("}")
+    if start != -1 and end > start:
+        raw = raw[start:end + 1]
+    return raw.strip()
+
+
+def _loads_lenient(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # trailing commas are the most common slip in model-written JSON
+        return json.loads(re.sub(r",\s*([}\]])", r"\1", text))
+
+
+# -------- Repair (re-ask only the broken piece) --------
+def repair_with_llm(fragment: str, model: Type[BaseModel], error: str) -> dict:
+    from llms import get_llm
+
+    schema = json.dumps(model.model_json_schema())
+    prompt = (
+        "The following JSON does not match its schema.\n"
+        f"Schema: {schema}\n"
+        f"Error: {error}\n"
+        f"JSON: {fragment}\n"
+        "Return ONLY the corrected JSON object, without inventing new facts."
+    )
+    reply = get_llm().invoke(prompt)
+    text = reply.content if hasattr(reply, "content") else str(reply)
+    return _loads_lenient(extract_json_text(text))
+
+
+def _validate_items(data: dict, model: Type[BaseModel], repair: Callable) -> dict:
+    for field, item_model in ITEM_FIELDS.get(model, {}).items():
+        items = data.get(field)
+        if not isinstance(items, list):
+            continue
+        fixed = []
+        for item in items:
+            try:
+                fixed.append(item_model.model_validate(item).model_dump())
+            except ValidationError as e:
+                try:
+                    fixed.append(item_model.model_validate(
+                        repair(json.dumps(item), item_model, str(e))).model_dump())
+                except Exception:
+                    # an unrepairable item is dropped, not fatal for the document
+                    print(f"⚠️  Dropped invalid {field} item: {item}")
+        data[field] = fixed
+    return data
+
+
+def parse_output(raw: str, model: Type[BaseModel], repair: Optional[Callable] = repair_with_llm) -> dict:
+    """Validate crew output text against `model` and return it as a dict."""
+    text = extract_json_text(raw)
+    try:
+        data = _loads_lenient(text)
+    except json.JSONDecodeError as e:
+        if repair is None:
+            raise OutputError(f"Output is not valid JSON: {e}") from e
+        # any repair failure (bad reply, rate limit, LLM down) surfaces as OutputError
+        try:
+            data = repair(text, model, f"invalid JSON: {e}")
+        except Exception as e2:
+            raise OutputError(f"Output is not valid JSON and repair failed: {e2}") from e2
+
+    if repair is not None and isinstance(data, dict):
+        data = _validate_items(data, model, repair)
+    try:
+        return model.model_validate(data).model_dump()
+    except ValidationError as e:
+        if repair is None:
+            raise OutputError(str(e)) from e
+        try:
+            return model.model_validate(repair(json.dumps(data), model, str(e))).model_dump()
+        except Exception as e2:
+            raise OutputError(str(e2)) from e2
+
+
+def parse_crew_output(result, model: Type[BaseModel], **kwargs) -> dict:
+    # Access the output correctly from CrewOutput
+    raw = result.raw if hasattr(result, 'raw') else str(result)
+    return parse_output(raw, model, **kwargs)
+
+
+# -------- Incremental item streaming --------
+class StreamingItemParser:
+    """Feed streamed text; emits each object of `"<key>": [ ... ]` once it is complete."""
+
+    def __init__(self, key: str, item_model: Type[BaseModel], on_item: Callable[[dict], None]):
+        self.key = key
+        self.item_model = item_model
+        self.on_item = on_item
+        self.items: List[dict] = []
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._item_start = -1
+        self._in_string = False
+        self._escape = False
+        self._key_re = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+
+    def feed(self, chunk: str) -> None:
+        if self._done:
+            return
+        self._buffer += chunk
+        if not self._in_array:
+            # re-check a little of the old text in case the key straddled two chunks
+            match = self._key_re.search(self._buffer, max(0, self._pos - len(self.key) - 64))
+            if not match:
+                self._pos = len(self._buffer)
+                return
+            self._in_array = True
+            self._pos = match.end()
+        self._scan()
+
+    def _scan(self) -> None:
+        buf = self._buffer
+        while self._pos < len(buf) and self._in_array:
+            ch = buf[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._item_start != -1:
+                    self._emit(buf[self._item_start:self._pos + 1])
+                    self._item_start = -1
+            elif ch == "]" and self._depth == 0:
+                self._in_array = False
+                self._done = True
+            self._pos += 1
+
+    def _emit(self, text: str) -> None:
+        try:
+            item = self.item_model.model_validate(_loads_lenient(text)).model_dump()
+        except (ValidationError, json.JSONDecodeError):
+            return  # the final parse_output pass repairs it
+        self.items.append(item)
+        self.on_item(item)
+
+
+# streams opened by the calling thread's stream_items() blocks; threads started
+# elsewhere (speculative runs, other crews) do not see them
+_active_streams: contextvars.ContextVar[Tuple[StreamingItemParser, ...]] = contextvars.ContextVar(
+    "active_streams", default=())
+
+
+def feed_token(token: str) -> None:
+    """Called by the LLM callback for every streamed token."""
+    for stream in _active_streams.get():
+        stream.feed(token)
+
+
+@contextmanager
+def stream_items(key: str, item_model: Type[BaseModel], on_item: Callable[[dict], None]) -> Iterator[StreamingItemParser]:
+    """Surface complete `key` items from agent tokens while the block runs (this context only)."""
+    parser = StreamingItemParser(key, item_model, on_item)
+    token = _active_streams.set(_active_streams.get() + (parser,))
+    try:
+        yield parser
+    finally:
+        _active_streams.reset(token)
@@ -0,0 +1,101 @@
+"""
+Lazy registry for tools, agents, tasks and LLM clients.
+
+Factories are registered by name at import time (cheap) and only called the
+first time something asks for that name. The built object is then shared by
+every later caller. Names fetched while a factory runs are recorded as its
+dependencies, so resetting e.g. the resume tool also resets the agents, tasks
+and crews built on top of it.
+"""
+import threading
+from typing import Any, Callable, Dict, List, Set
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+_dependents: Dict[str, Set[str]] = {}
+# guards the dicts above; factories run under their own name's lock, so a slow
+# build (the resume tool embedding a PDF) only blocks callers of that name
+_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+_local = threading.local()
+_MISSING = object()
+
+
+def _building() -> List[str]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def register(name: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+    """Decorator: register a zero-argument factory under `name`."""
+    def decorator(factory: Callable[[], Any]) -> Callable[[], Any]:
+        _factories[name] = factory
+        return factory
+    return decorator
+
+
+def get(name: str) -> Any:
+    """Return the shared instance for `name`, building it on first use."""
+    stack = _building()
+    if stack:
+        with _lock:
+            _dependents.setdefault(name, set()).add(stack[-1])
+    # already built: no locking at all
+    instance = _instances.get(name, _MISSING)
+    if instance is not _MISSING:
+        return instance
+    with _lock:
+        if name not in _factories:
+            raise KeyError(f"Nothing registered under '{name}'")
+        build_lock = _build_locks.setdefault(name, threading.Lock())
+    with build_lock:
+        # another thread may have built it while we waited
+        instance = _instances.get(name, _MISSING)
+        if instance is _MISSING:
+            stack.append(name)
+            try:
+                instance = _factories[name]()
+            finally:
+                stack.pop()
+            _instances[name] = instance
+        return instance
+
+
+def get_or_build(name: str, factory: Callable[[], Any]) -> Any:
+    """Like get(), registering `factory` first if `name` is not known yet."""
+    if name not in _instances and name not in _factories:
+        with _lock:
+            _factories.setdefault(name, factory)
+    return get(name)
+
+
+def is_built(name: str) -> bool:
+    return name in _instances
+
+
+def reset(name: str = None) -> None:
+    """Drop built instances (and everything built from them) so get() rebuilds them."""
+    with _lock:
+        if name is None:
+            _instances.clear()
+            _dependents.clear()
+            return
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            _instances.pop(current, None)
+            pending.extend(_dependents.pop(current, ()))
+
+
+def lazy_module_getattr(*names: str) -> Callable[[str], Any]:
+    """Build a module-level __getattr__ that resolves attributes via the registry.
+
+    Keeps `from tools import job_search_tool` style imports working while the
+    object itself is only constructed when first imported or accessed.
+    """
+    def __getattr__(attr: str) -> Any:
+        if attr in names:
+            return get(attr)
+        raise AttributeError(f"module has no attribute '{attr}'")
+    return __getattr__
@@ -0,0 +1,321 @@
+"""
+Deterministic fast-path resume parser.
+
+Builds the resume_parsing_task profile (skills, domains, experience_level,
+projects, strengths) locally from the PDF text: pypdf extraction, section
+detection and vocabulary lookups. No LLM calls. Fields that cannot be filled
+with confidence are reported as missing so only those go to the agent.
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from settings import RESUME_FULL_CONTEXT_MAX_CHARS
+
+PROFILE_FIELDS = ["skills", "domains", "experience_level", "projects", "strengths"]
+RESUME_TEXT_CACHE_MAX_ENTRIES = 500
+
+# canonical skill -> extra aliases (the canonical name always matches itself)
+SKILL_VOCABULARY: Dict[str, List[str]] = {
+    "Python": [], "Java": [], "C++": ["cpp"], "C": [], "Go": ["golang"], "Rust": [],
+    "JavaScript": ["js"], "TypeScript": [], "SQL": [], "R": [], "Scala": [], "Kotlin": [],
+    "Bash": ["shell scripting"],
+    "Machine Learning": ["ml"], "Deep Learning": [], "NLP": ["natural language processing"],
+    "Computer Vision": [], "LLMs": ["llm", "large language models"], "RAG": [],
+    "Generative AI": ["genai", "gen ai"], "Reinforcement Learning": [],
+    "Data Analysis": ["data analytics"], "Statistics": [], "Data Visualization": [],
+    "TensorFlow": [], "PyTorch": ["torch"], "Keras": [], "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [], "NumPy": [], "Matplotlib": [], "OpenCV": [], "Hugging Face": ["huggingface", "transformers"],
+    "LangChain": [], "CrewAI": [], "XGBoost": [], "Spark": ["pyspark", "apache spark"],
+    "Hadoop": [], "Airflow": [], "Kafka": [], "dbt": [], "Tableau": [], "Power BI": ["powerbi"],
+    "Excel": [],
+    "FastAPI": [], "Flask": [], "Django": [], "Node.js": ["nodejs"], "React": ["reactjs", "react.js"],
+    "Next.js": ["nextjs"], "HTML": [], "CSS": [], "REST APIs": ["restful", "rest api", "rest apis"], "GraphQL": [],
+    "PostgreSQL": ["postgres"], "MySQL": [], "MongoDB": [], "Redis": [], "SQLite": [],
+    "ChromaDB": ["chroma"], "Pinecone": [], "FAISS": [],
+    "AWS": ["amazon web services"], "GCP": ["google cloud"], "Azure": [], "Docker": [],
+    "Kubernetes": ["k8s"], "Terraform": [], "CI/CD": [], "Git": ["github", "gitlab"],
+    "Linux": [], "MLOps": [], "MLflow": [],
+    "Communication": [], "Leadership": [], "Teamwork": ["collaboration"], "Problem Solving": [],
+}
+# names that are also ordinary words or letters ("go", "excel", "grade C"):
+# matched as written, as whole tokens
+CASE_SENSITIVE_SKILLS = {"C", "Go", "R", "Excel"}
+
+DOMAIN_KEYWORDS: Dict[str, List[str]] = {
+    "AI": ["machine learning", "deep learning", "artificial intelligence", "llm", "nlp",
+           "computer vision", "generative ai", "neural network"],
+    "FinTech": ["fintech", "payments", "banking", "trading", "credit", "fraud", "finance"],
+    "HealthTech": ["healthcare", "medical", "clinical", "hospital", "patient"],
+    "E-commerce": ["e-commerce", "ecommerce", "retail", "recommendation system"],
+    "EdTech": ["edtech", "education", "learning platform", "students"],
+    "Web Development": ["web application", "frontend", "backend", "full stack", "full-stack"],
+    "Data Engineering": ["data pipeline", "etl", "data warehouse", "spark", "airflow"],
+    "Cloud/DevOps": ["devops", "kubernetes", "docker", "ci/cd", "cloud infrastructure"],
+    "Cybersecurity": ["security", "cybersecurity", "penetration", "vulnerability"],
+}
+
+SECTION_HEADINGS: Dict[str, List[str]] = {
+    "summary": ["summary", "professional summary", "profile", "objective", "about me"],
+    "skills": ["skills", "technical skills", "skills & tools", "core skills", "technologies", "tech stack"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "internships"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "education": ["education", "academics"],
+    "strengths": ["strengths", "key strengths", "core competencies", "highlights"],
+    "achievements": ["achievements", "awards", "honors", "certifications", "publications"],
+}
+
+BULLET_CHARS = "•●▪■◦‣-*–"
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+
+# -------- Text extraction --------
+def extract_resume_text(pdf_path: str) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+_text_cache = None
+
+
+def resume_text(pdf_path: str) -> str:
+    """extract_resume_text(), cached on disk by file content."""
+    global _text_cache
+    from cache import SQLiteCache
+    from embeddings import file_digest
+
+    if _text_cache is None:
+        _text_cache = SQLiteCache("resume_text", max_entries=RESUME_TEXT_CACHE_MAX_ENTRIES)
+    key = file_digest(pdf_path)
+    text = _text_cache.get(key)
+    if text is None:
+        text = extract_resume_text(pdf_path)
+        _text_cache.set(key, text)
+    return text
+
+
+def full_context_text(pdf_path: str, max_chars: int = RESUME_FULL_CONTEXT_MAX_CHARS) -> Optional[str]:
+    """Resume text if it is short enough to hand to agents whole, else None."""
+    if max_chars <= 0:
+        return None
+    try:
+        text = resume_text(pdf_path).strip()
+    except Exception as e:
+        print(f"⚠️  Could not read {pdf_path} for full-context mode: {e}")
+        return None
+    # scanned PDFs have no text layer; the PDF tool is no better there, but it is the old path
+    if not text or len(text) > max_chars:
+        return None
+    return text
+
+
+# -------- Section detection --------
+def _heading_for(line: str) -> Optional[str]:
+    cleaned = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+    if not cleaned or len(cleaned) > 30:
+        return None
+    for section, names in SECTION_HEADINGS.items():
+        if cleaned in names:
+            return section
+    return None
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """Group non-empty lines under the last heading seen ('header' before any)."""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        heading = _heading_for(line)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return sections
+
+
+# -------- Vocabulary lookups --------
+def _term_pattern(term: str) -> re.Pattern:
+    # word-ish boundaries that still work for terms like "C++" or "CI/CD"
+    return re.compile(r"(?<![\w+#/.])" + re.escape(term.lower()) + r"(?![\w+#/])")
+
+
+def _token_pattern(term: str) -> re.Pattern:
+    # as written, and not part of "C#", "R&D" or "Go-to"
+    return re.compile(r"(?<![\w+#.&-])" + re.escape(term) + r"(?![\w+#&-])")
+
+
+# (skill, [(pattern, matches the text as written)]); aliases are never ambiguous
+_SKILL_PATTERNS = [
+    (skill, [(_token_pattern(skill), True) if skill in CASE_SENSITIVE_SKILLS else (_term_pattern(skill), False),
+             *((_term_pattern(a), False) for a in aliases)])
+    for skill, aliases in SKILL_VOCABULARY.items()
+]
+
+
+def find_skills(text: str) -> List[str]:
+    lowered = text.lower()
+    return [skill for skill, patterns in _SKILL_PATTERNS
+            if any(p.search(text if as_written else lowered) for p, as_written in patterns)]
+
+
+def find_domains(text: str, min_keywords: int = 1) -> List[str]:
+    """Domains with at least `min_keywords` distinct keywords in `text`."""
+    lowered = text.lower()
+    return [domain for domain, keywords in DOMAIN_KEYWORDS.items()
+            if sum(1 for k in keywords if _term_pattern(k).search(lowered)) >= min_keywords]
+
+
+# -------- Experience level --------
+_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:professional\s+|work\s+|industry\s+)?experience", re.I)
+_RANGE_RE = re.compile(
+    r"(?:(?P<m1>[A-Za-z]{3})[a-z]*\.?\s+|(?P<n1>\d{1,2})/)?(?P<y1>(?:19|20)\d{2})\s*[-–—to]+\s*"
+    r"(?:(?:(?P<m2>[A-Za-z]{3})[a-z]*\.?\s+|(?P<n2>\d{1,2})/)?(?P<y2>(?:19|20)\d{2})|(?P<present>present|current|now))",
+    re.I,
+)
+
+
+def _month(name: Optional[str], number: Optional[str], default: int) -> int:
+    if name and name.lower()[:3] in MONTHS:
+        return MONTHS[name.lower()[:3]]
+    if number and 1 <= int(number) <= 12:
+        return int(number)
+    return default
+
+
+def _experience_months(lines: List[str]) -> int:
+    today = date.today()
+    total = 0
+    for line in lines:
+        for m in _RANGE_RE.finditer(line):
+            start = int(m["y1"]) * 12 + _month(m["m1"], m["n1"], 1)
+            if m["present"]:
+                end = today.year * 12 + today.month
+            else:
+                end = int(m["y2"]) * 12 + _month(m["m2"], m["n2"], 12)
+            total += max(0, end - start)
+    return total
+
+
+def infer_experience_level(sections: Dict[str, List[str]], text: str) -> Optional[str]:
+    years_claimed = [float(y) for y in _YEARS_RE.findall(text)]
+    if years_claimed:
+        years = max(years_claimed)
+    else:
+        experience = sections.get("experience", [])
+        if not experience:
+            return None
+        months = _experience_months(experience)
+        if months == 0:
+            return None
+        only_internships = all("intern" in l.lower() for l in experience if _RANGE_RE.search(l))
+        if only_internships:
+            return "intern"
+        years = months / 12
+
+    if years < 2:
+        return "junior"
+    if years < 5:
+        return "mid"
+    return "senior"
+
+
+# -------- Projects --------
+def _is_bullet(line: str) -> bool:
+    return line[0] in BULLET_CHARS
+
+
+_CONTINUES_RE = re.compile(r"([,;:&(/-]|\b(?:and|or|with|of|to|the|for|in|on|using|by|a|an))$", re.I)
+
+
+def join_wrapped_lines(lines: List[str]) -> List[str]:
+    """Rejoin bullets that the PDF text layer broke across lines.
+
+    A non-bullet line continues the bullet above it when it starts in lower
+    case or a digit, or when the bullet stops mid-phrase (comma, 'and', ...).
+    """
+    joined: List[str] = []
+    in_bullet = False
+    for line in lines:
+        if _is_bullet(line):
+            joined.append(line)
+            in_bullet = True
+        elif in_bullet and (line[0].islower() or line[0].isdigit() or _CONTINUES_RE.search(joined[-1])):
+            joined[-1] = f"{joined[-1]} {line}"
+        else:
+            joined.append(line)
+            in_bullet = False
+    return joined
+
+
+def parse_projects(lines: List[str]) -> List[Dict]:
+    projects: List[Dict] = []
+    for line in join_wrapped_lines(lines):
+        if not _is_bullet(line) and len(line) <= 100 and not line.endswith("."):
+            # "Title | Python, FastAPI" style headers carry the tech stack inline
+            parts = re.split(r"\s[|–—]\s", line, maxsplit=1)
+            title = parts[0].strip()
+            tech_part = parts[1] if len(parts) > 1 else ""
+            projects.append({"title": title, "bullets": [], "tech_text": tech_part})
+        elif projects:
+            projects[-1]["bullets"].append(line.lstrip(BULLET_CHARS + " "))
+
+    parsed = []
+    for p in projects:
+        body = " ".join([p["tech_text"], *p["bullets"]])
+        # prefer a bullet with a number as the impact statement
+        impact = next((b for b in p["bullets"] if re.search(r"\d", b)), p["bullets"][0] if p["bullets"] else "")
+        parsed.append({"title": p["title"], "impact": impact, "tech": find_skills(body)})
+    return [p for p in parsed if p["title"]]
+
+
+# -------- Public entry point --------
+def fast_parse_resume(pdf_path: str, text: Optional[str] = None) -> Tuple[Dict, List[str]]:
+    """Return (profile, missing_fields).
+
+    `profile` only contains fields filled with confidence; every other field is
+    listed in `missing_fields` for the agent to fill. Skills are only read from
+    a Skills section and domains need two keywords each, so a stray mention is
+    left to the agent. If the PDF cannot be read locally, every field is missing.
+    """
+    if text is None:
+        try:
+            text = resume_text(pdf_path)
+        except Exception as e:
+            print(f"⚠️  Fast resume parser could not read {pdf_path}: {e}")
+            return {}, list(PROFILE_FIELDS)
+
+    sections = split_sections(text)
+    profile: Dict = {}
+
+    # words anywhere else in a resume ("go", "rest", "node") are not skill lists
+    skills = find_skills("\n".join(sections.get("skills", [])))
+    if skills:
+        profile["skills"] = skills
+
+    # headings like "Education" would otherwise look like domain keywords
+    body = "\n".join(l for name, lines in sections.items() if name != "education" for l in lines)
+    domains = find_domains(body, min_keywords=2)
+    if domains:
+        profile["domains"] = domains
+
+    level = infer_experience_level(sections, text)
+    if level:
+        profile["experience_level"] = level
+
+    projects = parse_projects(sections.get("projects", []))
+    if projects:
+        profile["projects"] = projects
+
+    strengths = [l.lstrip(BULLET_CHARS + " ") for l in sections.get("strengths", [])]
+    if strengths:
+        profile["strengths"] = strengths
+
+    missing = [f for f in PROFILE_FIELDS if f not in profile]
+    return profile, missing
@@ -0,0 +1,132 @@
+"""
+Embedding similarity between the parsed resume profile and job postings.
+
+The profile (skills, projects, domains) and every job (title, company,
+location, description snippet) are embedded, then all jobs are scored in one
+matrix-vector product. Each job dict gets a `match_score` in [0, 1].
+
+rerank() orders the BM25 candidate pool by a blend of its relevance and the
+match score before the job search tool cuts it to the shortlist.
+"""
+import hashlib
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import registry
+from embeddings import RESUME_EMBEDDING_MODEL, CachedEmbeddingFunction
+
+# "google" reuses the resume tool's embedding model; "hashing" is local and deterministic
+SCORING_EMBEDDER = os.environ.get("SCORING_EMBEDDER", "google")
+HASHING_DIM = 512
+# share of match_score in the shortlist order; the rest is BM25 relevance
+JOB_MATCH_WEIGHT = float(os.environ.get("JOB_MATCH_WEIGHT", 0.5))
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+# -------- Embedders --------
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder (feature hashing), for offline runs and tests."""
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        matrix = np.zeros((len(input), self.dim), dtype=np.float32)
+        for row, text in enumerate(input):
+            tokens = re.findall(r"[a-z0-9+#]+", text.lower())
+            # unigrams plus bigrams so "machine learning" differs from its parts
+            for feature in tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]:
+                digest = hashlib.md5(feature.encode("utf-8")).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                matrix[row, index] += sign
+        return matrix.tolist()
+
+
+def google_embedder() -> Embedder:
+    """Google embeddings with the same model as resume_reader_tool, cached per text."""
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    client = GoogleGenerativeAIEmbeddings(
+        model=RESUME_EMBEDDING_MODEL,
+        task_type="SEMANTIC_SIMILARITY",
+    )
+    return CachedEmbeddingFunction(client.embed_documents, f"{RESUME_EMBEDDING_MODEL}:similarity")
+
+
+def get_embedder() -> Embedder:
+    """The shared scoring embedder, built on first use (see registry.py)."""
+    return registry.get("scoring_embedder")
+
+
+@registry.register("scoring_embedder")
+def build_embedder(kind: str = SCORING_EMBEDDER) -> Embedder:
+    if kind == "hashing":
+        return HashingEmbedder()
+    try:
+        return google_embedder()
+    except Exception as e:
+        # scoring is an extra signal, never worth failing the search over
+        print(f"⚠️  Google embeddings unavailable ({e}), using local hashing embedder")
+        return HashingEmbedder()
+
+
+# -------- Texts to embed --------
+def profile_text(profile: Dict) -> str:
+    parts = [
+        "Skills: " + ", ".join(profile.get("skills", [])),
+        "Domains: " + ", ".join(profile.get("domains", [])),
+    ]
+    for project in profile.get("projects", []):
+        parts.append(f"Project: {project.get('title', '')}. {project.get('impact', '')} "
+                     f"Tech: {', '.join(project.get('tech', []))}")
+    return "\n".join(parts)
+
+
+def job_text(job: Dict, snippet: str = "") -> str:
+    return f"{job.get('title', '')} at {job.get('company', '')}, {job.get('location', '')}. {snippet}".strip()
+
+
+# -------- Scoring --------
+def cosine_scores(profile_vector: np.ndarray, job_matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of one vector against every row, computed in one product."""
+    job_norms = np.linalg.norm(job_matrix, axis=1)
+    profile_norm = np.linalg.norm(profile_vector)
+    denom = np.where(job_norms * profile_norm == 0, 1.0, job_norms * profile_norm)
+    return (job_matrix @ profile_vector) / denom
+
+
+def score_jobs(profile: Dict, jobs: List[Dict], snippets: Optional[List[str]] = None,
+               embedder: Optional[Embedder] = None) -> List[Dict]:
+    """Attach `match_score` to each job (in place); returns the jobs in their incoming order."""
+    if not jobs or not profile:
+        return jobs
+    embedder = embedder or get_embedder()
+    snippets = snippets or [""] * len(jobs)
+
+    texts = [profile_text(profile)] + [job_text(j, s) for j, s in zip(jobs, snippets)]
+    vectors = np.asarray(embedder(texts), dtype=np.float32)
+    scores = cosine_scores(vectors[0], vectors[1:])
+
+    # cosine is in [-1, 1]; clip to [0, 1] so it reads as a match percentage
+    for job, score in zip(jobs, np.clip(scores, 0.0, 1.0)):
+        job["match_score"] = round(float(score), 3)
+    return jobs
+
+
+def rerank(profile: Dict, jobs: List[Dict], snippets: Optional[List[str]] = None,
+           embedder: Optional[Embedder] = None, weight: float = JOB_MATCH_WEIGHT) -> List[Dict]:
+    """Score the jobs, then sort them by blended BM25 relevance and match_score, best first."""
+    if not jobs or not profile:
+        return jobs
+    score_jobs(profile, jobs, snippets, embedder)
+    # bm25 scores are unbounded: scale them by the best one in the pool
+    top = max((j.get("relevance") or 0.0 for j in jobs), default=0.0) or 1.0
+    blended = np.array([(1 - weight) * (j.get("relevance") or 0.0) / top + weight * j["match_score"]
+                        for j in jobs])
+    # stable, so ties keep the BM25 order
+    return [jobs[i] for i in np.argsort(-blended, kind="stable")]
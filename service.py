@@ -0,0 +1,302 @@
+"""
+JobHunt CrewAI - HTTP Service
+Serves the two-phase flow to many candidates from one process.
+
+Each candidate gets a session (kept in the local SQLite cache) that moves
+through the same steps as the CLI. Crew kickoffs run in a bounded process
+pool, so the event loop keeps serving requests while crews work, and the
+per-process resume tool never sees two resumes at once.
+
+    POST   /sessions                 multipart: resume (PDF), preferred_roles, preferred_domains
+    GET    /sessions/{id}            status and results so far
+    POST   /sessions/{id}/selection  {"selected_roles": [...], "location": "...", "experience_level": "..."}
+    POST   /sessions/{id}/job        {"job_index": 0}
+    DELETE /sessions/{id}
+    GET    /metrics                  Prometheus text, spans from all worker processes
+
+Long steps return 202 at once; poll GET /sessions/{id} until the status moves on:
+phase1_running → awaiting_selection → searching → awaiting_job_choice → optimizing → done
+(or error).
+
+Usage:
+    python service.py --port 8080 --workers 4
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+import tracing
+from batch import DEFAULT_LOCATION, EXPERIENCE_LEVELS, select_experience_level
+from cache import SQLiteCache
+
+SERVICE_WORKERS = int(os.environ.get("SERVICE_WORKERS", 2))
+SERVICE_UPLOAD_DIR = os.environ.get("SERVICE_UPLOAD_DIR", ".cache/uploads")
+SERVICE_MAX_UPLOAD_BYTES = int(os.environ.get("SERVICE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", 24 * 60 * 60))
+SESSION_MAX_ENTRIES = int(os.environ.get("SESSION_MAX_ENTRIES", 10000))
+
+
+# -------- Session store --------
+class SessionStore:
+    """Sessions as JSON documents in SQLiteCache (TTL and LRU bounded)."""
+
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        # SQLiteCache has __len__, so an injected empty store is falsy: test for None
+        self.cache = cache if cache is not None else SQLiteCache(
+            "sessions", ttl_seconds=SESSION_TTL_SECONDS, max_entries=SESSION_MAX_ENTRIES
+        )
+
+    def create(self, **fields) -> Dict:
+        session = {"id": uuid.uuid4().hex, "created": time.time(), **fields}
+        self.save(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        return self.cache.get(session_id)
+
+    def save(self, session: Dict) -> None:
+        session["updated"] = time.time()
+        self.cache.set(session["id"], session)
+
+    def update(self, session_id: str, **fields) -> Optional[Dict]:
+        session = self.get(session_id)
+        if session is not None:
+            session.update(fields)
+            self.save(session)
+        return session
+
+    def delete(self, session_id: str) -> None:
+        self.cache.delete(session_id)
+
+
+# -------- Crew steps (run in worker processes) --------
+def _phase1(resume_file: str, preferred_roles: List[str], preferred_domains: List[str]) -> Dict:
+    import crew1
+    return crew1.run_phase1({
+        "resume_file": resume_file,
+        "preferred_roles": preferred_roles,
+        "preferred_domains": preferred_domains,
+    })
+
+
+def _job_search(selection: Dict, resume_file: str, profile: Dict) -> List[Dict]:
+    import crew2
+    return crew2.run_job_search(
+        selection["selected_roles"], selection["location"], selection["experience_level"],
+        resume_file=resume_file, skills=profile.get("skills"), profile=profile,
+    )
+
+
+def _optimize(job: Dict, resume_file: str) -> Dict:
+    import crew2
+    return crew2.run_resume_optimization(job, resume_file=resume_file)
+
+
+def _run_step(fn: Callable, *args) -> Dict:
+    """fn(*args) in a worker, with the worker's trace written and its metrics attached."""
+    step: Dict = {"pid": os.getpid()}
+    try:
+        step["result"] = fn(*args)
+    except Exception as e:
+        step["error"] = f"{type(e).__name__}: {e}"
+    step["counters"] = tracing.tracer.counters_snapshot()
+    # worker processes skip atexit, so write the trace file after every step
+    tracing.flush()
+    return step
+
+
+def start_step(app: web.Application, session_id: str, result_field: str, done_status: str,
+               fn: Callable, *args) -> None:
+    """Run fn(*args) in the worker pool; store its result on the session when done."""
+    async def run():
+        loop = asyncio.get_running_loop()
+        try:
+            step = await loop.run_in_executor(app["pool"], _run_step, fn, *args)
+        except Exception as e:
+            # the worker process itself died
+            app["sessions"].update(session_id, status="error", error=f"{type(e).__name__}: {e}")
+            return
+        # worker counters are cumulative, so the latest snapshot per process is its total
+        app["worker_counters"][step["pid"]] = step["counters"]
+        if "error" in step:
+            app["sessions"].update(session_id, status="error", error=step["error"])
+        else:
+            app["sessions"].update(session_id, status=done_status, **{result_field: step["result"]})
+
+    task = asyncio.create_task(run())
+    # keep a reference until the step finishes, or the task may be collected
+    app["steps"].add(task)
+    task.add_done_callback(app["steps"].discard)
+
+
+# -------- Request helpers --------
+def _split(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip() for v in (value or []) if isinstance(v, str) and v.strip()]
+
+
+def _load_session(request: web.Request, expected_status: Optional[str] = None) -> Dict:
+    session = request.app["sessions"].get(request.match_info["session_id"])
+    if session is None:
+        raise web.HTTPNotFound(reason="Unknown or expired session")
+    if expected_status and session["status"] != expected_status:
+        raise web.HTTPConflict(reason=f"Session is {session['status']}, expected {expected_status}")
+    return session
+
+
+async def _json_body(request: web.Request) -> Dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(reason="Body must be JSON")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(reason="Body must be a JSON object")
+    return body
+
+
+async def _save_upload(field) -> str:
+    data = await field.read(decode=True)
+    if not data.startswith(b"%PDF"):
+        raise web.HTTPBadRequest(reason="resume must be a PDF")
+    # content-addressed, so re-uploads reuse the resume's checkpoints and vectors
+    os.makedirs(SERVICE_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(SERVICE_UPLOAD_DIR, hashlib.sha256(data).hexdigest() + ".pdf")
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return path
+
+
+# -------- Handlers --------
+async def create_session(request: web.Request) -> web.Response:
+    """Upload a resume and start Phase 1."""
+    if not request.content_type.startswith("multipart/"):
+        raise web.HTTPBadRequest(reason="Send multipart/form-data with a 'resume' PDF")
+    resume_file, fields = None, {}
+    reader = await request.multipart()
+    async for field in reader:
+        if field.name == "resume":
+            resume_file = await _save_upload(field)
+        elif field.name:
+            fields[field.name] = await field.text()
+    if resume_file is None:
+        raise web.HTTPBadRequest(reason="Missing 'resume' file field")
+
+    preferred_roles = _split(fields.get("preferred_roles"))
+    preferred_domains = _split(fields.get("preferred_domains"))
+    session = request.app["sessions"].create(
+        status="phase1_running",
+        resume_file=resume_file,
+        preferred_roles=preferred_roles,
+        preferred_domains=preferred_domains,
+    )
+    start_step(request.app, session["id"], "phase1", "awaiting_selection",
+               _phase1, resume_file, preferred_roles, preferred_domains)
+    return web.json_response(session, status=202)
+
+
+async def get_session(request: web.Request) -> web.Response:
+    return web.json_response(_load_session(request))
+
+
+async def select_roles(request: web.Request) -> web.Response:
+    """Choose roles, location and level (the CLI prompt), then start Phase 2A."""
+    session = _load_session(request, "awaiting_selection")
+    body = await _json_body(request)
+    phase1_data = session["phase1"]
+
+    # same fallbacks as the CLI prompt
+    roles = _split(body.get("selected_roles")) or phase1_data.get("good_fit_roles", [])[:1]
+    if not roles:
+        raise web.HTTPBadRequest(reason="selected_roles is required (Phase 1 found no good-fit role)")
+    experience_level = body.get("experience_level")
+    if experience_level is not None and experience_level not in EXPERIENCE_LEVELS:
+        raise web.HTTPBadRequest(reason=f"experience_level must be one of {', '.join(EXPERIENCE_LEVELS)}")
+    selection = {
+        "selected_roles": roles,
+        "location": (body.get("location") or "").strip() or DEFAULT_LOCATION,
+        "experience_level": select_experience_level(phase1_data, body),
+    }
+
+    session = request.app["sessions"].update(session["id"], status="searching", selection=selection)
+    start_step(request.app, session["id"], "jobs", "awaiting_job_choice",
+               _job_search, selection, session["resume_file"], phase1_data.get("profile", {}))
+    return web.json_response(session, status=202)
+
+
+async def choose_job(request: web.Request) -> web.Response:
+    """Pick one of the found jobs (by index) and start Phase 2B."""
+    session = _load_session(request, "awaiting_job_choice")
+    body = await _json_body(request)
+    jobs = session.get("jobs") or []
+    job_index = body.get("job_index", 0)
+    if not isinstance(job_index, int) or not 0 <= job_index < len(jobs):
+        raise web.HTTPBadRequest(reason=f"job_index must be between 0 and {len(jobs) - 1}")
+
+    session = request.app["sessions"].update(
+        session["id"], status="optimizing", selected_job=jobs[job_index]
+    )
+    start_step(request.app, session["id"], "suggestions", "done",
+               _optimize, jobs[job_index], session["resume_file"])
+    return web.json_response(session, status=202)
+
+
+async def delete_session(request: web.Request) -> web.Response:
+    session = _load_session(request)
+    request.app["sessions"].delete(session["id"])
+    return web.Response(status=204)
+
+
+async def healthz(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", "running_steps": len(request.app["steps"])})
+
+
+async def metrics(request: web.Request) -> web.Response:
+    text = tracing.tracer.prometheus_text(*request.app["worker_counters"].values())
+    return web.Response(body=text.encode("utf-8"), headers={"Content-Type": "text/plain; version=0.0.4"})
+
+
+# -------- App --------
+def build_app(workers: int = SERVICE_WORKERS, sessions: Optional[SessionStore] = None) -> web.Application:
+    app = web.Application(client_max_size=SERVICE_MAX_UPLOAD_BYTES)
+    app["sessions"] = sessions if sessions is not None else SessionStore()
+    app["steps"] = set()
+    app["worker_counters"] = {}
+
+    async def pool_context(app):
+        app["pool"] = ProcessPoolExecutor(max_workers=workers)
+        yield
+        app["pool"].shutdown(wait=False, cancel_futures=True)
+
+    app.cleanup_ctx.append(pool_context)
+    app.add_routes([
+        web.post("/sessions", create_session),
+        web.get("/sessions/{session_id}", get_session),
+        web.post("/sessions/{session_id}/selection", select_roles),
+        web.post("/sessions/{session_id}/job", choose_job),
+        web.delete("/sessions/{session_id}", delete_session),
+        web.get("/healthz", healthz),
+        web.get("/metrics", metrics),
+    ])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the JobHunt pipeline over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="worker processes for crew runs")
+    args = parser.parse_args()
+    web.run_app(build_app(args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
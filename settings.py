@@ -0,0 +1,23 @@
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Resume used by both phases and the PDF search tool
+RESUME_PDF = os.environ.get("RESUME_PDF", "/Users/apple/Desktop/jobhunt-crewai/resume.pdf")
+
+# Parse the resume locally first and only ask the agent for fields it missed
+RESUME_FAST_PATH = os.environ.get("RESUME_FAST_PATH", "1") != "0"
+
+# Resumes up to this many characters of text are given to agents whole instead of
+# through the PDF search tool (no embeddings, no Chroma); 0 always uses the tool
+RESUME_FULL_CONTEXT_MAX_CHARS = int(os.environ.get("RESUME_FULL_CONTEXT_MAX_CHARS", 16000))
+
+# Phase 1 classifies each preferred role in its own crew, this many at a time
+CAREER_FIT_MAX_CONCURRENCY = int(os.environ.get("CAREER_FIT_MAX_CONCURRENCY", 4))
+# Hard budget for the Phase 1 agents: reasoning/tool iterations per task (no delegation)
+PHASE1_AGENT_MAX_ITER = int(os.environ.get("PHASE1_AGENT_MAX_ITER", 5))
+
+# Speculative Phase 2B: optimize the resume for the top-k jobs while the user picks one
+SPECULATIVE_TOP_K = int(os.environ.get("SPECULATIVE_TOP_K", 3))
+SPECULATIVE_MAX_CONCURRENCY = int(os.environ.get("SPECULATIVE_MAX_CONCURRENCY", 2))
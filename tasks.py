@@ -1,26 +1,30 @@
-from dotenv import load_dotenv
-import os
+import registry
+from compaction import compact_schema
 
-load_dotenv()
-google_api_key = os.environ["GOOGLE_API_KEY"]
+# Tasks are built on first use (see registry.py). Each build_* function takes the
+# agent to bind, defaulting to the shared one, so callers can build isolated copies.
 
-from crewai import Task
-from agents import resume_parser_agent, career_fit_agent, job_search_agent, resume_optimizer_agent
 
 # Task for Resume Parser Agent
-resume_parsing_task = Task(
-    description=(
-        "Read and analyze the resume PDF file using the PDF reader tool. "
-        "The resume is located at: {resume_file} "
-        "Search through the entire PDF content to extract: "
-        "1) All technical and soft skills mentioned, "
-        "2) Domains/industries of expertise, "
-        "3) Experience level (intern/junior/mid/senior) based on years and roles, "
-        "4) Projects with their titles, impact/achievements, and technologies used, "
-        "5) Key strengths and capabilities. "
-        "Be thorough and comprehensive. Output ONLY valid JSON matching the expected schema."
-    ),
-    expected_output="""
+def build_resume_parsing_task(agent=None):
+    from crewai import Task
+    if agent is None:
+        from agents import resume_parser_agent as agent
+    return Task(
+        description=(
+            "Read and analyze the resume. "
+            "The resume is located at: {resume_file} {resume_context} "
+            "Go through the entire resume content to extract: "
+            "1) All technical and soft skills mentioned, "
+            "2) Domains/industries of expertise, "
+            "3) Experience level (intern/junior/mid/senior) based on years and roles, "
+            "4) Projects with their titles, impact/achievements, and technologies used, "
+            "5) Key strengths and capabilities. "
+            "These fields were already extracted locally, copy them into your output unchanged: {known_profile} "
+            "Only look in the resume for these remaining fields: {missing_fields} "
+            "Be thorough and comprehensive. Output ONLY valid JSON matching the expected schema."
+        ),
+        expected_output=compact_schema("""
 {
   "skills": ["string"],
   "domains": ["string"],
@@ -30,21 +34,25 @@ resume_parsing_task = Task(
   ],
   "strengths": ["string"]
 }
-""",
-    agent=resume_parser_agent
-)
+"""),
+        agent=agent
+    )
 
 # Task for Career Fit Analyser
-career_fit_task = Task(
-    description=(
-        "Analyze the structured resume profile from the previous task. "
-        "The user is interested in these roles: {preferred_roles} "
-        "The user is interested in these domains: {preferred_domains} "
-        "Classify each role into good fit, stretch fit, or poor fit based on the resume profile. "
-        "Identify key skill gaps. "
-        "Output ONLY valid JSON matching the exact schema."
-    ),
-    expected_output="""
+def build_career_fit_task(agent=None):
+    from crewai import Task
+    if agent is None:
+        from agents import career_fit_agent as agent
+    return Task(
+        description=(
+            "Analyze this structured resume profile: {resume_profile} "
+            "The user is interested in these roles: {preferred_roles} "
+            "The user is interested in these domains: {preferred_domains} "
+            "Classify each role into good fit, stretch fit, or poor fit based on the resume profile. "
+            "Identify key skill gaps. "
+            "Output ONLY valid JSON matching the exact schema."
+        ),
+        expected_output=compact_schema("""
 {
   "good_fit_roles": ["string"],
   "stretch_roles": ["string"],
@@ -52,23 +60,55 @@ career_fit_task = Task(
   "skill_gaps": ["string"],
   "reasoning": "string"
 }
-""",
-    agent=career_fit_agent,
-    context=[resume_parsing_task]  # Receives output from previous task
-)
+"""),
+        # The profile arrives through {resume_profile}: it may come from the local
+        # fast-path parser (resume_parser.py) instead of resume_parsing_task
+        agent=agent
+    )
+
+# Task for Career Fit Analyser, one role at a time (run in parallel, see crew1.py)
+def build_role_fit_task(agent=None):
+    from crewai import Task
+    if agent is None:
+        from agents import career_fit_agent as agent
+    return Task(
+        description=(
+            "Analyze this structured resume profile: {resume_profile} "
+            "The user is interested in these domains: {preferred_domains} "
+            "Role to evaluate: {role}. "
+            "Classify only this role as good, stretch, or poor fit based on the resume profile. "
+            "List the skill gaps for this role. "
+            "Output ONLY valid JSON matching the exact schema."
+        ),
+        expected_output=compact_schema("""
+{
+  "role": "string",
+  "fit": "good|stretch|poor",
+  "skill_gaps": ["string"],
+  "reasoning": "string"
+}
+"""),
+        agent=agent
+    )
 
 # Task for Job Search Agent 
-job_search_task = Task(
-    description=(
-        "Search for job openings with these parameters: "
-        "Roles: {selected_roles} "
-        "Location: {location} "
-        "Experience level: {experience_level} "
-        "Use the job search tool to fetch current openings. "
-        "Return ONLY the top 5 most relevant jobs. "
-        "Output must strictly follow the JSON schema."
-    ),
-    expected_output="""
+def build_job_search_task(agent=None):
+    from crewai import Task
+    if agent is None:
+        from agents import job_search_agent as agent
+    return Task(
+        description=(
+            "Search for job openings with these parameters: "
+            "Roles: {selected_roles} "
+            "Location: {location} "
+            "Experience level: {experience_level} "
+            "Resume skills: {resume_skills} "
+            "Call the multi-role job search tool ONCE with all roles and the resume skills. "
+            "It returns a shortlist already ranked by relevance and resume match: return those jobs in the "
+            "same order with their match_score, without re-ranking or adding jobs. "
+            "Output must strictly follow the JSON schema."
+        ),
+        expected_output=compact_schema("""
 {
   "jobs": [
     {
@@ -76,28 +116,33 @@ job_search_task = Task(
       "company": "string",
       "location": "string",
       "apply_link": "string",
-      "posted_days_ago": "number|null"
+      "posted_days_ago": "number|null",
+      "match_score": "number|null"
     }
   ]
 }
-""",
-    agent=job_search_agent
-)
+"""),
+        agent=agent
+    )
 
 # Task for Resume Optimizer Agent
-resume_optimizer_task = Task(
-    description=(
-        "Read and analyze the resume PDF file using the PDF reader tool. "
-        "The resume is at: {resume_file} "
-        "Review it against this selected job: {selected_job} "
-        "Provide targeted resume improvements including: "
-        "1) Section-by-section improvement suggestions (summary, experience, projects, skills), "
-        "2) Specific bullets to rewrite with before/after versions, "
-        "3) Keywords to add for ATS optimization, "
-        "4) Keywords to remove if not relevant. "
-        "Do NOT fabricate experience. Provide only factual refinements based on existing content."
-    ),
-    expected_output="""
+def build_resume_optimizer_task(agent=None):
+    from crewai import Task
+    if agent is None:
+        from agents import resume_optimizer_agent as agent
+    return Task(
+        description=(
+            "Read and analyze the resume. "
+            "The resume is at: {resume_file} {resume_context} "
+            "Review it against this selected job: {selected_job} "
+            "Provide targeted resume improvements including: "
+            "1) Section-by-section improvement suggestions (summary, experience, projects, skills), "
+            "2) Specific bullets to rewrite with before/after versions, "
+            "3) Keywords to add for ATS optimization, "
+            "4) Keywords to remove if not relevant. "
+            "Do NOT fabricate experience. Provide only factual refinements based on existing content."
+        ),
+        expected_output=compact_schema("""
 {
   "section_improvements": {
     "summary": ["string"],
@@ -111,6 +156,17 @@ resume_optimizer_task = Task(
   "keywords_to_add": ["string"],
   "keywords_to_remove": ["string"]
 }
-""",
-    agent=resume_optimizer_agent
+"""),
+        agent=agent
+    )
+
+
+registry.register("resume_parsing_task")(build_resume_parsing_task)
+registry.register("career_fit_task")(build_career_fit_task)
+registry.register("role_fit_task")(build_role_fit_task)
+registry.register("job_search_task")(build_job_search_task)
+registry.register("resume_optimizer_task")(build_resume_optimizer_task)
+
+__getattr__ = registry.lazy_module_getattr(
+    "resume_parsing_task", "career_fit_task", "role_fit_task", "job_search_task", "resume_optimizer_task"
 )
@@ -0,0 +1,89 @@
+import pytest
+
+import cache as cache_module
+from cache import SQLiteCache
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = SQLiteCache("jobs", path=":memory:", ttl_seconds=60)
+    cache.set("a", {"jobs": [1, 2]})
+    clock.now += 60
+    assert cache.get("a") == {"jobs": [1, 2]}
+    clock.now += 1
+    assert cache.get("a") is None
+    # the expired row is deleted on read
+    assert len(cache) == 0
+
+
+def test_reads_do_not_extend_the_ttl(clock):
+    cache = SQLiteCache("jobs", path=":memory:", ttl_seconds=60)
+    cache.set("a", 1)
+    clock.now += 50
+    assert cache.get("a") == 1
+    clock.now += 20
+    assert cache.get("a") is None
+
+
+def test_expired_entries_are_evicted_on_write(clock):
+    cache = SQLiteCache("jobs", path=":memory:", ttl_seconds=60)
+    cache.set("old", 1)
+    clock.now += 61
+    cache.set("new", 2)
+    assert cache.keys() == ["new"]
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = SQLiteCache("jobs", path=":memory:", max_entries=2)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    # reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    clock.now += 1
+    cache.set("c", 3)
+    assert sorted(cache.keys()) == ["a", "c"]
+
+
+def test_hit_and_miss_counters(clock):
+    cache = SQLiteCache("jobs", path=":memory:", ttl_seconds=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("a") == 1
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 0}
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0}
+
+
+def test_namespaces_share_a_file_without_mixing(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    jobs = SQLiteCache("jobs", path=path, max_entries=1)
+    sessions = SQLiteCache("sessions", path=path)
+    jobs.set("k", "job")
+    sessions.set("k", "session")
+    sessions.set("k2", "session 2")
+    # eviction in one namespace leaves the other alone
+    jobs.set("k3", "job 3")
+    assert jobs.keys() == ["k3"]
+    assert sessions.get("k") == "session"
+    assert len(sessions) == 2
+    jobs.clear()
+    assert len(sessions) == 2
@@ -0,0 +1,15 @@
+from checkpoints import CheckpointStore
+
+
+def test_should_save_skips_empty_results(tmp_path):
+    store = CheckpointStore(path=str(tmp_path / "cache.db"), enabled=True)
+    runs = []
+
+    def search():
+        runs.append(1)
+        return [] if len(runs) == 1 else [{"title": "ML Engineer"}]
+
+    assert store.load_or_run("jobs", {"q": 1}, search, should_save=bool) == []
+    assert store.load_or_run("jobs", {"q": 1}, search, should_save=bool) == [{"title": "ML Engineer"}]
+    assert store.load_or_run("jobs", {"q": 1}, search, should_save=bool) == [{"title": "ML Engineer"}]
+    assert len(runs) == 2
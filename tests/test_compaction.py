@@ -0,0 +1,57 @@
+import json
+
+from compaction import compact_inputs, fit_list, fit_profile, render_prompt
+
+
+class Agent:
+    role, goal, backstory = "Career Fit Analyst", "Classify roles", "You have seen many resumes."
+
+
+class Task:
+    description = "Analyze this structured resume profile: {resume_profile} Roles: {preferred_roles}"
+    _original_description = description
+    expected_output = '{"good_fit_roles":["string"]}'
+
+
+class Crew:
+    agents, tasks = [Agent()], [Task()]
+
+
+PROFILE = {
+    "experience_level": "mid",
+    "skills": ["Python", "python", " PyTorch", "SQL", "PyTorch"],
+    "domains": ["AI", "ai"],
+    "projects": [{"title": "Fraud Model", "impact": "Cut fraud 18%", "tech": ["XGBoost", "xgboost"]},
+                 {"title": "fraud model", "impact": "duplicate", "tech": []}],
+    "strengths": ["Leadership", "leadership"],
+}
+
+
+def test_fit_profile_dedupes_case_insensitively():
+    data = json.loads(fit_profile(PROFILE, budget=1000))
+    assert data["skills"] == ["Python", " PyTorch", "SQL"]
+    assert data["domains"] == ["AI"] and data["strengths"] == ["Leadership"]
+    assert data["projects"] == [{"title": "Fraud Model", "tech": ["XGBoost"]}]
+
+
+def test_fit_list_dedupes_before_trimming():
+    skills = ["Python", "python", "Python ", "PYTHON"] * 20 + ["SQL", "Docker", "sql"]
+    assert fit_list(skills, budget=150) == "Python, SQL, Docker"
+    compacted = compact_inputs("job_search", {"resume_skills": skills, "role": "ML Engineer"})
+    assert compacted["resume_skills"] == "Python, SQL, Docker"
+
+
+def test_render_prompt_fills_placeholders():
+    assert render_prompt("roles: {roles} skills: {skills}", {"roles": "ML", "skills": ["Python"]}) == \
+        'roles: ML skills: ["Python"]'
+
+
+def test_compact_inputs_reports_full_prompt_tokens(capsys):
+    inputs = {"resume_profile": PROFILE, "preferred_roles": ["ML Engineer"]}
+    compacted = compact_inputs("career_fit", inputs, Crew())
+    line = capsys.readouterr().out.strip()
+    assert line.startswith("🗜️  career_fit prompt: ~") and "input budget" in line
+    assert isinstance(compacted["resume_profile"], str) and "impact" not in compacted["resume_profile"]
+    # logged even for tasks without a budget, where nothing shrinks
+    compact_inputs("resume_parsing", {"known_profile": "{}"}, Crew())
+    assert "resume_parsing prompt" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+from dedup import JobDeduper, canonical_link, dedupe_jobs, merge_jobs, normalize_city, normalize_title
+
+
+def job(title, company="Acme", location="Bengaluru, India", link=None):
+    return {"title": title, "company": company, "location": location, "apply_link": link}
+
+
+def test_normalization():
+    assert normalize_title("Sr. ML Eng (Remote)") == "senior machine learning engineer"
+    assert normalize_city("Bangalore, Karnataka") == "bengaluru"
+    assert normalize_city("Work from anywhere") == "remote"
+
+
+def test_canonical_link_strips_tracking_only():
+    link = "https://www.example.com/jobs/1/?utm_source=x&gclid=y&id=7#apply"
+    assert canonical_link(link) == "https://example.com/jobs/1?id=7"
+    assert canonical_link(None) is None
+
+
+def test_canonical_link_keeps_scheme_and_posting_params():
+    link = "http://careers.example.com/apply?source=board&ref=123&fbclid=z"
+    assert canonical_link(link) == "http://careers.example.com/apply?ref=123&source=board"
+
+
+def test_same_link_is_duplicate():
+    jobs = dedupe_jobs([job("Data Scientist", link="https://a.com/1?utm_medium=x"),
+                        job("Backend Engineer", link="https://a.com/1")])
+    assert len(jobs) == 1
+
+
+def test_repost_with_reworded_title_is_duplicate():
+    jobs = dedupe_jobs([job("Sr. ML Engineer", company="Acme Pvt Ltd", location="Bangalore"),
+                        job("Senior Machine Learning Engineer - Remote", location="Bengaluru, India")])
+    assert len(jobs) == 1
+
+
+def test_different_level_company_or_role_is_kept():
+    jobs = dedupe_jobs([
+        job("Software Engineer II"),
+        job("Software Engineer III"),
+        job("Software Engineer II", company="Other"),
+        job("Data Scientist"),
+    ])
+    assert len(jobs) == 4
+
+
+def test_direct_link_replaces_job_board_link():
+    kept = dedupe_jobs([job("Data Scientist", link="https://www.linkedin.com/jobs/1"),
+                        job("Data Scientist", link="https://acme.com/careers/1")])
+    assert kept[0]["apply_link"] == "https://acme.com/careers/1"
+
+
+def test_jobs_without_shingles_do_not_crash():
+    deduper = JobDeduper()
+    assert deduper.add(job("Urgent Hiring", company="B", location="")) is not None
+    assert deduper.add(job("डेटा वैज्ञानिक", company="B", location="")) is not None
+    # the same posting again is still caught by its exact key
+    assert deduper.add(job("Urgent Hiring", company="B", location="")) is None
+    assert len(deduper) == 2
+
+
+def test_kept_jobs_keep_their_original_link():
+    original = "https://www.acme.com/careers/1/?id=7&src=&utm_source=x"
+    kept = dedupe_jobs([job("Data Scientist", link=original),
+                        job("Data Scientist", link="https://acme.com/careers/1?id=7")])
+    assert len(kept) == 1
+    assert kept[0]["apply_link"] == original
+
+
+def test_preferred_direct_link_is_kept_as_given():
+    direct = "https://www.acme.com/careers/1/?ref=board"
+    kept = dedupe_jobs([job("Data Scientist", link="https://www.linkedin.com/jobs/1"),
+                        job("Data Scientist", link=direct)])
+    assert kept[0]["apply_link"] == direct
+
+
+def test_merge_keeps_role_order_and_drops_cross_role_duplicates():
+    ml_engineer = [
+        job("ML Engineer", link="https://www.linkedin.com/jobs/1"),
+        job("Data Scientist", company="Beta", link="https://beta.com/jobs/9"),
+    ]
+    data_scientist = [
+        job("Data Scientist", company="Beta", link="https://beta.com/jobs/9?utm_source=serper"),
+        job("Sr. Data Scientist", company="Gamma"),
+        # repost of the first ML Engineer posting with its direct link
+        job("Machine Learning Engineer", link="https://acme.com/careers/1"),
+    ]
+    merged = merge_jobs([ml_engineer, data_scientist])
+    assert [(j["title"], j["company"]) for j in merged] == [
+        ("ML Engineer", "Acme"), ("Data Scientist", "Beta"), ("Sr. Data Scientist", "Gamma"),
+    ]
+    assert merged[0]["apply_link"] == "https://acme.com/careers/1"
+    assert merged[1]["apply_link"] == "https://beta.com/jobs/9"
+    assert merge_jobs([]) == []
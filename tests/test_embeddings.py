@@ -0,0 +1,69 @@
+import tracing
+from cache import SQLiteCache
+from embeddings import CachedEmbeddingFunction, ResumeQueryMemo
+
+
+def test_injected_empty_cache_is_used():
+    cache = SQLiteCache("embeddings", path=":memory:")
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    embedder = CachedEmbeddingFunction(embed, "test-model", cache=cache)
+    assert embedder.cache is cache
+    assert embedder(["ab", "abc", "ab"]) == [[2.0], [3.0], [2.0]]
+    assert embedder(["abc"]) == [[3.0]]
+    # one API call for the distinct texts, the second call is served from the injected cache
+    assert calls == [["ab", "abc"]]
+    assert len(cache) == 2
+
+
+class StubSearch:
+    """Stands in for the PDF search tool: counts calls, answers with the query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, query):
+        self.queries.append(query)
+        return f"chunks for {query}"
+
+
+def search_as(memo, agent, collection, query, tool):
+    with tracing.span("agent", "task", agent=agent):
+        return memo.run(collection, query, lambda: tool(query))
+
+
+def test_resume_query_memo_reuses_near_matches_per_collection(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    memo = ResumeQueryMemo(threshold=0.8)
+    tool = StubSearch()
+
+    first = search_as(memo, "Resume Parser", "resume_a", "Python projects", tool)
+    # same terms once stopwords and plurals are dropped
+    assert search_as(memo, "Career Fit", "resume_a", "list the python project in the resume", tool) == first
+    assert search_as(memo, "Career Fit", "resume_a", "PROJECTS python", tool) == first
+    # too little overlap, and another resume, both search again
+    search_as(memo, "Career Fit", "resume_a", "Python projects and work experience", tool)
+    search_as(memo, "Career Fit", "resume_b", "Python projects", tool)
+
+    assert tool.queries == ["Python projects", "Python projects and work experience", "Python projects"]
+    assert memo.saved == {"Career Fit": 2}
+
+
+def test_resume_query_memo_counts_saved_searches_per_agent(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    memo = ResumeQueryMemo()
+    tool = StubSearch()
+    search_as(memo, "Resume Parser", "resume_a", "skills", tool)
+    search_as(memo, "Resume Parser", "resume_a", "Skills", tool)
+    search_as(memo, "Resume Optimizer", "resume_a", "skills", tool)
+    # only stopwords: matched on the exact query text, not on empty term sets
+    search_as(memo, "Resume Optimizer", "resume_a", "the resume", tool)
+    search_as(memo, "Resume Optimizer", "resume_a", "about the candidate", tool)
+    memo.run("resume_a", "skills", lambda: tool("skills"))
+
+    assert tool.queries == ["skills", "the resume", "about the candidate"]
+    assert memo.saved == {"Resume Parser": 1, "Resume Optimizer": 1, "unknown": 1}
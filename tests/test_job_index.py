@@ -0,0 +1,82 @@
+import json
+import sqlite3
+
+import job_index
+
+from job_index import JobIndex, job_key, posting_cities
+
+
+def job(title, location, company="Acme"):
+    return {"title": title, "company": company, "location": location,
+            "apply_link": f"https://jobs.example.com/{company}/{title}/{location}".replace(" ", "-")}
+
+
+def test_posting_cities():
+    assert posting_cities(job("ML Engineer", "Bangalore, Karnataka; Mumbai")) == ["bengaluru", "mumbai"]
+    assert posting_cities(job("ML Engineer (Remote)", "Pune, India")) == ["pune", "remote"]
+
+
+def test_rank_filters_by_normalized_city():
+    index = JobIndex(":memory:")
+    index.ingest([
+        job("ML Engineer", "Bengaluru, Karnataka, India"),
+        job("ML Engineer", "Mumbai, India", company="Other"),
+        job("ML Engineer - Remote", "India", company="Third"),
+    ], descriptions=["", "remote-friendly team", ""])
+    assert [j["company"] for j in index.rank(["ML Engineer"], location="Bangalore")] == ["Acme"]
+    # remote comes from location or title, not from the description text
+    assert [j["company"] for j in index.rank(["ML Engineer"], location="Remote")] == ["Third"]
+    both = index.rank(["ML Engineer"], location="Remote; Bangalore")
+    assert sorted(j["company"] for j in both) == ["Acme", "Third"]
+
+
+def test_old_index_gets_new_columns(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE job_postings (key TEXT PRIMARY KEY, data TEXT NOT NULL,"
+                 " first_seen REAL NOT NULL, last_seen REAL NOT NULL)")
+    # 3 days old when last seen on day 10
+    conn.execute("INSERT INTO job_postings VALUES ('k', ?, 0, ?)",
+                 (json.dumps(["Data Scientist", "Acme", "Bombay", None, 3.0]), 10 * job_index.DAY_SECONDS))
+    conn.commit()
+    JobIndex(path)
+    assert conn.execute("SELECT cities, levels, posted_at FROM job_postings").fetchone() == \
+        ("|mumbai|", None, 7 * job_index.DAY_SECONDS)
+
+
+def test_rank_limited_to_given_keys():
+    index = JobIndex(":memory:")
+    old = [dict(job("ML Engineer", "Pune", company=c), posted_days_ago=age) for c, age in (("Old", 40), ("Older", 60))]
+    new = [dict(job("ML Engineer", "Pune", company="New"), posted_days_ago=2)]
+    index.ingest(old + new)
+    assert len(index.rank(["ML Engineer"], limit=10)) == 3
+    # a search that returned only the fresh posting ranks only that one
+    assert [j["company"] for j in index.rank(["ML Engineer"], limit=10, keys=[job_key(j) for j in new])] == ["New"]
+    assert index.rank(["ML Engineer"], keys=[]) == []
+
+
+def test_rank_filters_by_experience_level():
+    index = JobIndex(":memory:")
+    index.ingest([job("Senior Backend Engineer", "Pune")], role="Backend Engineer", experience_level="senior")
+    index.ingest([job("Backend Engineer", "Pune", company="Junior Co")], role="Backend Engineer",
+                 experience_level="junior")
+    # found again by a junior search: now listed under both levels
+    index.ingest([job("Senior Backend Engineer", "Pune")], experience_level="mid")
+    assert [j["company"] for j in index.rank(["Backend Engineer"], experience_level="junior")] == ["Junior Co"]
+    assert [j["title"] for j in index.rank(["Backend Engineer"], experience_level="mid")] == \
+        ["Senior Backend Engineer"]
+    assert len(index.rank(["Backend Engineer"])) == 2
+
+
+def test_posting_age_is_computed_when_read(monkeypatch):
+    now = [100 * job_index.DAY_SECONDS]
+    monkeypatch.setattr(job_index.time, "time", lambda: now[0])
+    index = JobIndex(":memory:")
+    index.ingest([dict(job("ML Engineer", "Pune"), posted_days_ago="3 days ago"),
+                  job("ML Engineer", "Pune", company="Undated")])
+    now[0] += 2 * job_index.DAY_SECONDS
+    ages = {j["company"]: j["posted_days_ago"] for j in index.rank(["ML Engineer"])}
+    assert ages == {"Acme": 5.0, "Undated": None}
+    # a later sighting without an age keeps the known posting time
+    index.ingest([job("ML Engineer", "Pune")])
+    assert {j["company"]: j["posted_days_ago"] for j in index.rank(["ML Engineer"])}["Acme"] == 5.0
@@ -0,0 +1,27 @@
+from job_records import compact_jobs, is_fresh, job_from_stored, jobs_from_compact, posted_days
+
+
+def test_posted_days():
+    assert posted_days("3 days ago") == 3.0
+    assert posted_days("30+ days ago") == 30.0
+    assert abs(posted_days("5 hours ago") - 5 / 24) < 1e-9
+    assert posted_days("just posted") == 0.0
+    assert posted_days(None) is None and posted_days("soon") is None
+
+
+def test_compact_round_trip():
+    jobs = [{"title": "ML Engineer", "company": "Acme", "location": "Pune",
+             "apply_link": "https://example.com/1", "posted_days_ago": "2 days ago"}]
+    stored = compact_jobs(jobs)
+    assert stored["rows"] == [["ML Engineer", "Acme", "Pune", "https://example.com/1", 2.0]]
+    assert jobs_from_compact(stored) == [{**jobs[0], "posted_days_ago": 2.0}]
+    # the older cache format kept whole dicts
+    assert jobs_from_compact(jobs) == jobs_from_compact(stored)
+    assert job_from_stored(stored["rows"][0]) == jobs_from_compact(stored)[0]
+
+
+def test_freshness_keeps_unknown_ages():
+    jobs = [{"title": t, "posted_days_ago": age} for t, age in (("a", 1), ("b", 40), ("c", None), ("d", "2 days ago"))]
+    assert [is_fresh(j, 30) for j in jobs] == [True, False, True, True]
+    assert [is_fresh(j, 30, keep_unknown_age=False) for j in jobs] == [True, False, False, True]
+    assert all(is_fresh(j) for j in jobs)
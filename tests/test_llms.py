@@ -0,0 +1,179 @@
+import pytest
+
+import llms
+
+
+class RateLimited(Exception):
+    def __str__(self):
+        return "429 RESOURCE_EXHAUSTED"
+
+
+def failing(times):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= times:
+            raise RateLimited()
+        return "ok"
+    return fn, calls
+
+
+@pytest.fixture(autouse=True)
+def short_backoff(monkeypatch):
+    monkeypatch.setattr(llms, "LLM_BACKOFF_BASE_SECONDS", 0.001)
+
+
+def test_call_retries_429s_through_the_shared_cooldown():
+    limiter = llms.ModelRateLimiter("m", rpm=600, tpm=100_000)
+    fn, calls = failing(2)
+    retries = []
+    assert limiter.call(fn, estimated_tokens=100, on_retry=lambda n, e: retries.append(n)) == "ok"
+    assert len(calls) == 3 and retries == [1, 2]
+    assert limiter.rate_limited == 2 and limiter.consecutive_429s == 0
+
+
+def test_call_gives_up_after_max_retries():
+    limiter = llms.ModelRateLimiter("m", rpm=600, tpm=100_000)
+    fn, calls = failing(5)
+    with pytest.raises(RateLimited):
+        limiter.call(fn, max_retries=1)
+    assert len(calls) == 2 and limiter.rate_limited == 2
+
+
+def test_other_errors_are_not_retried():
+    limiter = llms.ModelRateLimiter("m", rpm=600, tpm=100_000)
+
+    def fn():
+        raise ValueError("bad request")
+    with pytest.raises(ValueError):
+        limiter.call(fn)
+    assert limiter.rate_limited == 0
+
+
+def test_started_raises_on_first_chunk():
+    def stream():
+        raise RateLimited()
+        yield "never"
+    with pytest.raises(RateLimited):
+        llms._started(stream())
+    assert list(llms._started(iter(["a", "b"]))) == ["a", "b"]
+    assert list(llms._started(iter([]))) == []
+
+
+def test_fixed_routes_use_the_default_model_for_every_task():
+    router = llms.ModelRouter(llms.FIXED_ROUTES, clients=lambda model, temperature, cache: model)
+    for task_type in llms.MODEL_ROUTES:
+        for tokens in (10, 10 * llms.LLM_ROUTE_LARGE_INPUT_TOKENS):
+            assert router.route(task_type, tokens)[0] == [llms.gemini_model]
+
+
+class StubModel:
+    """A crewai-style client: goes through the model's shared limiter like the Gemini client."""
+
+    def __init__(self, model, behaviour):
+        self.model = model
+        self.behaviour = behaviour
+        self.calls = 0
+
+    def call(self, messages):
+        def request():
+            self.calls += 1
+            return self.behaviour(self)
+        return llms.get_rate_limiter(self.model).call(request)
+
+
+def stub_router(models, task_type="judgment"):
+    routes = {"extraction": {"small": [], "large": []},
+              task_type: {"small": list(models), "large": list(models)}}
+    return llms.ModelRouter(routes, clients=lambda model, temperature, cache: models[model])
+
+
+def answer(text):
+    return lambda stub: text
+
+
+def rate_limited(stub):
+    raise RateLimited()
+
+
+def broken(stub):
+    raise ValueError("500 internal error")
+
+
+@pytest.fixture
+def fresh_models():
+    # limiters and routers are shared through the registry; give every test new ones
+    names = []
+
+    def make(name, behaviour):
+        names.append(name)
+        llms.registry.reset(f"rate_limiter:{name}")
+        return StubModel(name, behaviour)
+    yield make
+    for name in names:
+        llms.registry.reset(f"rate_limiter:{name}")
+
+
+def test_429_falls_back_at_once_and_cools_the_model_down(fresh_models, monkeypatch):
+    monkeypatch.setattr(llms, "LLM_BACKOFF_BASE_SECONDS", 30)
+    primary, fallback = fresh_models("stub-primary", rate_limited), fresh_models("stub-fallback", answer("ok"))
+    router = stub_router({"stub-primary": primary, "stub-fallback": fallback})
+
+    start = llms.time.monotonic()
+    assert router.complete("judgment", "classify") == "ok"
+    # no retries behind the 30 s cooldown while a fallback was available
+    assert llms.time.monotonic() - start < 5
+    assert primary.calls == 1 and fallback.calls == 1
+
+    # the next call starts on the fallback while the primary cools down
+    assert router.route("judgment", 10) == (["stub-fallback", "stub-primary"], {"stub-primary": "rate limited"})
+    assert router.complete("judgment", "classify again") == "ok"
+    assert primary.calls == 1 and fallback.calls == 2
+
+
+def test_last_candidate_still_retries_429s(fresh_models):
+    attempts = iter([RateLimited(), RateLimited(), None])
+
+    def flaky(stub):
+        error = next(attempts)
+        if error:
+            raise error
+        return "ok"
+    only = fresh_models("stub-only", flaky)
+    router = stub_router({"stub-only": only})
+    assert router.complete("judgment", "classify") == "ok"
+    assert only.calls == 3
+
+
+def test_unhealthy_model_is_skipped(fresh_models, monkeypatch):
+    monkeypatch.setattr(llms, "LLM_ROUTE_MIN_SAMPLES", 2)
+    primary, fallback = fresh_models("stub-failing", broken), fresh_models("stub-healthy", answer("ok"))
+    router = stub_router({"stub-failing": primary, "stub-healthy": fallback})
+
+    for _ in range(2):
+        assert router.complete("judgment", "classify") == "ok"
+    assert primary.calls == 2
+    ordered, skipped = router.route("judgment", 10)
+    assert ordered == ["stub-healthy", "stub-failing"] and skipped == {"stub-failing": "error rate 100%"}
+    assert router.complete("judgment", "classify") == "ok"
+    assert primary.calls == 2 and fallback.calls == 3
+
+
+def test_slow_model_is_skipped(fresh_models, monkeypatch):
+    monkeypatch.setattr(llms, "LLM_ROUTE_MIN_SAMPLES", 1)
+    slow, fast = fresh_models("stub-slow", answer("slow")), fresh_models("stub-fast", answer("fast"))
+    router = stub_router({"stub-slow": slow, "stub-fast": fast})
+    router._health("stub-slow").record(llms.LLM_ROUTE_MAX_LATENCY_SECONDS + 1, True)
+    assert router.complete("judgment", "classify") == "fast"
+    assert router.decisions[-1]["model"] == "stub-fast"
+    assert "median latency" in router.decisions[-1]["skipped"]["stub-slow"]
+
+
+def test_large_inputs_take_the_large_route(fresh_models):
+    small, large = fresh_models("stub-small", answer("small")), fresh_models("stub-large", answer("large"))
+    routes = {"extraction": {"small": ["stub-small"], "large": ["stub-large"]}}
+    router = llms.ModelRouter(routes, clients=lambda model, temperature, cache: {"stub-small": small,
+                                                                                 "stub-large": large}[model])
+    assert router.complete("extraction", "short") == "small"
+    assert router.complete("extraction", "x" * 4 * (llms.LLM_ROUTE_LARGE_INPUT_TOKENS + 1)) == "large"
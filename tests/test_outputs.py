@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from outputs import Job, OutputError, RoleFit, feed_token, parse_output, stream_items
+
+
+def test_streams_only_see_tokens_from_their_own_thread():
+    seen = []
+    other_thread = threading.Thread(target=feed_token, args=('{"jobs": [{"title": "Other", "company": "X", "location": "Pune"}]}',))
+    with stream_items("jobs", Job, on_item=seen.append) as parser:
+        other_thread.start()
+        other_thread.join()
+        feed_token('{"jobs": [{"title": "ML Engineer", "company": "Acme", "location": "Remote"}')
+        feed_token("]}")
+    feed_token('{"jobs": [{"title": "Late", "company": "Y", "location": "Pune"}]}')
+    assert [j["title"] for j in seen] == ["ML Engineer"]
+    assert parser.items == seen
+
+
+class RateLimited(Exception):
+    pass
+
+
+def failing_repair(fragment, model, error):
+    raise RateLimited("429 after retries")
+
+
+@pytest.mark.parametrize("raw", [
+    "not json at all",                      # repair of invalid JSON
+    '{"role": "ML Engineer", "fit": "ok"}',  # repair of a schema mismatch
+])
+def test_repair_failures_surface_as_output_error(raw):
+    with pytest.raises(OutputError) as info:
+        parse_output(raw, RoleFit, repair=failing_repair)
+    assert isinstance(info.value.__cause__, RateLimited)
+
+
+def test_repaired_output_is_validated():
+    fixed = parse_output('{"role": "ML Engineer", "fit": "ok"}', RoleFit,
+                         repair=lambda fragment, model, error: {"role": "ML Engineer", "fit": "good"})
+    assert fixed["fit"] == "good"
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import registry
+
+
+def test_slow_build_does_not_block_other_names():
+    release = threading.Event()
+    started = threading.Event()
+
+    @registry.register("test_slow_tool")
+    def build_slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    registry.register("test_fast_tool")(lambda: "fast")
+    registry.get_or_build("test_prebuilt", lambda: "prebuilt")
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            slow = pool.submit(registry.get, "test_slow_tool")
+            assert started.wait(5)
+            # neither a new build nor an already built name waits for the slow factory
+            assert registry.get("test_fast_tool") == "fast"
+            assert registry.get_or_build("test_prebuilt", lambda: "other") == "prebuilt"
+            assert not slow.done()
+            release.set()
+            assert slow.result(5) == "slow"
+    finally:
+        release.set()
+        registry.reset("test_slow_tool")
+        registry.reset("test_fast_tool")
+        registry.reset("test_prebuilt")
+
+
+def test_concurrent_gets_build_once():
+    calls = []
+    gate = threading.Barrier(8)
+
+    @registry.register("test_shared_client")
+    def build_shared():
+        calls.append(1)
+        return object()
+
+    def fetch():
+        gate.wait(5)
+        return registry.get("test_shared_client")
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instances = list(pool.map(lambda _: fetch(), range(8)))
+        assert len(calls) == 1
+        assert all(i is instances[0] for i in instances)
+    finally:
+        registry.reset("test_shared_client")
+
+
+def test_reset_rebuilds_dependents():
+    registry.register("test_base")(lambda: object())
+    registry.register("test_dependent")(lambda: ("built on", registry.get("test_base")))
+    try:
+        first = registry.get("test_dependent")
+        registry.reset("test_base")
+        assert not registry.is_built("test_dependent")
+        second = registry.get("test_dependent")
+        assert second[1] is not first[1]
+    finally:
+        registry.reset("test_base")
@@ -0,0 +1,39 @@
+from resume_parser import fast_parse_resume, find_skills, join_wrapped_lines, parse_projects
+
+RESUME = """Jane Doe
+Summary
+Ready to go the extra mile; I excel at REST and rest well. Built a CV pipeline on node clusters.
+Skills
+Python, Go, SQL, Excel, PyTorch
+Projects
+Fraud Detector | Python, XGBoost
+- Cut false positives by 30% using gradient boosted trees
+and a feature store built on Redis
+- Served predictions with FastAPI
+Chat Assistant
+- Answered support tickets with an LLM and RAG
+"""
+
+
+def test_ambiguous_skills_need_exact_tokens():
+    assert find_skills("ready to go, I excel at rest; CV attached; node") == []
+    assert find_skills("Go, C, R, Excel") == ["C", "Go", "R", "Excel"]
+    assert find_skills("C#, C++, R&D") == ["C++"]
+    assert find_skills("Golang and TypeScript") == ["Go", "TypeScript"]
+
+
+def test_skills_only_from_skills_section():
+    profile, missing = fast_parse_resume("resume.pdf", text=RESUME)
+    assert profile["skills"] == ["Python", "Go", "SQL", "PyTorch", "Excel"]
+    no_section = RESUME.replace("Skills\n", "")
+    profile, missing = fast_parse_resume("resume.pdf", text=no_section.split("Projects")[0])
+    assert "skills" not in profile and "skills" in missing
+
+
+def test_wrapped_bullets_are_not_projects():
+    lines = [l for l in RESUME.split("Projects\n")[1].splitlines() if l]
+    assert len(join_wrapped_lines(lines)) == 5
+    projects = parse_projects(lines)
+    assert [p["title"] for p in projects] == ["Fraud Detector", "Chat Assistant"]
+    assert projects[0]["impact"].endswith("built on Redis")
+    assert "Redis" in projects[0]["tech"]
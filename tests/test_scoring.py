@@ -0,0 +1,27 @@
+from scoring import HashingEmbedder, rerank, score_jobs
+
+
+def test_score_jobs_keeps_the_ranked_order():
+    profile = {"skills": ["Python", "PyTorch", "NLP"], "domains": ["AI"]}
+    jobs = [
+        {"title": "Accountant", "company": "Ledger", "location": "Pune"},
+        {"title": "NLP Engineer Python PyTorch", "company": "Acme", "location": "Remote"},
+    ]
+    scored = score_jobs(profile, jobs, embedder=HashingEmbedder())
+    assert [j["title"] for j in scored] == ["Accountant", "NLP Engineer Python PyTorch"]
+    assert scored[1]["match_score"] > scored[0]["match_score"]
+    assert all(0 <= j["match_score"] <= 1 for j in scored)
+
+
+def test_rerank_blends_relevance_with_match():
+    profile = {"skills": ["Python", "PyTorch", "NLP"]}
+    jobs = [
+        {"title": "Accountant", "company": "Ledger", "location": "Pune", "relevance": 9.0},
+        {"title": "NLP Engineer Python PyTorch", "company": "Acme", "location": "Remote", "relevance": 8.0},
+    ]
+    reranked = rerank(profile, [dict(j) for j in jobs], embedder=HashingEmbedder(), weight=0.5)
+    assert [j["company"] for j in reranked] == ["Acme", "Ledger"]
+    # without the match share the BM25 order stands
+    assert [j["company"] for j in rerank(profile, [dict(j) for j in jobs], embedder=HashingEmbedder(),
+                                         weight=0.0)] == ["Ledger", "Acme"]
+    assert rerank({}, jobs) == jobs
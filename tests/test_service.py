@@ -0,0 +1,167 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import service
+from cache import SQLiteCache
+
+PHASE1 = {
+    "good_fit_roles": ["ML Engineer"],
+    "stretch_roles": [],
+    "poor_fit_roles": [],
+    "skill_gaps": [],
+    "reasoning": "",
+    "profile": {"skills": ["Python"], "experience_level": "junior"},
+}
+JOBS = [
+    {"title": "ML Engineer", "company": "Acme", "location": "Remote", "apply_link": "https://a.example/1"},
+    {"title": "Data Scientist", "company": "Beta", "location": "Pune", "apply_link": "https://b.example/2"},
+]
+
+
+def _phase1(resume_file, preferred_roles, preferred_domains):
+    return PHASE1
+
+
+def _job_search(selection, resume_file, profile):
+    return [dict(job, searched_for=selection["selected_roles"]) for job in JOBS]
+
+
+def _optimize(job, resume_file):
+    return {"keywords_to_add": [job["title"]]}
+
+
+def _failing_search(selection, resume_file, profile):
+    raise RuntimeError("Job search API failed")
+
+
+@pytest.fixture
+def stub_service(monkeypatch, tmp_path):
+    # threads instead of processes, so the stubs need not be importable from a worker
+    monkeypatch.setattr(service, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(service, "SERVICE_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(service, "_phase1", _phase1)
+    monkeypatch.setattr(service, "_job_search", _job_search)
+    monkeypatch.setattr(service, "_optimize", _optimize)
+    return monkeypatch
+
+
+def run_with_client(scenario, sessions=None):
+    if sessions is None:
+        sessions = service.SessionStore(SQLiteCache("sessions", path=":memory:"))
+
+    async def main():
+        app = service.build_app(workers=2, sessions=sessions)
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+async def wait_for_status(client, session_id, *statuses):
+    for _ in range(500):
+        response = await client.get(f"/sessions/{session_id}")
+        session = await response.json()
+        if session["status"] in statuses:
+            return session
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"session stuck in {session['status']}")
+
+
+async def upload(client, roles="ML Engineer, Data Scientist"):
+    form = aiohttp.FormData()
+    form.add_field("resume", b"%PDF-1.4 test resume", filename="resume.pdf", content_type="application/pdf")
+    form.add_field("preferred_roles", roles)
+    form.add_field("preferred_domains", "AI")
+    return await client.post("/sessions", data=form)
+
+
+def test_session_moves_through_every_step(stub_service):
+    async def scenario(client):
+        response = await upload(client)
+        assert response.status == 202
+        session = await response.json()
+        assert session["status"] == "phase1_running"
+        assert session["preferred_roles"] == ["ML Engineer", "Data Scientist"]
+
+        session = await wait_for_status(client, session["id"], "awaiting_selection")
+        assert session["phase1"] == PHASE1
+
+        response = await client.post(f"/sessions/{session['id']}/selection", json={"location": "Remote"})
+        assert response.status == 202
+        assert (await response.json())["selection"] == {
+            # first good-fit role and the resume's level, as in the CLI prompt
+            "selected_roles": ["ML Engineer"], "location": "Remote", "experience_level": "junior",
+        }
+        session = await wait_for_status(client, session["id"], "awaiting_job_choice")
+        assert [j["title"] for j in session["jobs"]] == ["ML Engineer", "Data Scientist"]
+        assert session["jobs"][0]["searched_for"] == ["ML Engineer"]
+
+        response = await client.post(f"/sessions/{session['id']}/job", json={"job_index": 1})
+        assert response.status == 202
+        session = await wait_for_status(client, session["id"], "done")
+        assert session["selected_job"]["title"] == "Data Scientist"
+        assert session["suggestions"] == {"keywords_to_add": ["Data Scientist"]}
+
+        response = await client.delete(f"/sessions/{session['id']}")
+        assert response.status == 204
+        assert (await client.get(f"/sessions/{session['id']}")).status == 404
+
+    run_with_client(scenario)
+
+
+def test_steps_out_of_order_and_bad_input_are_rejected(stub_service):
+    async def scenario(client):
+        session = await (await upload(client)).json()
+        session = await wait_for_status(client, session["id"], "awaiting_selection")
+
+        # no job list yet
+        response = await client.post(f"/sessions/{session['id']}/job", json={"job_index": 0})
+        assert response.status == 409
+        response = await client.post(f"/sessions/{session['id']}/selection", json={"experience_level": "guru"})
+        assert response.status == 400
+        response = await client.post(f"/sessions/{session['id']}/selection", data="not json")
+        assert response.status == 400
+
+        await client.post(f"/sessions/{session['id']}/selection", json={"experience_level": "mid"})
+        session = await wait_for_status(client, session["id"], "awaiting_job_choice")
+        response = await client.post(f"/sessions/{session['id']}/job", json={"job_index": 5})
+        assert response.status == 400
+
+        form = aiohttp.FormData()
+        form.add_field("resume", b"plain text", filename="resume.txt")
+        assert (await client.post("/sessions", data=form)).status == 400
+        assert (await client.get("/sessions/unknown")).status == 404
+
+    run_with_client(scenario)
+
+
+def test_failed_step_moves_the_session_to_error(stub_service):
+    stub_service.setattr(service, "_job_search", _failing_search)
+
+    async def scenario(client):
+        session = await (await upload(client)).json()
+        await wait_for_status(client, session["id"], "awaiting_selection")
+        await client.post(f"/sessions/{session['id']}/selection", json={})
+        session = await wait_for_status(client, session["id"], "error", "awaiting_job_choice")
+        assert session["status"] == "error"
+        assert session["error"] == "RuntimeError: Job search API failed"
+
+    run_with_client(scenario)
+
+
+def test_injected_session_store_is_used(stub_service):
+    cache = SQLiteCache("sessions", path=":memory:")
+    sessions = service.SessionStore(cache)
+    assert sessions.cache is cache
+
+    async def scenario(client):
+        session = await (await upload(client)).json()
+        await wait_for_status(client, session["id"], "awaiting_selection")
+        return session["id"]
+
+    session_id = run_with_client(scenario, sessions)
+    assert cache.keys() == [session_id]
+    assert sessions.get(session_id)["status"] == "awaiting_selection"
@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+import scoring
+import tools
+
+from scoring import HashingEmbedder
+from tools import JobSearchTool, MultiRoleJobSearchTool, normalize_job_query
+
+
+class StubSerper:
+    """Answers Serper job queries from canned postings, keyed by query text."""
+
+    def __init__(self, postings, gate=None):
+        self.postings = postings
+        self.gate = gate
+        self.queries = []
+
+    def run(self, search_query, page=1):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.queries.append((search_query, page))
+        return {"jobs": [dict(p) for p in self.postings.get((search_query, page), [])]}
+
+
+def posting(title, company, location="Remote", posted="2 days ago"):
+    return {"title": title, "company": company, "location": location, "posted": posted,
+            "link": f"https://jobs.example.com/{company}/{title}".replace(" ", "-"),
+            "description": f"{title} role at {company}"}
+
+
+POSTINGS = {
+    ("ML Engineer junior jobs in Remote", 1): [posting("ML Engineer", "Acme"), posting("ML Engineer", "Beta")],
+    ("Data Engineer junior jobs in Remote", 1): [posting("Data Engineer", "Gamma")],
+}
+
+
+@pytest.fixture
+def tool():
+    single = JobSearchTool(cache_path=":memory:")
+    single._serper = StubSerper(POSTINGS)
+    return single
+
+
+def indexed_companies(single):
+    return sorted(j["company"] for j in single.index.rank(["ML Engineer", "Data Engineer"], limit=50))
+
+
+def test_rejected_prefetch_is_never_indexed(tool):
+    tool.prefetch(["ML Engineer"], "Remote", "junior")
+    key = normalize_job_query("ML Engineer", "Remote", "junior")
+    # let the background search finish before the user answers
+    tool._prefetched._futures[key].result(5)
+    assert indexed_companies(tool) == []
+
+    assert tool.keep_prefetched(["Data Engineer"], "Remote", "junior") == 1
+    shortlist = MultiRoleJobSearchTool(tool).shortlist(["Data Engineer"], "Remote", "junior")
+    assert [j["company"] for j in shortlist] == ["Gamma"]
+    assert indexed_companies(tool) == ["Gamma"]
+
+
+def test_taken_prefetch_is_indexed_once_used(tool):
+    gate = threading.Event()
+    tool._serper.gate = gate
+    tool.prefetch(["ML Engineer"], "Remote", "junior")
+    gate.set()
+    jobs = tool.search("ML Engineer", "Remote", "junior")
+    assert [j["company"] for j in jobs] == ["Acme", "Beta"]
+    assert tool._serper.queries == [("ML Engineer junior jobs in Remote", 1)]
+    assert indexed_companies(tool) == ["Acme", "Beta"]
+    # descriptions travel with the prefetched jobs into the index
+    assert tool.index.descriptions(jobs) == ["ML Engineer role at Acme", "ML Engineer role at Beta"]
+
+
+def test_cache_hits_are_indexed_with_their_descriptions(tool):
+    tool.prefetch(["ML Engineer"], "Remote", "junior")
+    tool._prefetched._futures[normalize_job_query("ML Engineer", "Remote", "junior")].result(5)
+    tool.keep_prefetched([], "Remote", "junior")
+    # the rejected prefetch left a cache entry; a later real search uses it and indexes it
+    jobs = tool.search("ML Engineer", "Remote", "junior")
+    assert len(tool._serper.queries) == 1 and tool.cache_stats()["hits"] == 1
+    assert tool.index.descriptions(jobs) == ["ML Engineer role at Acme", "ML Engineer role at Beta"]
+
+
+def test_shortlist_leaves_out_stale_and_previously_indexed_postings(tool):
+    tool._serper.postings = {
+        ("ML Engineer junior jobs in Remote", 1): [posting("ML Engineer", "Fresh", posted="3 days ago"),
+                                                   posting("ML Engineer", "Stale", posted="40 days ago")],
+        ("ML Engineer junior jobs in Pune", 1): [posting("ML Engineer", "Older", "Pune", posted="60 days ago"),
+                                                 posting("ML Engineer", "Local", "Pune", posted="1 day ago")],
+    }
+    # indexed by an earlier run, not returned by this search
+    tool.index.ingest([{"title": "ML Engineer", "company": "Earlier", "location": "Remote",
+                        "apply_link": "https://jobs.example.com/earlier", "posted_days_ago": 1}],
+                      experience_level="junior")
+
+    # two locations make it a sweep, with the 30-day freshness threshold
+    shortlist = MultiRoleJobSearchTool(tool).shortlist(["ML Engineer"], "Remote; Pune", "junior", limit=10)
+    assert sorted(j["company"] for j in shortlist) == ["Fresh", "Local"]
+
+
+def test_shortlist_is_reranked_by_resume_match_before_the_cut(tool, monkeypatch):
+    matching = dict(posting("Engineer", "Acme"), description="NLP engineer, Python and PyTorch")
+    tool._serper.postings = {("Engineer junior jobs in Remote", 1): [posting("Engineer", "Ledger"), matching]}
+    monkeypatch.setattr(scoring, "get_embedder", HashingEmbedder)
+    monkeypatch.setattr(tools, "_profile", {"skills": ["Python", "PyTorch", "NLP"]})
+    # BM25 ties the two; Acme only makes a one-job shortlist by matching the resume
+    shortlist = MultiRoleJobSearchTool(tool).shortlist(["Engineer"], "Remote", "junior", limit=1)
+    assert [j["company"] for j in shortlist] == ["Acme"]
+    assert shortlist[0]["match_score"] > 0
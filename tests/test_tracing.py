@@ -0,0 +1,27 @@
+import tracing
+
+
+def test_kickoff_records_one_crew_span():
+    class Crew:
+        agents, tasks = [], ["only task"]
+
+        def kickoff(self, inputs):
+            return inputs["x"]
+
+    tracer = tracing.Tracer()
+    original, tracing.tracer = tracing.tracer, tracer
+    try:
+        assert tracing.kickoff("demo_crew", Crew(), {"x": 1}) == 1
+    finally:
+        tracing.tracer = original
+    assert [(s["kind"], s["name"]) for s in tracer.spans] == [("crew", "demo_crew")]
+
+
+def test_prometheus_text_adds_worker_counters():
+    tracer = tracing.Tracer()
+    span = tracer.start("tool", "job_search_tool", cache_hit=True)
+    tracer.finish(span)
+    worker = tracer.counters_snapshot()
+    text = tracer.prometheus_text(worker, worker)
+    assert 'jobhunt_cache_lookups_total{cache="job_search_tool",result="hit"} 3' in text
+    assert text.count("# TYPE jobhunt_span_seconds summary") == 1
@@ -1,12 +1,48 @@
-from typing import Type, List, Dict
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Type, List, Dict, Iterator, Optional, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
-from crewai_tools import SerperDevTool
 from dotenv import load_dotenv
+import json
 import os
+import threading
+
+import registry
+import tracing
+from cache import SQLiteCache, DEFAULT_CACHE_PATH
+from embeddings import RESUME_EMBEDDING_MODEL
+from dedup import JobDeduper, merge_jobs
+from job_index import JOB_SHORTLIST_SIZE, JobIndex, job_key, split_locations
+from job_records import compact_jobs, is_fresh, jobs_from_compact, posted_days
+from scoring import rerank
+from settings import RESUME_PDF
 
 load_dotenv()
 
+# Job search cache settings (repeated role/location/level queries skip Serper)
+JOB_CACHE_TTL_SECONDS = float(os.environ.get("JOB_CACHE_TTL_SECONDS", 6 * 60 * 60))
+JOB_CACHE_MAX_ENTRIES = int(os.environ.get("JOB_CACHE_MAX_ENTRIES", 500))
+# Max concurrent Serper queries for multi-role searches
+JOB_SEARCH_MAX_WORKERS = int(os.environ.get("JOB_SEARCH_MAX_WORKERS", 4))
+SERPER_JOBS_URL = os.environ.get("SERPER_JOBS_URL", "https://google.serper.dev/jobs")
+SERPER_COUNTRY = os.environ.get("SERPER_COUNTRY", "in")
+# Sweep mode (several locations and/or result pages): stop after this many
+# unique jobs posted within JOB_SWEEP_MAX_AGE_DAYS
+JOB_SWEEP_MAX_PAGES = int(os.environ.get("JOB_SWEEP_MAX_PAGES", 1))
+JOB_SWEEP_TARGET = int(os.environ.get("JOB_SWEEP_TARGET", 30))
+JOB_SWEEP_MAX_AGE_DAYS = float(os.environ.get("JOB_SWEEP_MAX_AGE_DAYS", 30))
+# Prefetch: searches for the top good-fit roles start while the user is choosing
+JOB_PREFETCH_ROLES = int(os.environ.get("JOB_PREFETCH_ROLES", 2))
+JOB_PREFETCH_MAX_ENTRIES = int(os.environ.get("JOB_PREFETCH_MAX_ENTRIES", 8))
+
+
+def normalize_job_query(role: str, location: str, experience_level: str,
+                        country: str = SERPER_COUNTRY) -> str:
+    """Cache key for a search: case- and whitespace-insensitive, per Serper country."""
+    parts = (role, location, experience_level, country)
+    return "|".join(" ".join(p.lower().split()) for p in parts)
+
 # -------- Input schema --------
 class JobSearchInput(BaseModel):
     role: str = Field(..., description="Target job role, e.g., 'ML Engineer'")
@@ -14,6 +50,78 @@ class JobSearchInput(BaseModel):
     experience_level: str = Field(..., description="intern|junior|mid|senior")
 
 
+# -------- Serper client --------
+class SerperJobsClient:
+    """Serper jobs endpoint, with the `page` parameter SerperDevTool does not expose."""
+
+    def __init__(self, api_key: Optional[str] = None, country: str = SERPER_COUNTRY,
+                 url: str = SERPER_JOBS_URL, timeout: float = 30):
+        import requests
+
+        self.url = url
+        self.country = country
+        self.timeout = timeout
+        # one session, so every query reuses the same HTTPS connections
+        self.session = requests.Session()
+        self.session.headers.update({
+            "X-API-KEY": api_key or os.environ.get("SERPER_API_KEY", ""),
+            "Content-Type": "application/json",
+        })
+
+    def run(self, search_query: str, page: int = 1) -> Dict:
+        payload: Dict[str, Any] = {"q": search_query, "gl": self.country}
+        if page > 1:
+            payload["page"] = page
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+# -------- Prefetch store --------
+class PrefetchStore:
+    """Bounded in-memory map from a normalized query to the Future of its first page.
+
+    Oldest entries are evicted (and cancelled if not started) beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = JOB_PREFETCH_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._futures: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._futures
+
+    def put(self, key: str, future: Future) -> None:
+        with self._lock:
+            dropped = [self._futures.pop(key)] if key in self._futures else []
+            self._futures[key] = future
+            while len(self._futures) > self.max_entries:
+                dropped.append(self._futures.popitem(last=False)[1])
+        for old in dropped:
+            old.cancel()
+
+    def take(self, key: str) -> Optional[Tuple[List[Dict], List[str]]]:
+        """The prefetched (jobs, descriptions), waiting if still running, or None to search normally."""
+        with self._lock:
+            future = self._futures.pop(key, None)
+        # one still queued behind other prefetches is slower than searching now
+        if future is None or future.cancel():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def keep(self, keys) -> int:
+        with self._lock:
+            dropped = [self._futures.pop(k) for k in list(self._futures) if k not in keys]
+        for future in dropped:
+            future.cancel()
+        return len(dropped)
+
+
 # -------- Tool implementation --------
 class JobSearchTool(BaseTool):
     name: str = "job_search_tool"
@@ -21,13 +129,66 @@ class JobSearchTool(BaseTool):
     args_schema: Type[BaseModel] = JobSearchInput
 
     # declare private attribute for non-pydantic fields
-    _serper: SerperDevTool = PrivateAttr()
+    _serper: Any = PrivateAttr(default=None)
+    _cache: SQLiteCache = PrivateAttr()
+    _index: JobIndex = PrivateAttr()
+    _prefetched: "PrefetchStore" = PrivateAttr()
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        cache_ttl_seconds: float = JOB_CACHE_TTL_SECONDS,
+        cache_max_entries: int = JOB_CACHE_MAX_ENTRIES,
+    ):
         super().__init__()
-        self._serper = SerperDevTool(search_type="jobs", country="in")
+        self._index = JobIndex(cache_path)
+        self._prefetched = PrefetchStore()
+        self._cache = SQLiteCache(
+            "job_search",
+            path=cache_path,
+            ttl_seconds=cache_ttl_seconds,
+            max_entries=cache_max_entries,
+        )
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+    @property
+    def index(self) -> JobIndex:
+        return self._index
+
+    def prefetch(self, roles: List[str], location: str, experience_level: str,
+                 max_workers: int = JOB_SEARCH_MAX_WORKERS) -> None:
+        """Start page-1 searches in the background; search() waits for them instead of re-querying."""
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="prefetch")
+        # results are only indexed once search() takes them, so rejected prefetches never rank
+        fetch = tracing.in_context(self._fetch)
+        for role in roles:
+            for loc in split_locations(location):
+                key = normalize_job_query(role, loc, experience_level)
+                if key not in self._prefetched:
+                    self._prefetched.put(key, pool.submit(fetch, role, loc, experience_level))
+        # the queued searches still run; the threads exit once they are done
+        pool.shutdown(wait=False)
+
+    def keep_prefetched(self, roles: List[str], location: str, experience_level: str) -> int:
+        """Drop prefetches outside these choices; returns how many were dropped."""
+        keys = {normalize_job_query(role, loc, experience_level)
+                for role in roles for loc in split_locations(location)}
+        return self._prefetched.keep(keys)
+
+    def _get_serper(self):
+        # built on first use; cache hits never need it
+        if self._serper is None:
+            self._serper = SerperJobsClient()
+        return self._serper
 
     def _run(self, role: str, location: str, experience_level: str) -> str:
+        return json.dumps({"jobs": self.search(role, location, experience_level)}, separators=(",", ":"))
+
+    @tracing.traced("tool", "job_search_tool")
+    def search(self, role: str, location: str, experience_level: str, page: int = 1) -> List[Dict]:
+        """Run one Serper jobs query (one result page) and return normalized job dicts."""
         # ---- input validation ----
         if not role or not isinstance(role, str):
             raise ValueError("role must be a non-empty string")
@@ -36,18 +197,46 @@ class JobSearchTool(BaseTool):
         if experience_level not in {"intern", "junior", "mid", "senior"}:
             raise ValueError("experience_level must be one of: intern, junior, mid, senior")
 
+        # ---- prefetched while the user was choosing (see prefetch()) ----
+        if page == 1:
+            prefetched = self._prefetched.take(normalize_job_query(role, location, experience_level))
+            tracing.annotate(prefetched=prefetched is not None)
+            if prefetched is not None:
+                return self._ingest(*prefetched, role, experience_level)
+        jobs, descriptions = self._fetch(role, location, experience_level, page)
+        return self._ingest(jobs, descriptions, role, experience_level)
+
+    def _ingest(self, jobs: List[Dict], descriptions: Optional[List[str]], role: str,
+                experience_level: str) -> List[Dict]:
+        # cache hits too: that refreshes last_seen and records this experience level
+        if jobs:
+            self._index.ingest(jobs, role=role, experience_level=experience_level, descriptions=descriptions)
+        return jobs
+
+    def _fetch(self, role: str, location: str, experience_level: str,
+               page: int = 1) -> Tuple[List[Dict], Optional[List[str]]]:
+        """Jobs and their descriptions for one query, from the cache or Serper (not indexed)."""
+        # ---- cache lookup ----
+        cache_key = normalize_job_query(role, location, experience_level)
+        if page > 1:
+            cache_key += f"|page={page}"
+        cached = self._cache.get(cache_key)
+        tracing.annotate(cache_hit=cached is not None)
+        if cached is not None:
+            # entries from before descriptions were cached have none
+            return jobs_from_compact(cached), cached.get("descriptions") if isinstance(cached, dict) else None
+
         query = f"{role} {experience_level} jobs in {location}"
 
         # ---- API call ----
         try:
-            # SerperDevTool.run() only takes search_query as string
-            results = self._serper.run(search_query=query)
+            with tracing.span("http", "serper", page=page):
+                results = self._get_serper().run(search_query=query, page=page)
         except Exception as e:
             raise RuntimeError(f"Job search API failed: {e}")
 
         # ---- output validation and parsing ----
-        # SerperDevTool returns a string, parse it
-        import json
+        # recorded or proxied responses may arrive as a JSON string
         try:
             if isinstance(results, str):
                 results = json.loads(results)
@@ -55,48 +244,318 @@ class JobSearchTool(BaseTool):
             pass
             
         if not isinstance(results, dict):
-            return json.dumps({"jobs": []})
+            return [], []
 
         raw_jobs = results.get("jobs", [])
         if not raw_jobs or not isinstance(raw_jobs, list):
-            return json.dumps({"jobs": []})
+            return [], []
 
         jobs: List[Dict] = []
+        descriptions: List[str] = []
+        deduper = JobDeduper()
         for r in raw_jobs:
             if not isinstance(r, dict):
                 continue
-            jobs.append({
+            job = {
                 "title": r.get("title", "Unknown"),
                 "company": r.get("company", "Unknown"),
                 "location": r.get("location", "Unknown"),
                 "apply_link": r.get("link"),
-                "posted_days_ago": r.get("posted", None)
-            })
-
-        return json.dumps({"jobs": jobs})
-    
-job_search_tool = JobSearchTool()
-
-# Configure PDFSearchTool with Google Generative AI embeddings and ChromaDB
-from crewai_tools import PDFSearchTool
-
-resume_reader_tool = PDFSearchTool(
-    pdf="/Users/apple/Desktop/jobhunt-crewai/resume.pdf",
-    config={
-        "embedding_model": {
-            "provider": "google-generativeai",
-            "config": {
-                "model": "models/text-embedding-004",  # Latest Google embedding model
-                "task_type": "RETRIEVAL_DOCUMENT",
-                # API key will be picked up from GOOGLE_API_KEY env var automatically
-            },
-        },
-        "vectordb": {
-            "provider": "chromadb",
-            "config": {
-                # ChromaDB will use local storage by default
-                # Data persists in ./chroma directory
+                "posted_days_ago": posted_days(r.get("posted")),  # '3 days ago' -> 3.0
             }
-        },
-    }
-)
\ No newline at end of file
+            # reposts on the same page
+            if deduper.add(job) is None:
+                continue
+            jobs.append(job)
+            # descriptions only feed the local index, they would bloat the agent prompt
+            descriptions.append(r.get("description") or r.get("snippet") or "")
+
+        # empty pages are often transient, only cache real results
+        if jobs:
+            # compact rows: field names are stored once per page, not per job
+            self._cache.set(cache_key, {**compact_jobs(jobs), "descriptions": descriptions})
+
+        return jobs, descriptions
+
+
+# -------- Multi-role search --------
+class MultiRoleJobSearchInput(BaseModel):
+    roles: List[str] = Field(..., description="All target job roles, e.g., ['ML Engineer', 'Data Scientist']")
+    location: str = Field(..., description="Job location, e.g., 'Remote' or 'Mumbai'; separate several with ';'")
+    experience_level: str = Field(..., description="intern|junior|mid|senior")
+    skills: List[str] = Field(default_factory=list, description="Resume skills used to rank the results")
+
+
+class MultiRoleJobSearchTool(BaseTool):
+    name: str = "multi_role_job_search_tool"
+    description: str = (
+        "Fetches real job openings for several roles at once using Google Jobs via Serper API. "
+        "Pass every selected role and the resume skills in a single call. Returns a "
+        "deduplicated shortlist already ranked by relevance and resume match, best first."
+    )
+    args_schema: Type[BaseModel] = MultiRoleJobSearchInput
+
+    _single: JobSearchTool = PrivateAttr()
+    _max_workers: int = PrivateAttr()
+
+    def __init__(self, single_tool: JobSearchTool, max_workers: int = JOB_SEARCH_MAX_WORKERS):
+        super().__init__()
+        self._single = single_tool
+        self._max_workers = max_workers
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self._single.cache_stats()
+
+    def _run(self, roles: List[str], location: str, experience_level: str,
+             skills: List[str] = None) -> str:
+        return json.dumps({"jobs": self.shortlist(roles, location, experience_level, skills)},
+                          separators=(",", ":"))
+
+    @tracing.traced("tool", "multi_role_job_search_tool")
+    def shortlist(self, roles: List[str], location: str, experience_level: str,
+                  skills: List[str] = None, limit: int = JOB_SHORTLIST_SIZE) -> List[Dict]:
+        """Search every role, rank what the search returned with BM25, then rerank by resume match."""
+        fresh = self.search(roles, location, experience_level)
+        if isinstance(roles, str):
+            roles = [r.strip() for r in roles.split(",")]
+        # only this search's postings: the sweep already dropped stale ones and
+        # stopped at its target, older indexed postings must not come back in
+        ranked = self._single.index.rank(roles, skills or [], location, limit=limit * 3,
+                                         keys=[job_key(job) for job in fresh],
+                                         experience_level=experience_level)
+        deduper = JobDeduper()
+        candidates = [job for job in ranked if deduper.add(job) is not None]
+        # BM25 picks the pool, similarity to the resume decides the order within it
+        shortlist = self._rerank(candidates, skills)[:limit]
+        # top up from this search when the index filter leaves too few
+        for job in fresh:
+            if len(shortlist) >= limit:
+                break
+            if deduper.add(job) is not None:
+                shortlist.append(job)
+        return shortlist
+
+    def _rerank(self, jobs: List[Dict], skills: Optional[List[str]]) -> List[Dict]:
+        profile = _profile or ({"skills": list(skills)} if skills else None)
+        try:
+            return rerank(profile, jobs, snippets=self._single.index.descriptions(jobs))
+        except Exception as e:
+            # match scores only refine the order; BM25 alone still gives a shortlist
+            print(f"⚠️  Could not score job matches ({e}), keeping the BM25 order")
+            return jobs
+
+    def search(self, roles: List[str], location: str, experience_level: str) -> List[Dict]:
+        if isinstance(roles, str):
+            roles = [r.strip() for r in roles.split(",")]
+        # drop blanks and repeated roles, keep the user's order
+        roles = list(dict.fromkeys(r for r in roles if isinstance(r, str) and r.strip()))
+        if not roles:
+            raise ValueError("roles must contain at least one non-empty string")
+
+        locations = split_locations(location)
+        if len(locations) > 1 or JOB_SWEEP_MAX_PAGES > 1:
+            return list(sweep_jobs(self._single, roles, locations, experience_level,
+                                   max_workers=self._max_workers))
+
+        workers = max(1, min(self._max_workers, len(roles)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map() keeps results in role order so the merge is deterministic
+            results = list(pool.map(
+                tracing.in_context(lambda role: self._single.search(role, location, experience_level)),
+                roles,
+            ))
+        return merge_jobs(results)
+
+
+# -------- Sweep mode --------
+def sweep_jobs(tool: JobSearchTool, roles: List[str], locations: List[str], experience_level: str,
+               target: Optional[int] = JOB_SWEEP_TARGET, max_pages: int = JOB_SWEEP_MAX_PAGES,
+               max_age_days: float = JOB_SWEEP_MAX_AGE_DAYS,
+               max_workers: int = JOB_SEARCH_MAX_WORKERS) -> Iterator[Dict]:
+    """Yield unique, fresh jobs over roles x locations x pages as results arrive.
+
+    Page 1 of every (role, location) is queried before any page 2, at most
+    `max_workers` queries are in flight, and a pair whose page comes back empty
+    is not paged further. Stops (cancelling queued queries) once `target` jobs
+    were yielded; `target=None` runs every page. Jobs with no posting age count
+    as fresh.
+    """
+    queue = deque((role, location, 1) for role in roles for location in locations)
+    running: Dict = {}
+    deduper = JobDeduper()
+    yielded = 0
+    search = tracing.in_context(tool.search)
+    # JOB_SEARCH_MAX_WORKERS=0 still means one query at a time, not none
+    max_workers = max(1, max_workers)
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sweep")
+    try:
+        while queue or running:
+            while queue and len(running) < max_workers:
+                role, location, page = queue.popleft()
+                running[pool.submit(search, role, location, experience_level, page)] = (role, location, page)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                role, location, page = running.pop(future)
+                try:
+                    jobs = future.result()
+                except Exception as e:
+                    # one failed page should not end the whole sweep
+                    print(f"⚠️  Job sweep query failed ({role}, {location}, page {page}): {e}")
+                    continue
+                if jobs and page < max_pages:
+                    queue.append((role, location, page + 1))
+                for job in jobs:
+                    # stale first, so an old posting cannot hide its fresh repost
+                    if not is_fresh(job, max_age_days):
+                        continue
+                    if deduper.add(job) is None:
+                        continue
+                    yield job
+                    yielded += 1
+                    if target and yielded >= target:
+                        return
+    finally:
+        # runs on early stop and when the caller closes the generator
+        for future in running:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+# -------- Lazy tool construction --------
+# Tools are built on first use and shared; see registry.py.
+@registry.register("job_search_tool")
+def _build_job_search_tool() -> JobSearchTool:
+    return JobSearchTool()
+
+
+@registry.register("multi_role_job_search_tool")
+def _build_multi_role_job_search_tool() -> MultiRoleJobSearchTool:
+    return MultiRoleJobSearchTool(registry.get("job_search_tool"))
+
+
+def build_resume_reader_tool(pdf_path: str = RESUME_PDF):
+    # Configure PDFSearchTool with Google Generative AI embeddings and ChromaDB.
+    # crewai_tools and chromadb are imported here so importing this module stays cheap.
+    from crewai_tools import PDFSearchTool
+    from embeddings import (
+        CHROMA_DIR,
+        evict_stale_collections,
+        install_embedding_cache,
+        resume_collection_name,
+        resume_query_memo,
+        touch_resume_collection,
+    )
+
+    # one collection per resume content: unchanged resumes reuse stored vectors
+    collection = resume_collection_name(pdf_path)
+
+    class CachedPDFSearchTool(PDFSearchTool):
+        """PDFSearchTool whose chunk embeddings are cached by content hash.
+
+        Searches are memoized for the run (see ResumeQueryMemo): a repeated or
+        near-identical query skips the query embedding and the Chroma lookup.
+        """
+
+        def add(self, *args, **kwargs):
+            # PDFSearchTool.__init__ calls add(pdf) right after building the app,
+            # so this is the first point where the embedder can be swapped
+            app = getattr(getattr(self, "adapter", None), "embedchain_app", None)
+            if app is not None:
+                install_embedding_cache(app, RESUME_EMBEDDING_MODEL)
+            super().add(*args, **kwargs)
+
+        def _run(self, *args, **kwargs):
+            search = super()._run
+            query = kwargs.get("query", args[0] if args else "")
+            with tracing.span("tool", "resume_reader_tool"):
+                return resume_query_memo.run(collection, query, lambda: search(*args, **kwargs))
+
+    tool = CachedPDFSearchTool(
+        pdf=pdf_path,
+        config={
+            "embedding_model": {
+                "provider": "google-generativeai",
+                "config": {
+                    "model": RESUME_EMBEDDING_MODEL,
+                    "task_type": "RETRIEVAL_DOCUMENT",
+                    # API key will be picked up from GOOGLE_API_KEY env var automatically
+                },
+            },
+            "vectordb": {
+                "provider": "chromadb",
+                "config": {
+                    "collection_name": collection,
+                    "dir": CHROMA_DIR,
+                }
+            },
+        }
+    )
+    tracker = touch_resume_collection(collection)
+    try:
+        evict_stale_collections(CHROMA_DIR, tracker)
+    except Exception as e:
+        # eviction is housekeeping only, never block the run on it
+        print(f"⚠️  Could not evict stale resume collections: {e}")
+    return tool
+
+
+_resume_pdf = RESUME_PDF
+# parsed resume profile the job shortlist is matched against (see use_profile)
+_profile: Optional[Dict] = None
+
+
+def use_profile(profile: Optional[Dict]) -> None:
+    """Match job shortlists against this resume profile (None: the skills passed to the tool)."""
+    global _profile
+    _profile = profile or None
+
+
+def use_resume(pdf_path: str) -> None:
+    """Point the shared resume tool at another PDF.
+
+    Agents, tasks and crews built on the old tool are reset with it (see registry.py).
+    """
+    global _resume_pdf
+    if pdf_path != _resume_pdf:
+        _resume_pdf = pdf_path
+        registry.reset("resume_reader_tool")
+        registry.reset("resume_full_text")
+
+
+@registry.register("resume_reader_tool")
+def _build_resume_reader_tool():
+    return build_resume_reader_tool(_resume_pdf)
+
+
+# -------- Full-context resume mode --------
+@registry.register("resume_full_text")
+def _build_resume_full_text():
+    from resume_parser import full_context_text
+    return full_context_text(_resume_pdf)
+
+
+def resume_tools() -> list:
+    """Tools for agents that read the resume: none when its full text is inlined.
+
+    Called from agent builders, so those agents are rebuilt by use_resume().
+    """
+    if registry.get("resume_full_text") is not None:
+        return []
+    return [registry.get("resume_reader_tool")]
+
+
+def resume_context() -> str:
+    """Fills {resume_context} in the resume tasks: the whole text, or how to search it."""
+    text = registry.get("resume_full_text")
+    if text is None:
+        return "Search it with the PDF reader tool."
+    return (
+        "Its full text is below, so there is nothing to search for; read it directly.\n"
+        f"<resume>\n{text}\n</resume>"
+    )
+
+
+# `from tools import job_search_tool` still works, but builds on first access
+__getattr__ = registry.lazy_module_getattr(
+    "job_search_tool", "multi_role_job_search_tool", "resume_reader_tool"
+)
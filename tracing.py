@@ -0,0 +1,274 @@
+"""
+Structured tracing and metrics for crews, LLM calls and tools.
+
+Spans nest through a context variable: a tool or LLM call made while a crew is
+running becomes a child of that crew's span and inherits its agent. Finished
+spans are kept in memory (bounded), aggregated into counters, and exported as
+
+- a Chrome trace-event JSON file (TRACE_FILE, written at exit and by flush();
+  open it in chrome://tracing or ui.perfetto.dev), and
+- Prometheus text format (prometheus_text(), served on METRICS_PORT by
+  serve_metrics(), or at /metrics by service.py).
+
+Worker processes do not run atexit handlers, so pool jobs call flush() when
+they finish.
+
+Usage:
+    with tracing.span("tool", "job_search_tool", role=role):
+        ...
+        tracing.annotate(cache_hit=True)
+"""
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+TRACING_ENABLED = os.environ.get("TRACING", "1") != "0"
+# "{pid}" in the path is replaced, so batch worker processes do not overwrite each other
+TRACE_FILE = os.environ.get("TRACE_FILE")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", 50000))
+
+_current: contextvars.ContextVar = contextvars.ContextVar("jobhunt_span", default=None)
+
+
+class Tracer:
+    """Collects finished spans and the counters derived from them (thread-safe)."""
+
+    def __init__(self, max_spans: int = TRACE_MAX_SPANS):
+        self.spans: deque = deque(maxlen=max_spans)
+        self.counters: Dict[Tuple[str, Tuple], float] = defaultdict(float)
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def start(self, kind: str, name: str, **attrs) -> Dict:
+        parent = _current.get()
+        return {
+            "id": next(self._ids),
+            "parent": parent["id"] if parent else None,
+            "kind": kind,
+            "name": name,
+            # spans inside a crew run are attributed to its agent
+            "agent": attrs.pop("agent", None) or (parent or {}).get("agent"),
+            "start": time.time(),
+            "thread": threading.get_ident(),
+            "attrs": attrs,
+            "_t0": time.perf_counter(),
+        }
+
+    def finish(self, span: Dict, error: Optional[BaseException] = None) -> None:
+        span["duration"] = time.perf_counter() - span.pop("_t0")
+        if error is not None:
+            span["error"] = f"{type(error).__name__}: {error}"
+        with self.lock:
+            self.spans.append(span)
+            self._count(span)
+
+    def _count(self, span: Dict) -> None:
+        attrs = span["attrs"]
+        labels = (("kind", span["kind"]), ("name", span["name"]), ("agent", span["agent"] or ""))
+        self.counters[("jobhunt_span_seconds_sum", labels)] += span["duration"]
+        self.counters[("jobhunt_span_seconds_count", labels)] += 1
+        if "error" in span:
+            self.counters[("jobhunt_span_errors_total", labels)] += 1
+
+        llm = (("model", span["name"]), ("agent", span["agent"] or ""))
+        for kind in ("prompt", "completion"):
+            if attrs.get(f"{kind}_tokens"):
+                self.counters[("jobhunt_llm_tokens_total", llm + (("type", kind),))] += attrs[f"{kind}_tokens"]
+        if attrs.get("retries"):
+            self.counters[("jobhunt_llm_retries_total", llm)] += attrs["retries"]
+
+        # cache_hit for single lookups, cache_hits/cache_misses for batches
+        cache = (("cache", span["name"]),)
+        hits = attrs.get("cache_hits", 1 if attrs.get("cache_hit") is True else 0)
+        misses = attrs.get("cache_misses", 1 if attrs.get("cache_hit") is False else 0)
+        if hits:
+            self.counters[("jobhunt_cache_lookups_total", cache + (("result", "hit"),))] += hits
+        if misses:
+            self.counters[("jobhunt_cache_lookups_total", cache + (("result", "miss"),))] += misses
+
+    # -------- Export --------
+    def chrome_trace(self) -> Dict:
+        with self.lock:
+            spans = list(self.spans)
+        events = [{
+            "name": s["name"],
+            "cat": s["kind"],
+            "ph": "X",
+            "ts": int(s["start"] * 1e6),
+            "dur": int(s["duration"] * 1e6),
+            "pid": os.getpid(),
+            "tid": s["thread"],
+            "args": {"id": s["id"], "parent": s["parent"], "agent": s["agent"],
+                     **s["attrs"], **({"error": s["error"]} if "error" in s else {})},
+        } for s in spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str) -> str:
+        path = path.replace("{pid}", str(os.getpid()))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+    def counters_snapshot(self) -> Dict[Tuple[str, Tuple], float]:
+        with self.lock:
+            return dict(self.counters)
+
+    def prometheus_text(self, *extra: Dict[Tuple[str, Tuple], float]) -> str:
+        """Counters in Prometheus text format, plus any `extra` counter snapshots (other processes)."""
+        counters = defaultdict(float, self.counters_snapshot())
+        for snapshot in extra:
+            for key, value in snapshot.items():
+                counters[key] += value
+        by_metric: Dict[str, list] = defaultdict(list)
+        for (metric, labels), value in sorted(counters.items()):
+            by_metric[metric].append((labels, value))
+
+        lines, typed = [], set()
+        for metric, samples in by_metric.items():
+            # span durations are summaries (_sum/_count), everything else counters
+            family = metric.rsplit("_", 1)[0] if metric.endswith(("_sum", "_count")) else metric
+            if family not in typed:
+                typed.add(family)
+                lines.append(f"# TYPE {family} {'counter' if family == metric else 'summary'}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{metric}{{{label_text}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+tracer = Tracer()
+
+
+# -------- Instrumentation helpers --------
+@contextmanager
+def span(kind: str, name: str, **attrs) -> Iterator[Optional[Dict]]:
+    """Record a span around the block; yields the span (None when tracing is off)."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+    current = tracer.start(kind, name, **attrs)
+    token = _current.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        tracer.finish(current, error)
+
+
+def traced(kind: str, name: str) -> Callable:
+    """Decorator form of span()."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**attrs) -> None:
+    """Add attributes (cache_hit, counts, ...) to the innermost open span."""
+    current = _current.get()
+    if current is not None:
+        current["attrs"].update(attrs)
+
+
+def current_agent() -> Optional[str]:
+    """Agent the innermost open span is attributed to, if any."""
+    current = _current.get()
+    return current["agent"] if current is not None else None
+
+
+def in_context(fn: Callable) -> Callable:
+    """Bind fn to the caller's span so work submitted to a thread pool nests under it."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # each call needs its own copy: one Context cannot be entered by two threads
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def kickoff(crew_name: str, crew, inputs: Dict):
+    """crew.kickoff(inputs=...) inside a crew span."""
+    agents = [getattr(a, "role", str(a)) for a in getattr(crew, "agents", [])]
+    agent = agents[0] if len(agents) == 1 else crew_name
+    with span("crew", crew_name, agent=agent, agents=agents, tasks=len(getattr(crew, "tasks", []))):
+        return crew.kickoff(inputs=inputs)
+
+
+def token_usage(response) -> Dict[str, int]:
+    """Prompt/completion token counts from a langchain LLMResult, when reported."""
+    usage = dict((getattr(response, "llm_output", None) or {}).get("usage_metadata") or {})
+    if not usage:
+        for generations in getattr(response, "generations", []):
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                if usage:
+                    break
+            if usage:
+                break
+    prompt = usage.get("input_tokens", usage.get("prompt_token_count"))
+    completion = usage.get("output_tokens", usage.get("candidates_token_count"))
+    return {k: v for k, v in (("prompt_tokens", prompt), ("completion_tokens", completion)) if v is not None}
+
+
+# -------- Metrics endpoint --------
+_server = None
+
+
+def serve_metrics(port: Optional[str] = METRICS_PORT) -> None:
+    """Serve prometheus_text() at http://0.0.0.0:<port>/metrics (no-op without a port)."""
+    global _server
+    if not port or _server is not None:
+        return
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = tracer.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # keep scrapes out of the CLI output
+
+    _server = ThreadingHTTPServer(("0.0.0.0", int(port)), MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📈 Metrics at http://localhost:{port}/metrics")
+
+
+# -------- Trace file --------
+def flush() -> Optional[str]:
+    """Write TRACE_FILE now (spans so far); returns its path, or None when not tracing to a file."""
+    if not (TRACING_ENABLED and TRACE_FILE):
+        return None
+    return tracer.write_trace(TRACE_FILE)
+
+
+atexit.register(flush)